@@ -0,0 +1,136 @@
+"""Answer a whole question bank with the Smart Student Agent.
+
+Questions are read from a file or stdin, either one per line or as JSONL
+({"id": ..., "question": ...}). They run concurrently and every answer is
+appended to the output JSONL as soon as it is ready, so an interrupted run
+can be resumed: questions whose id is already answered in the output are
+skipped.
+
+    python batch.py questions.txt -o answers.jsonl --concurrency 16
+    cat bank.jsonl | python batch.py - -o answers.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from agent_common.tracing_local import flush as flush_traces, stage_summary
+from agents import Runner
+
+from cache import CACHE_PATH, AnswerCache
+from main import agent
+
+
+def read_questions(source):
+    """Yields (id, question) pairs from text or JSONL lines."""
+    for line_no, line in enumerate(source, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("{"):
+            record = json.loads(line)
+            yield str(record.get("id", line_no)), record["question"]
+        else:
+            yield str(line_no), line
+
+
+def load_checkpoint(path) -> set[str]:
+    """Ids that already have an answer in the output file."""
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # partial line from an interrupted run
+                if record.get("error") is None:
+                    done.add(record["id"])
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+async def run_batch(questions, out, concurrency: int, done: set[str], cache: AnswerCache | None = None) -> dict:
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+    latencies = []
+    stats = {"answered": 0, "failed": 0, "skipped": 0}
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            qid, question = item
+            started = time.perf_counter()
+            record = {"id": qid, "question": question, "answer": None, "error": None}
+            try:
+                if cache is not None:
+                    record["answer"] = await cache.answer(agent, question)
+                else:
+                    record["answer"] = (await Runner.run(agent, question)).final_output
+                stats["answered"] += 1
+            except Exception as e:
+                record["error"] = str(e)
+                stats["failed"] += 1
+            record["latency_s"] = round(time.perf_counter() - started, 3)
+            latencies.append(record["latency_s"])
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+    started = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    for qid, question in questions:
+        if qid in done:
+            stats["skipped"] += 1
+            continue
+        await queue.put((qid, question))
+    for _ in workers:
+        await queue.put(None)
+    await asyncio.gather(*workers)
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    processed = stats["answered"] + stats["failed"]
+    return stats | {
+        "elapsed_s": round(elapsed, 2),
+        "questions_per_min": round(processed / elapsed * 60, 1) if elapsed else 0.0,
+        "latency_p50_s": percentile(latencies, 0.50),
+        "latency_p95_s": percentile(latencies, 0.95),
+        "latency_p99_s": percentile(latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answer a question bank with the Smart Student Agent.")
+    parser.add_argument("input", help="question file (text or JSONL), or - for stdin")
+    parser.add_argument("-o", "--output", required=True, help="answers JSONL (appended to, used for resume)")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="questions in flight at once")
+    parser.add_argument("--cache", default=CACHE_PATH, help="answer cache database")
+    parser.add_argument("--no-cache", action="store_true", help="always call the model")
+    parser.add_argument("--near-duplicates", action="store_true",
+                        help="also reuse answers to questions that only differ in filler words and word endings")
+    args = parser.parse_args()
+
+    done = load_checkpoint(args.output)
+    cache = None if args.no_cache else AnswerCache(args.cache, near_duplicates=args.near_duplicates)
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with source, open(args.output, "a", encoding="utf-8") as out:
+        report = asyncio.run(run_batch(read_questions(source), out, args.concurrency, done, cache))
+    if cache is not None:
+        report["cache"] = cache.stats()
+        cache.close()
+    # Where the time went: model, tool and agent latency percentiles
+    report["stages"] = stage_summary()
+    flush_traces()
+    print(json.dumps(report, indent=2), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
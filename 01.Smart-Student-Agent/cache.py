@@ -0,0 +1,241 @@
+"""On-disk answer cache for the Smart Student Agent.
+
+Answers are stored in SQLite, keyed by the normalized question plus the
+agent's instructions and model, so changing the prompt or model never serves
+stale answers. Entries expire after a TTL and the least recently used ones
+are evicted once the cache grows past its entry/size limits.
+
+Near-duplicate matching is opt-in (near_duplicates=True): questions that
+only differ in filler words and word endings ("Can you explain photosynthesis
+please?" / "explain the photosynthesis") then share an entry. The near key
+keeps question words, numbers, operators and word order, so "When was ..." /
+"Where was ...", "5 - 3" / "3 + 5" and "10 km to miles" / "10 miles to km"
+stay apart.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import Agent, Runner
+
+CACHE_PATH = os.getenv("ANSWER_CACHE_PATH", "answers_cache.sqlite")
+CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "100000"))
+CACHE_MAX_BYTES = int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Expired entries are swept at most this often (a lookup still never serves one)
+PURGE_INTERVAL_S = 60
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers (decimals included) and arithmetic/comparison operators;
+# other punctuation is ignored
+TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[^\W\d_]+|[-+*/×÷=^%<>]")
+# Only politeness and articles: question words, prepositions and verbs change
+# what is being asked and stay in the near key
+FILLER_WORDS = frozenset("a an the please kindly can could would you me i just tell explain".split())
+SUFFIXES = ("ing", "ers", "er", "ed", "es", "s")
+
+
+def tokens(question: str) -> list[str]:
+    return TOKEN_RE.findall(question.lower())
+
+
+def normalize(question: str) -> str:
+    return " ".join(tokens(question))
+
+
+def stem(word: str) -> str:
+    if word.isalpha():
+        for suffix in SUFFIXES:
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                return word[: -len(suffix)]
+    return word
+
+
+def near_key(question: str) -> str:
+    """The question's crudely stemmed words in order, without filler words."""
+    return " ".join(stem(word) for word in tokens(question) if word not in FILLER_WORDS)
+
+
+def agent_fingerprint(agent: Agent) -> str:
+    model = getattr(agent.model, "model", agent.model)
+    return hashlib.sha256(f"{agent.instructions}\0{model}".encode()).hexdigest()[:16]
+
+
+class AnswerCache:
+    """SQLite answer cache. get() and put() block; async callers go through answer(), which runs them on the
+    cache's own I/O thread so the event loop never waits on the database."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 max_bytes=CACHE_MAX_BYTES, near_duplicates=False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.near_duplicates = near_duplicates
+        # Used from the I/O thread, one query at a time
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                near TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                cost_s REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS answers_near ON answers (near);
+            CREATE INDEX IF NOT EXISTS answers_accessed ON answers (accessed);
+            CREATE INDEX IF NOT EXISTS answers_created ON answers (created);
+        """)
+        # Running totals, so an insert never counts the whole table (recounted on open)
+        self.entries, self.bytes = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM answers").fetchone()
+        self._purged = 0.0
+        # Every database call from answer() runs here, in order, off the event loop
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="answer-cache")
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.write_errors = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+        self.saved_seconds = 0.0
+        self._inflight = {}
+
+    def _keys(self, agent: Agent, question: str) -> tuple[str, str]:
+        fingerprint = agent_fingerprint(agent)
+        key = hashlib.sha256(f"{fingerprint}\0{normalize(question)}".encode()).hexdigest()
+        return key, f"{fingerprint}:{near_key(question)}"
+
+    def get(self, agent: Agent, question: str) -> str | None:
+        key, near = self._keys(agent, question)
+        now = time.time()
+        row = self.db.execute("SELECT key, answer, created, cost_s FROM answers WHERE key = ?", (key,)).fetchone()
+        near_hit = False
+        if row is None and self.near_duplicates:
+            row = self.db.execute(
+                "SELECT key, answer, created, cost_s FROM answers WHERE near = ? ORDER BY accessed DESC LIMIT 1",
+                (near,),
+            ).fetchone()
+            near_hit = row is not None
+        if row is None:
+            return None
+        found_key, answer, created, cost_s = row
+        if now - created > self.ttl:
+            self._delete("DELETE FROM answers WHERE key = ? RETURNING size", (found_key,))
+            self.db.commit()
+            return None
+        self.db.execute("UPDATE answers SET accessed = ? WHERE key = ?", (now, found_key))
+        self.db.commit()
+        self.near_hits += near_hit
+        self.saved_seconds += cost_s
+        return answer
+
+    def put(self, agent: Agent, question: str, answer: str, cost_s: float = 0.0):
+        key, near = self._keys(agent, question)
+        now = time.time()
+        size = len(answer.encode())
+        old = self.db.execute("SELECT size FROM answers WHERE key = ?", (key,)).fetchone()
+        self.db.execute(
+            "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, near, answer, now, now, size, cost_s),
+        )
+        self.entries += old is None
+        self.bytes += size - (old[0] if old else 0)
+        self._evict()
+        self.db.commit()
+
+    def _delete(self, sql: str, params=()):
+        """Runs a DELETE ... RETURNING size and takes the removed rows off the running totals."""
+        sizes = self.db.execute(sql, params).fetchall()
+        self.entries -= len(sizes)
+        self.bytes -= sum(size for size, in sizes)
+
+    def _evict(self):
+        now = time.time()
+        if now - self._purged >= PURGE_INTERVAL_S:
+            self._purged = now
+            self._delete("DELETE FROM answers WHERE created < ? RETURNING size", (now - self.ttl,))
+        if self.entries <= self.max_entries and self.bytes <= self.max_bytes:
+            return
+        # Drop the least recently used tenth in one go instead of one row per insert
+        target = min(self.max_entries, self.entries) * 9 // 10
+        self._delete(
+            "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY accessed LIMIT ?) RETURNING size",
+            (self.entries - target,),
+        )
+        while self.bytes > self.max_bytes and self.entries:
+            self._delete(
+                "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY accessed LIMIT 100) RETURNING size"
+            )
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, method, *args)
+
+    def _stored(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            self.write_errors += 1
+            logger.warning("Could not cache an answer: %s", future.exception())
+
+    async def answer(self, agent: Agent, question: str) -> str:
+        """Returns the cached answer, or runs the agent and caches its answer."""
+        started = time.perf_counter()
+        # Identical questions already in flight share one model call
+        key = self._keys(agent, question)[0]
+        pending = self._inflight.get(key)
+        if pending is None:
+            cached = await self._run(self.get, agent, question)
+            if cached is not None:
+                self.hits += 1
+                self.hit_seconds += time.perf_counter() - started
+                return cached
+            pending = self._inflight.get(key)  # started while we were looking
+        if pending is not None:
+            # Answered by the call already in flight: counted and timed like a cache hit
+            answer = await asyncio.shield(pending)
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - started
+            return answer
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await Runner.run(agent, question)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            del self._inflight[key]
+        elapsed = time.perf_counter() - started
+        self.misses += 1
+        self.miss_seconds += elapsed
+        # Written in the background; close() waits for queued writes
+        self._io.submit(self.put, agent, question, result.final_output, elapsed).add_done_callback(self._stored)
+        future.set_result(result.final_output)
+        return result.final_output
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "avg_hit_ms": round(self.hit_seconds / self.hits * 1000, 2) if self.hits else 0.0,
+            "avg_miss_ms": round(self.miss_seconds / self.misses * 1000, 1) if self.misses else 0.0,
+            "saved_s": round(self.saved_seconds, 1),
+            "entries": self.entries,
+            "size_kb": round(self.bytes / 1024, 1),
+            "write_errors": self.write_errors,
+        }
+
+    def close(self):
+        self._io.shutdown(wait=True)
+        self.db.close()
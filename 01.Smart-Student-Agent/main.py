@@ -1,16 +1,20 @@
-from agents import Agent, Runner, set_tracing_disabled, AsyncOpenAI, OpenAIChatCompletionsModel
+from agents import Agent, AsyncOpenAI, OpenAIChatCompletionsModel
 from dotenv import load_dotenv
+import asyncio
 import os
 
+from agent_common.tracing_local import install_local_tracing
+
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 provider = AsyncOpenAI(
     api_key= GEMINI_API_KEY,
-    base_url="https://generativelanguage.googleapis.com/v1beta/openai",
+    base_url=os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai"),
 )
-set_tracing_disabled(disabled=True)
+# Traces are timed and written locally (traces/spans.jsonl), never uploaded
+install_local_tracing()
 
 
 client = OpenAIChatCompletionsModel(
@@ -30,7 +34,13 @@ Always be friendly, clear, and student-focused.
     model=client,
 )
 
-result = Runner.run_sync(agent, 'who is the founder of Pakistan?')
+if __name__ == "__main__":
+    from cache import AnswerCache
+
+    # Repeated questions are answered from the on-disk cache
+    cache = AnswerCache()
+    answer = asyncio.run(cache.answer(agent, 'who is the founder of Pakistan?'))
 
-print(result.final_output)
+    print(answer)
+    print(cache.stats())
 
@@ -0,0 +1,100 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from agents import Agent
+
+import cache as cache_module
+from cache import AnswerCache, near_key, normalize
+
+
+@pytest.fixture
+def agent():
+    return Agent(name="Tutor", instructions="Answer study questions.", model="gemini-2.0-flash")
+
+
+@pytest.fixture
+def answers(tmp_path):
+    cache = AnswerCache(str(tmp_path / "answers.sqlite"), near_duplicates=True)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize("first, second", [
+    ("What is 5 - 3?", "What is 3 + 5?"),
+    ("What is 2.5 * 4?", "What is 25 * 4?"),
+    ("Convert 10 km to miles", "Convert 10 miles to km"),
+    ("When was Pakistan founded?", "Where was Pakistan founded?"),
+    ("Is 7 > 3?", "Is 7 < 3?"),
+])
+def test_different_questions_get_different_keys(first, second):
+    assert normalize(first) != normalize(second)
+    assert near_key(first) != near_key(second)
+
+
+def test_filler_words_and_word_endings_share_a_near_key():
+    assert near_key("Can you please explain photosynthesis?") == near_key("photosynthesis")
+    assert near_key("Explain the planets") == near_key("planet")
+    assert normalize("  What IS  photosynthesis?? ") == normalize("what is photosynthesis")
+
+
+def test_put_and_get(answers, agent):
+    answers.put(agent, "What is photosynthesis?", "Plants making food from light.")
+    assert answers.get(agent, "what is photosynthesis") == "Plants making food from light."
+    assert answers.get(agent, "What is respiration?") is None
+
+
+def test_near_duplicates_are_opt_in(tmp_path, agent):
+    exact_only = AnswerCache(str(tmp_path / "exact.sqlite"))
+    exact_only.put(agent, "Explain photosynthesis please", "Light to sugar.")
+    assert exact_only.get(agent, "photosynthesis") is None
+    exact_only.close()
+
+
+def test_near_duplicate_hit(answers, agent):
+    answers.put(agent, "Explain photosynthesis please", "Light to sugar.")
+    assert answers.get(agent, "Can you explain the photosynthesis?") == "Light to sugar."
+    assert answers.near_hits == 1
+
+
+def test_another_prompt_or_model_never_shares_answers(answers, agent):
+    answers.put(agent, "What is 2 + 2?", "4")
+    other = Agent(name="Tutor", instructions="Answer in French.", model="gemini-2.0-flash")
+    assert answers.get(other, "What is 2 + 2?") is None
+
+
+def test_expired_answers_are_not_served(answers, agent):
+    answers.ttl = -1
+    answers.put(agent, "What is 2 + 2?", "4")
+    assert answers.get(agent, "What is 2 + 2?") is None
+    assert answers.entries == 0
+
+
+def test_running_totals_match_the_table_after_eviction(tmp_path, agent):
+    answers = AnswerCache(str(tmp_path / "small.sqlite"), max_entries=20)
+    for i in range(45):
+        answers.put(agent, f"Question {i}?", "x" * 60)
+    count, size = answers.db.execute("SELECT COUNT(*), SUM(size) FROM answers").fetchone()
+    assert (answers.entries, answers.bytes) == (count, size)
+    assert answers.entries <= 20
+    answers.close()
+
+
+def test_concurrent_identical_questions_share_one_model_call(answers, agent, monkeypatch):
+    calls = []
+
+    async def fake_run(agent, question):
+        calls.append(question)
+        await asyncio.sleep(0.05)
+        return SimpleNamespace(final_output="Light to sugar.")
+
+    monkeypatch.setattr(cache_module, "Runner", SimpleNamespace(run=fake_run))
+
+    async def main():
+        return await asyncio.gather(*(answers.answer(agent, "What is photosynthesis?") for _ in range(3)))
+
+    assert asyncio.run(main()) == ["Light to sugar."] * 3
+    assert len(calls) == 1
+    stats = answers.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["avg_hit_ms"] >= 40  # they waited for the shared call
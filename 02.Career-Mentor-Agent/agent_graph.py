@@ -0,0 +1,95 @@
+from types import MappingProxyType
+
+from agent_common.tiers import apply_tiers
+from agent_common.tool_cache import memoize
+from agents import Agent, function_tool
+
+from career_kb import MAX_RESULTS, kb, normalize
+
+# The agent graph is built once per process, on top of the shared career
+# knowledge base. Chat sessions only hold a reference to it; per-session state
+# (chat history) lives in the session store.
+
+# Model tier per agent (see agent_common.tiers): routing on the fast model, answers cascade
+TIER_POLICY = {"triage_agent": "fast", "career_agent": "cascade", "skill_agent": "cascade", "job_agent": "fast"}
+
+
+# Career roadmap tools
+@function_tool
+@memoize(key=normalize)
+def get_career_roadmap(career: str) -> dict:
+    """Generates a skill-building roadmap for a given career in 2025 (aliases and close spellings work)."""
+    return kb.roadmap(career)
+
+
+@function_tool
+@memoize()
+def find_careers(skills: list[str] | None = None, careers: list[str] | None = None, course: str | None = None,
+                 max_months: int | None = None) -> dict:
+    """Answers multi-career questions in one call: careers ranked by how many of the given skills they use,
+    optionally filtered by course and time to learn the basics, plus side-by-side roadmaps for named careers.
+
+    Args:
+        skills: Skills the user has or asks about, e.g. ["Python", "Docker"]. Careers using more of them rank first.
+        careers: Careers to return full roadmaps for, e.g. ["data scientist", "ui/ux designer"].
+        course: Words a recommended course must contain, e.g. "Coursera" or "Google UX".
+        max_months: Only careers whose basics can be learned within this many months.
+    """
+    answer = {}
+    if careers:
+        answer["roadmaps"] = [kb.roadmap(name) for name in careers[:MAX_RESULTS]]
+    if skills or course or max_months is not None or not careers:
+        answer |= kb.find(skills, course, max_months)
+    return answer
+
+
+def build_registry():
+    """Builds every agent and returns a read-only name -> agent mapping."""
+    # Define agents with concise instructions
+    CareerAgent = Agent(
+        name="career_agent",
+        instructions="""
+        Suggest 2-3 tech/freelancing careers matching user interests with brief reasons why they fit. Tailor for 2025 Pakistan/global demand. End with “Want skills or job details?” Use chat history to personalize. Keep answers short, friendly, and focused on USD/₹ earnings. To match interests or skills to careers, call find_careers once.
+        """,
+        handoff_description="Handles career exploration.",
+        tools=[find_careers]
+    )
+
+    SkillAgent = Agent(
+        name="skill_agent",
+        instructions="""
+        For skill queries (e.g., “how to earn on Upwork”), deliver a roadmap with skills, profile setup, courses, and success tips in a markdown table. Tailor for Pakistan beginners, emphasizing 2025 trends (e.g., Agentic AI). Use chat history for context. End with “Want job details?” Answer directly and concisely. Use get_career_roadmap for one career; for several careers or skill questions (e.g., “which careers use Python and Docker?”) call find_careers once.
+        """,
+        handoff_description="Handles skill queries.",
+        tools=[get_career_roadmap, find_careers]
+    )
+
+    JobAgent = Agent(
+        name="job_agent",
+        instructions="""
+        For job queries (e.g., “what’s freelancing like”), describe roles, responsibilities, work environment, and USD/₹ earnings for Pakistan in 2025. Suggest related tech jobs if unsupported. End with “Need skills to start?” Use chat history for context. Keep answers direct and friendly.
+        """,
+        handoff_description="Handles job role queries."
+    )
+
+    triage_agent = Agent(
+        name="triage_agent",
+        instructions="""
+        Route user queries to the right agent based on intent: CareerAgent for interests (e.g., “tech”), SkillAgent for skill queries (e.g., “skills for freelancing”), or JobAgent for job details (e.g., “what’s freelancing like”). Extract key terms (e.g., “Upwork,” “Agentic AI”) and use chat history for follow-up context. If unclear, route to CareerAgent and ask for interests. Deliver answers seamlessly as one responder, focusing on Pakistan’s 2025 job market with USD/₹ earnings.
+        """,
+        handoff_description="Hand back here only when the user changes to a topic outside your specialty.",
+        handoffs=[CareerAgent, SkillAgent, JobAgent]
+    )
+
+    # Specialists keep the conversation on follow-up turns and hand back to
+    # triage_agent only when the topic changes
+    for specialist in (CareerAgent, SkillAgent, JobAgent):
+        specialist.handoffs.append(triage_agent)
+
+    agents = (CareerAgent, SkillAgent, JobAgent, triage_agent)
+    apply_tiers(agents, TIER_POLICY)
+    return MappingProxyType({agent.name: agent for agent in agents})
+
+
+REGISTRY = build_registry()
+triage_agent = REGISTRY["triage_agent"]
@@ -0,0 +1,255 @@
+import bisect
+import difflib
+import heapq
+from itertools import islice
+import json
+import os
+import sys
+import unicodedata
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Career roadmap knowledge base: careers, skills, courses and timelines loaded
+# once from data/careers.json into compact records, with inverted indexes from
+# skills, course words and time-to-basics to careers. Career and skill names
+# resolve through an exact/alias map first (O(1)) and a trigram index for
+# typos ("data scientst", "kubernets"), so one tool call can answer "which
+# careers use Python and Docker?" or return several roadmaps at once.
+CAREERS_PATH = os.getenv("CAREERS_PATH", os.path.join(os.path.dirname(__file__), "data", "careers.json"))
+FUZZY_CUTOFF = 0.75
+MAX_RESULTS = 10
+
+
+def normalize(name: str) -> str:
+    """Lowercase, accent-free, single-spaced form used for every lookup ("C++" and "C#" keep their symbols)."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join("".join(c if c.isalnum() or c in "+#" else " " for c in name.lower()).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyNames:
+    """Name -> key map with exact lookups and a trigram index for close spellings."""
+
+    def __init__(self, cache_size=4096):
+        self.keys: dict[str, str] = {}
+        self._names: list[str] = []
+        self._trigram_index: dict[str, array] = {}
+        # A cache per instance, so career and skill lookups are cached and counted separately
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    def add(self, name: str, key: str):
+        name = normalize(name)
+        if name and name not in self.keys:
+            self.keys[name] = key
+            position = len(self._names)
+            self._names.append(name)
+            for gram in trigrams(name):
+                self._trigram_index.setdefault(gram, array("I")).append(position)
+
+    def _resolve(self, query: str) -> str | None:
+        query = normalize(query)
+        if not query:
+            return None
+        key = self.keys.get(query)
+        if key:
+            return key
+        # Shortlist names sharing the most trigrams, then score them properly
+        # (very common trigrams are skipped so the shortlist stays cheap on big indexes)
+        shared = Counter()
+        too_common = max(200, len(self._names) // 500)
+        for gram in trigrams(query):
+            postings = self._trigram_index.get(gram, ())
+            if len(postings) <= too_common:
+                shared.update(postings)
+        best, best_score = None, FUZZY_CUTOFF
+        for position, _ in shared.most_common(10):
+            name = self._names[position]
+            score = difflib.SequenceMatcher(None, query, name).ratio()
+            if score > best_score:
+                best, best_score = name, score
+        return self.keys[best] if best else None
+
+
+@dataclass(frozen=True, slots=True)
+class Career:
+    key: str
+    name: str
+    skills: tuple[str, ...]
+    courses: tuple[str, ...]
+    timeline: str
+    months_to_basics: int
+    months_to_proficiency: int
+
+    def roadmap(self) -> dict:
+        return {
+            "career": self.name,
+            "skills": list(self.skills),
+            "courses": list(self.courses),
+            "timeline": self.timeline,
+        }
+
+
+class CareerKB:
+    def __init__(self, data: dict):
+        self.default = data["default"]
+        self.careers: dict[str, Career] = {}
+        self.career_names = FuzzyNames()
+        self.skill_names = FuzzyNames()  # any spelling -> canonical normalized skill
+        self.skill_labels: dict[str, str] = {}  # canonical normalized skill -> display name
+        # Inverted indexes: term -> positions into self._order
+        self._order: list[str] = []
+        self.by_skill: dict[str, array] = {}
+        self.by_course_word: dict[str, array] = {}
+        self._course_words: list[frozenset] = []  # per position, to filter small candidate sets directly
+        self.by_months: list[tuple[int, int]] = []  # (months to basics, position), sorted
+
+        intern = sys.intern
+        for raw in data["careers"]:
+            key = normalize(raw["name"])
+            months = raw.get("months") or (0, 0)
+            career = Career(
+                key=key,
+                name=raw["name"],
+                skills=tuple(intern(s) for s in raw["skills"]),
+                courses=tuple(intern(c) for c in raw["courses"]),
+                timeline=raw["timeline"],
+                months_to_basics=months[0],
+                months_to_proficiency=months[-1],
+            )
+            position = len(self._order)
+            self._order.append(key)
+            self.careers[key] = career
+            for alias in [raw["name"], *raw.get("aliases", ())]:
+                self.career_names.add(alias, key)
+            for skill in career.skills:
+                skill_key = normalize(skill)
+                self.skill_labels.setdefault(skill_key, skill)
+                self.skill_names.add(skill, skill_key)
+                self.by_skill.setdefault(skill_key, array("I")).append(position)
+            course_words = frozenset(w for course in career.courses for w in normalize(course).split() if len(w) > 2)
+            self._course_words.append(course_words)
+            for word in course_words:
+                self.by_course_word.setdefault(word, array("I")).append(position)
+            self.by_months.append((career.months_to_basics, position))
+        self.by_months.sort()
+        # Tie-break order (fewer skills to learn, then quicker start), precomputed
+        # so ranking a query only compares skill overlap and one int
+        self._by_effort = sorted(range(len(self._order)), key=lambda p: (
+            len(self.careers[self._order[p]].skills), self.careers[self._order[p]].months_to_basics, p))
+        self._effort_rank = array("I", bytes(4 * len(self._order)))
+        for rank, position in enumerate(self._by_effort):
+            self._effort_rank[position] = rank
+        for alias, skill in data.get("skill_aliases", {}).items():
+            self.skill_names.add(alias, normalize(skill))
+            self.skill_labels.setdefault(normalize(skill), skill)
+        self.lookups = 0
+
+    @classmethod
+    def load(cls, path=CAREERS_PATH) -> "CareerKB":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def resolve(self, name: str) -> Career | None:
+        """Finds a career by name, alias or close spelling."""
+        key = self.career_names.resolve(name)
+        return self.careers[key] if key else None
+
+    def roadmap(self, name: str) -> dict:
+        """The career's roadmap, or the general one (marked as such) when it is not in the knowledge base."""
+        self.lookups += 1
+        career = self.resolve(name)
+        if career is None:
+            return {"career": name, "matched": False, **self.default}
+        return career.roadmap()
+
+    def mentions(self, text: str) -> list[Career]:
+        """Careers named in free text (by name or alias, up to three words), in order of appearance."""
+        words = normalize(text).split()
+        found = {}
+        for i in range(len(words)):
+            for n in (3, 2, 1):
+                key = self.career_names.keys.get(" ".join(words[i:i + n]))
+                if key:
+                    found.setdefault(key, self.careers[key])
+                    break
+        return list(found.values())
+
+    def find(self, skills: list[str] | None = None, course: str | None = None,
+             max_months: int | None = None, top_k: int = 5) -> dict:
+        """Careers ranked by how many of the given skills they use, filtered by course and time to basics.
+
+        Ties go to the career with fewer other skills to learn, then the
+        quicker start.
+        """
+        self.lookups += 1
+        top_k = max(1, min(top_k, MAX_RESULTS))
+        wanted, unknown = {}, []
+        for skill in skills or ():
+            key = self.skill_names.resolve(skill)
+            if key is None:
+                unknown.append(skill)
+            else:
+                wanted[key] = self.skill_labels[key]
+
+        overlap = Counter()
+        for key in wanted:
+            overlap.update(self.by_skill.get(key, ()))
+        # Each filter uses its index when it is the first one, and checks the
+        # (already narrowed) candidates directly otherwise
+        candidates = set(overlap) if skills else None
+        if course:
+            words = frozenset(w for w in normalize(course).split() if len(w) > 2)
+            if candidates is not None:
+                candidates = {p for p in candidates if words <= self._course_words[p]}
+            elif words:
+                candidates = set.intersection(*(set(self.by_course_word.get(w, ())) for w in words))
+            else:
+                candidates = set()
+        if max_months is not None:
+            if candidates is not None:
+                candidates = {p for p in candidates if self.careers[self._order[p]].months_to_basics <= max_months}
+            else:
+                end = bisect.bisect_right(self.by_months, (max_months, len(self._order)))
+                candidates = {position for _, position in self.by_months[:end]}
+
+        results = []
+        for position in self._top(candidates, overlap, bool(wanted), top_k):
+            career = self.careers[self._order[position]]
+            entry = career.roadmap()
+            if wanted:
+                have = {normalize(s) for s in career.skills}
+                entry["matched_skills"] = [label for key, label in wanted.items() if key in have]
+                entry["other_skills"] = [s for s in career.skills if normalize(s) not in wanted]
+            results.append(entry)
+        answer = {"results": results, "total_matches": len(self._order) if candidates is None else len(candidates)}
+        if unknown:
+            answer["unknown_skills"] = unknown
+        if not results:
+            answer["message"] = "No career matches all of these filters. Try fewer skills or a longer timeline."
+        return answer
+
+    def _top(self, positions: set | None, overlap: Counter, by_overlap: bool, top_k: int) -> list[int]:
+        if by_overlap:
+            rank = self._effort_rank
+            return heapq.nsmallest(top_k, positions, key=lambda p: (-overlap[p], rank[p]))
+        if positions is None:
+            return self._by_effort[:top_k]
+        return list(islice((p for p in self._by_effort if p in positions), top_k))
+
+    def stats(self) -> dict:
+        return {
+            "careers": len(self.careers),
+            "skills": len(self.by_skill),
+            "lookups": self.lookups,
+            "career_resolve_cache": self.career_names.resolve.cache_info()._asdict(),
+            "skill_resolve_cache": self.skill_names.resolve.cache_info()._asdict(),
+        }
+
+
+kb = CareerKB.load()
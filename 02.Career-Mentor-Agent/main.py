@@ -1,9 +1,24 @@
-from agents import Agent, Runner, RunConfig, OpenAIChatCompletionsModel, function_tool
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
-import chainlit as cl
-from typing import cast
+import logging
 import os
+
+from agent_common.affinity import AgentAffinity
+from agent_common.health import loop_lag, session_stats
+from agent_common.memory import ConversationMemory
+from agent_common.provider import aclose, get_run_config, pool_metrics, scheduler_stats, tier_stats, warm_up
+from agent_common.scheduler import set_session
+from agent_common.session_store import sessions
+from agent_common.streaming import run_into_message, ttft_summary
+from agent_common.supervisor import RunSupervisor, Superseded, supervisor_stats
+from agent_common.tool_cache import tool_cache_stats
+from agent_common.tracing_local import flush as flush_traces, install_local_tracing, mount_metrics, stage_summary
+from agent_common.usage import ledger
+import chainlit as cl
+from dotenv import load_dotenv
+
+from agent_graph import REGISTRY, triage_agent
+from career_kb import kb
+from router import router
+
 # Load environment variables
 load_dotenv()
 gemini_api_key = os.getenv("GEMINI_API_KEY")
@@ -11,154 +26,138 @@ gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY is not set.")
 
+logger = logging.getLogger(__name__)
+affinity = AgentAffinity(REGISTRY, triage_agent.name)
+
+# Agent, handoff, tool and model spans stay on this machine; per-stage
+# latency percentiles and the other runtime stats are served on /metrics
+install_local_tracing()
+METRICS = {
+    "pool": pool_metrics,
+    "ttft": ttft_summary,
+    "tiers": tier_stats,
+    "scheduler": scheduler_stats,
+    "supervisor": supervisor_stats,
+    "loop_lag": loop_lag.snapshot,
+    "sessions": session_stats,
+    "usage": ledger.stats,
+    "session_store": sessions.stats,
+    "routing": router.stats,
+    "affinity": affinity.stats,
+    "career_kb": kb.stats,
+    "tool_cache": tool_cache_stats,
+}
+
+
+@cl.on_app_startup
+async def startup():
+    # Open pooled connections to the model API before the first chat arrives
+    await warm_up()
+    loop_lag.start()
+    from chainlit.server import app
+    mount_metrics(app, extra=METRICS)
+
+
+@cl.on_app_shutdown
+async def shutdown():
+    logger.info("Model connection pool at shutdown: %s", pool_metrics())
+    logger.info("Time to first token: %s", ttft_summary())
+    logger.info("Model tiers: %s", tier_stats())
+    logger.info("Request scheduler: %s", scheduler_stats())
+    logger.info("Run supervision: %s", supervisor_stats())
+    logger.info("Stage latency: %s", stage_summary())
+    logger.info("Token usage: %s", ledger.stats())
+    logger.info("Event loop lag: %s", loop_lag.snapshot())
+    logger.info("Local routing: %s", router.stats())
+    logger.info("Agent affinity: %s", affinity.stats())
+    logger.info("Career knowledge base: %s", kb.stats())
+    logger.info("Tool cache: %s", tool_cache_stats())
+    logger.info("Session store: %s", sessions.stats())
+    await sessions.close()
+    loop_lag.stop()
+    flush_traces()
+    await aclose()
+
+
 @cl.on_chat_start
 async def start():
-    # Initialize AsyncOpenAI client
-    client = AsyncOpenAI(
-        api_key=gemini_api_key,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai"
-    )
-
-    # Define the model
-    model = OpenAIChatCompletionsModel(
-        model="gemini-2.0-flash",
-        openai_client=client
-    )
-
-    # Configure the runner
-    config = RunConfig(
-        model=model,
-        model_provider=client,
-        tracing_disabled=True
-    )
-
-    # Career roadmap tool
-    @function_tool
-    def get_career_roadmap(career):
-        """Generates a skill-building roadmap for a given career in 2025."""
-        roadmaps = {
-            "machine learning engineer": {
-                "skills": ["Python", "TensorFlow", "PyTorch", "Machine Learning", "Deep Learning", "Mathematics"],
-                "courses": ["Deep Learning Specialization (Coursera)", "Scaler AI & ML Course", "Introduction to AI (IBM SkillsBuild)"],
-                "timeline": "6-12 months for basics; 1-2 years for proficiency"
-            },
-            "data scientist": {
-                "skills": ["Python", "R", "SQL", "Machine Learning", "Statistics", "Data Visualization"],
-                "courses": ["Data Science (Coursera)", "Python for Data Science (Udemy)", "Data Engineering Fundamentals (edX)"],
-                "timeline": "6-18 months based on math background"
-            },
-            "cybersecurity analyst": {
-                "skills": ["Threat Analysis", "Ethical Hacking", "Python", "Networking", "AI-powered Cybersecurity"],
-                "courses": ["Google IT Support (Coursera)", "Complete Cyber Security Course (Udemy)", "Cisco Networking Academy"],
-                "timeline": "6-12 months for entry-level; 1-2 years for advanced"
-            },
-            "ui/ux designer": {
-                "skills": ["Figma", "User Research", "Wireframing", "UI Design", "Basic JavaScript"],
-                "courses": ["Google UX Design (Coursera)", "UI/UX Design Bootcamp (Udemy)", "FreeCodeCamp UI Design"],
-                "timeline": "3-6 months for basics; 1 year for proficiency"
-            },
-            "cloud computing": {
-                "skills": ["Kubernetes", "Docker", "AWS", "Azure", "Linux", "CI/CD", "Networking"],
-                "courses": ["Google Cloud DevOps Engineer (Coursera)", "Kubernetes for Beginners (Udemy)", "Certified Kubernetes Administrator (Linux Foundation)"],
-                "timeline": "3-6 months for basics; 6-12 months for proficiency"
-            },
-            "agentic ai": {
-                "skills": ["Python", "LangChain", "LLM APIs", "Reinforcement Learning", "Prompt Engineering", "Workflow Automation"],
-                "courses": ["Building AI Agents with LangChain (Coursera)", "Mastering LLMs (Udemy)", "Reinforcement Learning Specialization (DeepLearning.AI)"],
-                "timeline": "6-12 months for basics; 1-2 years for proficiency"
-            },
-            "freelancing": {
-                "skills": ["Graphic Design", "Writing", "Virtual Assistance", "Agentic AI", "Digital Marketing"],
-                "courses": ["Graphic Design (Coursera)", "Writing Essentials (Udemy)", "Virtual Assistant Training (Udemy)", "Building AI Agents (Coursera)"],
-                "timeline": "3-6 months for basics; 1-2 months for first client"
-            },
-            "default": {
-                "skills": ["Python", "Basic IT skills", "Research required"],
-                "courses": ["Explore Coursera, edX, Udemy", "FreeCodeCamp", "Kaggle Tutorials"],
-                "timeline": "Varies by career"
-            }
-        }
-        return roadmaps.get(career.lower(), roadmaps["default"])
-
-    # Initialize chat history
-    cl.user_session.set("chat_history", [])
-
-    # Define agents with concise instructions
-    CareerAgent = Agent(
-        name="career_agent",
-        instructions="""
-        Suggest 2-3 tech/freelancing careers matching user interests with brief reasons why they fit. Tailor for 2025 Pakistan/global demand. End with “Want skills or job details?” Use chat history to personalize. Keep answers short, friendly, and focused on USD/₹ earnings.
-        """,
-        handoff_description="Handles career exploration."
-    )
-
-    SkillAgent = Agent(
-        name="skill_agent",
-        instructions="""
-        For skill queries (e.g., “how to earn on Upwork”), deliver a roadmap with skills, profile setup, courses, and success tips in a markdown table. Tailor for Pakistan beginners, emphasizing 2025 trends (e.g., Agentic AI). Use chat history for context. End with “Want job details?” Answer directly and concisely.
-        """,
-        handoff_description="Handles skill queries.",
-        tools=[get_career_roadmap]
-    )
-
-    JobAgent = Agent(
-        name="job_agent",
-        instructions="""
-        For job queries (e.g., “what’s freelancing like”), describe roles, responsibilities, work environment, and USD/₹ earnings for Pakistan in 2025. Suggest related tech jobs if unsupported. End with “Need skills to start?” Use chat history for context. Keep answers direct and friendly.
-        """,
-        handoff_description="Handles job role queries."
-    )
-
-    triage_agent = Agent(
-        name="triage_agent",
-        instructions="""
-        Route user queries to the right agent based on intent: CareerAgent for interests (e.g., “tech”), SkillAgent for skill queries (e.g., “skills for freelancing”), or JobAgent for job details (e.g., “what’s freelancing like”). Extract key terms (e.g., “Upwork,” “Agentic AI”) and use chat history for follow-up context. If unclear, route to CareerAgent and ask for interests. Deliver answers seamlessly as one responder, focusing on Pakistan’s 2025 job market with USD/₹ earnings.
-        """,
-        handoffs=[CareerAgent, SkillAgent, JobAgent]
-    )
-
-    # Store agents and config
-    cl.user_session.set("career_agent", CareerAgent)
-    cl.user_session.set("skill_agent", SkillAgent)
-    cl.user_session.set("job_agent", JobAgent)
-    cl.user_session.set("triage_agent", triage_agent)
-    cl.user_session.set("config", config)
+    # Agents and config are shared; the conversation lives in the session
+    # store (restored if this chat was already going on another worker)
+    state = await sessions.get(cl.context.session.thread_id)
+    state.setdefault("memory", ConversationMemory())
+    cl.user_session.set("supervisor", RunSupervisor())
 
     await cl.Message(
         content="Welcome to Career Mentor! Ask about tech jobs, skills, or earning online."
     ).send()
 
+@cl.on_chat_end
+async def end():
+    # None when on_chat_start failed before creating it
+    if (supervisor := cl.user_session.get("supervisor")) is not None:
+        supervisor.cancel()
+    # Written back and dropped from this worker; a reconnect loads it again
+    await sessions.evict(cl.context.session.thread_id)
+
 @cl.on_message
 async def main(message: cl.Message):
+    # Fair queuing of this turn's model requests across sessions
+    set_session(cl.user_session.get("id"))
+
     msg = cl.Message(content="Thinking...")
     await msg.send()
 
-    triage_agent: Agent = cast(Agent, cl.user_session.get("triage_agent"))
-    config: RunConfig = cast(RunConfig, cl.user_session.get("config"))
-    history = cl.user_session.get("chat_history") or []
+    config = get_run_config()
+    key = cl.context.session.thread_id
+    state = await sessions.get(key)
+    memory: ConversationMemory = state.setdefault("memory", ConversationMemory())
 
     # Use raw input
     user_input = message.content
 
+    # Keep the career the user asked about, even after old turns are summarized
+    for career in kb.mentions(user_input):
+        memory.pin("career interest", career.name)
+
     # Append to history
-    history.append({"role": "user", "content": user_input})
+    memory.add("user", user_input)
 
+    turn = None
     try:
-        # Pass chat history
-        result = await Runner.run(
-            starting_agent=triage_agent,
-            input=history,
-            run_config=config
-        )
+        # Skip the triage model call when the intent is clear locally,
+        # otherwise stay with the specialist from the previous turn
+        route = router.route(user_input)
+        sticky = None if route else affinity.start_agent(state.get("last_agent"))
+        agent = REGISTRY[route] if route else sticky or triage_agent
+        hooks = router.triage_timer() if agent is triage_agent else None
+
+        # Pass the recent turns plus summary and pinned facts, compacted if they
+        # go over the prompt budget. A newer message cancels this run; only the
+        # latest turn updates the session (its tokens are counted either way)
+        supervisor: RunSupervisor = cl.user_session.get("supervisor")
+        items = ledger.fit(agent, memory.to_input(), shrink=memory.compact)
+        turn = ledger.turn(hooks)
+        result = await supervisor.run(run_into_message(agent, items, config, msg, hooks=turn))
         response_result = result.final_output
-
-        msg.content = response_result
-        await msg.update()
+        if sticky is not None:
+            affinity.record(sticky, result.last_agent)
+        state["last_agent"] = result.last_agent.name
 
         # Update history
-        history.append({"role": "assistant", "content": response_result})
-        cl.user_session.set("chat_history", history)
+        memory.add("assistant", response_result)
+        logger.info("Memory after turn: %s", memory.stats())
 
+    except Superseded:
+        # A newer message took over; this turn leaves the session state alone
+        msg.content = "_Stopped: answering your newer message instead._"
+        await msg.update()
+    except TimeoutError:
+        msg.content = "Sorry, that took too long. Please try again."
+        await msg.update()
     except Exception as e:
         msg.content = f"Oops, something went wrong: {str(e)}"
-        await msg.update()
\ No newline at end of file
+        await msg.update()
+    finally:
+        if turn is not None:
+            turn.end(state)
+        sessions.save(key, state)
@@ -0,0 +1,53 @@
+from agent_common.router import IntentRouter
+
+# Mirrors the triage agent's instructions: CareerAgent for interests,
+# SkillAgent for skill queries, JobAgent for job details.
+ROUTE_RULES = {
+    "skill_agent": [
+        r"skills?\b", r"roadmap", r"courses?\b", r"learn", r"upwork", r"fiverr", r"certificat",
+        r"how (?:do i|to|can i) (?:start|earn|become|get into)",
+    ],
+    "job_agent": [
+        r"jobs?\b", r"salar(?:y|ies)", r"responsibilit", r"work environment", r"day to day",
+        r"what(?:'s| is) (?:it like|\w+(?: \w+)? like)", r"role of",
+    ],
+    "career_agent": [
+        r"careers?\b", r"interested in", r"i (?:like|love|enjoy)", r"which field", r"what should i (?:do|choose)",
+        r"suggest", r"passion",
+    ],
+}
+
+TRAINING_EXAMPLES = {
+    "career_agent": [
+        "I like tech, what career should I choose",
+        "suggest a career for me I enjoy drawing and computers",
+        "I am interested in AI, what options do I have",
+        "which field is best for me in 2025",
+        "I love solving puzzles and math",
+        "what can I do after intermediate in Pakistan",
+        "help me pick a path in tech",
+        "I want to work from home, any ideas",
+    ],
+    "skill_agent": [
+        "what skills do I need for freelancing",
+        "how to earn on Upwork",
+        "roadmap to become a data scientist",
+        "which courses should I take for cloud computing",
+        "how do I learn agentic ai",
+        "skills for machine learning engineer",
+        "how can I start on Fiverr as a beginner",
+        "what should I study to become a ui/ux designer",
+    ],
+    "job_agent": [
+        "what's freelancing like",
+        "what does a cybersecurity analyst do",
+        "how much does a data scientist earn in Pakistan",
+        "tell me about the job of a cloud engineer",
+        "salary of machine learning engineer in USD",
+        "what is the work environment of a ui/ux designer",
+        "responsibilities of a devops engineer",
+        "is remote work common for developers",
+    ],
+}
+
+router = IntentRouter(ROUTE_RULES, TRAINING_EXAMPLES)
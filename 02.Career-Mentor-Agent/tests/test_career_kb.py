@@ -0,0 +1,28 @@
+import pytest
+
+from career_kb import kb
+
+
+@pytest.mark.parametrize("name, career", [
+    ("Data Scientist", "Data Scientist"),
+    ("data scientst", "Data Scientist"),
+    ("devops", "Cloud Computing"),
+    ("machine learning", "Machine Learning Engineer"),
+])
+def test_resolve(name, career):
+    assert kb.resolve(name).name == career
+
+
+def test_mentions_only_career_names():
+    assert [c.name for c in kb.mentions("I'm into cybersecurity and devops")] == [
+        "Cybersecurity Analyst", "Cloud Computing",
+    ]
+    assert kb.mentions("I'm a writer and designer, I keep my photos in the cloud") == []
+
+
+def test_career_and_skill_lookups_have_their_own_cache():
+    careers = kb.career_names.resolve.cache_info().misses
+    skills = kb.skill_names.resolve.cache_info().misses
+    kb.find(skills=["kubernets"])
+    assert kb.career_names.resolve.cache_info().misses == careers
+    assert kb.skill_names.resolve.cache_info().misses == skills + 1
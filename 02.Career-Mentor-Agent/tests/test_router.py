@@ -0,0 +1,29 @@
+import pytest
+
+from router import TRAINING_EXAMPLES, router
+
+
+@pytest.mark.parametrize("text, label", [
+    ("what skills do I need for cloud computing", "skill_agent"),
+    ("salary of a devops engineer", "job_agent"),
+    ("I enjoy drawing and computers", "career_agent"),
+])
+def test_keyword_rules(text, label):
+    assert router.route(text) == label
+
+
+def test_classifier_fits_its_training_examples():
+    for label, texts in TRAINING_EXAMPLES.items():
+        for text in texts:
+            assert router.classifier.predict(text)[0] == label
+
+
+@pytest.mark.parametrize("text", [
+    "hello there",
+    "tomorrow morning we could have a picnic in the park with friends and family",
+    "I've been thinking a lot lately about my grandmother's garden and whether the tomatoes will survive "
+    "the winter frost this year, what do you think about that and the weather in general",
+])
+def test_off_topic_messages_are_left_to_triage(text):
+    assert router.classifier.predict(text)[1] == 0.0
+    assert router.route(text) is None
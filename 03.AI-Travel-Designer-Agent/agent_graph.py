@@ -0,0 +1,169 @@
+import random
+from types import MappingProxyType
+
+from agent_common.tiers import apply_tiers
+from agent_common.tool_cache import memoize
+from agents import Agent, function_tool
+
+from budget import BudgetPlanner
+from catalog import catalog, normalize
+from compare import DestinationComparer
+from connectors import PlatformConnectors
+
+# The agent graph is built once per process, on top of the shared travel
+# catalog. Chat sessions only reference it; chat history and the trip slots
+# (budget, destination, origin, nights) stay in the session store.
+
+# Model tier per agent (see agent_common.tiers): routing on the fast model, answers cascade
+TIER_POLICY = {"triage_agent": "fast", "destination_agent": "cascade", "booking_agent": "cascade", "explore_agent": "cascade"}
+
+planner = BudgetPlanner(catalog)
+connectors = PlatformConnectors(catalog)
+comparer = DestinationComparer(catalog, platform_fetch=connectors.fetch)
+
+
+# Tools for travel planning
+@function_tool
+@memoize(key=normalize)
+def get_flights(destination):
+    """Returns realistic flight data for 2025, tailored for Pakistani travelers."""
+    found = catalog.resolve(destination)
+    if found is None:
+        return [{"from": "N/A", "airline": "N/A", "price": "Research flights", "duration": "N/A"}]
+    return found.flights_as_dicts()
+
+@function_tool
+@memoize(key=normalize)
+def suggest_hotels(destination):
+    """Returns realistic hotel suggestions for 2025, tailored for Pakistani travelers."""
+    found = catalog.resolve(destination)
+    if found is None:
+        return [{"name": "Research hotels", "price": "N/A", "type": "N/A"}]
+    return found.hotels_as_dicts()
+
+@function_tool
+def confirm_booking(flight, hotel, destination):
+    """Simulates booking confirmation with a mock receipt."""
+    return {
+        "confirmation": f"Booking confirmed for {destination.title()}!",
+        "flight": flight,
+        "hotel": hotel,
+        "receipt_id": f"TRV-{destination.upper()}-2025-{random.randint(1000, 9999)}",
+        "message": "You'll receive a confirmation email."
+    }
+
+@function_tool
+@memoize(key=normalize)
+def get_travel_alerts(destination):
+    """Returns mock travel alerts for a destination in 2025."""
+    found = catalog.resolve(destination)
+    return found.alert if found else catalog.default_alert
+
+@function_tool
+async def integrate_platform(platform, destination):
+    """Fetches flight data from Skyscanner or hotel data from Booking.com for a destination."""
+    connector = connectors.get(platform)
+    if connector is None:
+        return f"Platform {platform} not supported. Try Skyscanner or Booking.com."
+    return await connector.fetch(destination)
+
+@function_tool
+def find_trips_within_budget(budget_pkr: float, origin: str | None = None, nights: int = 3,
+                             destinations: list[str] | None = None, best_value: bool = False) -> dict:
+    """Finds the cheapest (or best-value) flight + hotel combinations that fit a total trip budget.
+
+    Args:
+        budget_pkr: Total trip budget in PKR (convert USD to PKR first).
+        origin: Departure city, e.g. "Karachi". Leave empty for any city.
+        nights: Number of hotel nights.
+        destinations: Only consider these destinations. Leave empty to search all of them.
+        best_value: Prefer better hotels within the budget instead of the lowest total.
+    """
+    return planner.find_trips(budget_pkr, origin, nights, destinations, "value" if best_value else "cheapest")
+
+
+@function_tool
+async def compare_destinations(destinations: list[str]) -> dict:
+    """Compares several destinations in one call: cheapest flight, hotels, alerts and any live platform data for each.
+
+    Args:
+        destinations: Destination names, e.g. ["Dubai", "Istanbul", "Skardu"].
+    """
+    return await comparer.compare(destinations)
+
+
+def build_registry():
+    """Builds every agent and returns a read-only name -> agent mapping."""
+    # Define agents with clear, concise instructions
+    DestinationAgent = Agent(
+        name="destination_agent",
+        instructions="""
+        Suggest 2-3 destinations based on user mood, interests, or budget (e.g., “50,000 PKR”). For a budget, call find_trips_within_budget once. Use chat history and the known facts (budget, destination, origin, nights) for personalization. Provide PKR/USD costs for Pakistani travelers in 2025. End with “Want to book, explore attractions, or adjust budget?” Deliver concise, friendly, actionable answers.
+        """,
+        handoff_description="Handles destination suggestions.",
+        tools=[find_trips_within_budget]
+    )
+
+    BookingAgent = Agent(
+        name="booking_agent",
+        instructions="""
+            You are the booking agent. You can use the following tools:
+            - get_flights(destination)
+            - suggest_hotels(destination)
+            - confirm_booking(flight, hotel, destination)
+            - find_trips_within_budget(budget_pkr, origin, nights, destinations, best_value)
+            - compare_destinations(destinations)
+            - integrate_platform(platform, destination)
+
+            Your goal is to:
+            1. Suggest realistic flights & hotels
+            2. Respect budget if provided: call find_trips_within_budget once, it returns ranked flight + hotel combinations
+               (take budget, origin and nights from the known facts instead of asking again)
+            3. Call tools to simulate booking
+            4. Always respond with actionable info
+            5. When the user compares destinations, call compare_destinations once with all of them
+
+            ALWAYS use tools. NEVER say “I cannot search…” or “I cannot confirm…”
+            """,
+        handoff_description="Handles travel bookings.",
+        tools=[get_flights, suggest_hotels, confirm_booking, integrate_platform, find_trips_within_budget, compare_destinations]
+    )
+
+    ExploreAgent = Agent(
+        name="explore_agent",
+        instructions="""
+        For attraction/food queries, suggest 2-3 attractions and food options using get_travel_alerts() for alerts (compare_destinations() when weighing several places). Use chat history and the known facts (destination). Tailor for Pakistani travelers in 2025. End with “Need booking help, more destinations, or budget tracking?” Deliver concise, friendly answers.
+        """,
+        handoff_description="Handles attractions and food suggestions.",
+        tools=[get_travel_alerts, compare_destinations]
+    )
+
+    triage_agent = Agent(
+        name="triage_agent",
+        instructions="""
+            You are the triage agent for travel planning.
+
+            **Always** route messages based on these keywords:
+
+            - To `BookingAgent`: if input mentions flights, hotels, booking, Skyscanner, Booking.com, confirm, budget check.
+            - To `ExploreAgent`: if input mentions explore, food, attraction, alerts, or names of cities with "explore".
+            - To `DestinationAgent`: if input is vague or just mentions mood/interest (e.g. “I want nature”, “Where should I go?”)
+
+            If unsure, prefer routing to BookingAgent.
+            """,
+        handoff_description="Hand back here only when the user changes to a topic outside your specialty.",
+        handoffs=[DestinationAgent, BookingAgent, ExploreAgent]
+    )
+
+    # Specialists keep the conversation on follow-up turns and hand back to
+    # triage_agent only when the topic changes
+    for specialist in (DestinationAgent, BookingAgent, ExploreAgent):
+        specialist.handoffs.append(triage_agent)
+
+    agents = (DestinationAgent, BookingAgent, ExploreAgent, triage_agent)
+    apply_tiers(agents, TIER_POLICY)
+    return MappingProxyType({agent.name: agent for agent in agents})
+
+
+REGISTRY = build_registry()
+triage_agent = REGISTRY["triage_agent"]
@@ -0,0 +1,109 @@
+import heapq
+
+from catalog import TravelCatalog, normalize
+
+# Budget engine over the numeric catalog: finds the cheapest or best-value
+# flight + hotel combinations for a budget, origin and number of nights.
+# Destinations whose cheapest possible trip is already over budget (or worse
+# than the current top results) are skipped without looking at their combos.
+
+HOTEL_QUALITY = {"luxury": 3.0, "beachfront": 3.0, "historic": 2.5, "mid-range": 2.0, "budget": 1.0}
+
+
+def quality(hotel) -> float:
+    return HOTEL_QUALITY.get(hotel.type.lower(), 1.5)
+
+
+def score(rank: str, hotel_quality: float, total: float) -> float:
+    """Higher is better: lowest total for "cheapest", best hotel then lowest total for "value"."""
+    if rank == "cheapest":
+        return -total
+    return hotel_quality * 1e9 - total
+
+
+class BudgetPlanner:
+    def __init__(self, catalog: TravelCatalog):
+        self.catalog = catalog
+        # Flights (overall and per origin city) and hotels per destination, sorted by price once
+        self._sorted = {}
+        for key, d in catalog.destinations.items():
+            flights = tuple(sorted(d.flights, key=lambda f: f.price_pkr))
+            by_origin = {}
+            for flight in flights:
+                by_origin.setdefault(normalize(flight.origin), []).append(flight)
+            hotels = tuple(sorted(d.hotels, key=lambda h: h.night_pkr))
+            self._sorted[key] = (flights, {o: tuple(f) for o, f in by_origin.items()}, hotels)
+
+    def _candidates(self, keys, origin: str | None, nights: int, budget: float, rank: str):
+        """Yields (best_possible_score, key, flights, hotels) for destinations that can fit the budget."""
+        for key in keys:
+            flights, by_origin, hotels = self._sorted[key]
+            if origin:
+                flights = by_origin.get(origin, ())
+            if not flights or not hotels:
+                continue
+            lower = flights[0].price_pkr + hotels[0].night_pkr * nights
+            if lower > budget:
+                continue
+            if rank == "cheapest":
+                yield -lower, key, flights, hotels
+            else:
+                # Best hotel this destination can afford with its cheapest flight
+                yield max(
+                    score(rank, quality(h), flights[0].price_pkr + h.night_pkr * nights)
+                    for h in hotels if flights[0].price_pkr + h.night_pkr * nights <= budget
+                ), key, flights, hotels
+
+    def find_trips(self, budget_pkr: float, origin: str | None = None, nights: int = 3,
+                   destinations: list[str] | None = None, rank: str = "cheapest", top_k: int = 5) -> dict:
+        nights = max(1, nights)
+        origin = normalize(origin) if origin else None
+        if destinations:
+            resolved = (self.catalog.resolve(name) for name in destinations)
+            keys = [d.key for d in resolved if d is not None]
+        else:
+            keys = self._sorted.keys()
+
+        # Most promising destinations first (lazily, via a heap), so the top results fill up early
+        candidates = [(-ceiling, key, flights, hotels)
+                      for ceiling, key, flights, hotels in self._candidates(keys, origin, nights, budget_pkr, rank)]
+        heapq.heapify(candidates)
+        best = []  # heap of (score, tiebreak, trip); the worst kept result sits at best[0]
+        counter = 0
+        while candidates:
+            negated_ceiling, key, flights, hotels = heapq.heappop(candidates)
+            if len(best) == top_k and -negated_ceiling <= best[0][0]:
+                break  # nothing left can beat the current top results
+            for flight in flights:
+                if flight.price_pkr + hotels[0].night_pkr * nights > budget_pkr:
+                    break
+                for hotel in hotels:
+                    total = flight.price_pkr + hotel.night_pkr * nights
+                    if total > budget_pkr:
+                        break
+                    trip_score = score(rank, quality(hotel), total)
+                    counter += 1
+                    item = (trip_score, counter, (key, flight, hotel, total))
+                    if len(best) < top_k:
+                        heapq.heappush(best, item)
+                    elif trip_score > best[0][0]:
+                        heapq.heapreplace(best, item)
+
+        trips = [self._describe(*trip, nights, budget_pkr) for _, _, trip in sorted(best, reverse=True)]
+        answer = {"budget_pkr": budget_pkr, "nights": nights, "rank": rank, "trips": trips}
+        if not trips:
+            answer["message"] = "No flight + hotel combination fits this budget. Try fewer nights or a bigger budget."
+        return answer
+
+    def _describe(self, key, flight, hotel, total, nights, budget) -> dict:
+        destination = self.catalog.destinations[key]
+        return {
+            "destination": destination.name,
+            "flight": f"{flight.carrier} from {flight.origin}, {flight.duration}",
+            "flight_pkr": flight.price_pkr,
+            "hotel": f"{hotel.name} ({hotel.type})",
+            "hotel_night_pkr": hotel.night_pkr,
+            "total_pkr": total,
+            "total_usd": self.catalog.to_usd(total),
+            "left_over_pkr": round(budget - total),
+        }
@@ -0,0 +1,169 @@
+import difflib
+import json
+import os
+import sys
+import unicodedata
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+# Travel catalog: destinations, flights, hotels and alerts loaded once from
+# data/catalog.json into compact typed records with numeric PKR/USD prices.
+# Names resolve through an exact/alias map first (O(1)) and a trigram index
+# for typos ("neelam", "Dubai ", "istambul").
+CATALOG_PATH = os.getenv("TRAVEL_CATALOG_PATH", os.path.join(os.path.dirname(__file__), "data", "catalog.json"))
+FUZZY_CUTOFF = 0.75
+
+
+def normalize(name: str) -> str:
+    """Lowercase, accent-free, single-spaced form used for every lookup."""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join("".join(c if c.isalnum() else " " for c in name.lower()).split())
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def format_price(pkr: int, usd: int, international: bool, suffix: str = "") -> str:
+    if international:
+        return f"${usd:,}{suffix} (₹{pkr:,} PKR)"
+    return f"₹{pkr:,} PKR{suffix}"
+
+
+@dataclass(frozen=True, slots=True)
+class Flight:
+    origin: str
+    carrier: str
+    price_pkr: int
+    price_usd: int
+    duration: str
+
+
+@dataclass(frozen=True, slots=True)
+class Hotel:
+    name: str
+    night_pkr: int
+    night_usd: int
+    type: str
+
+
+@dataclass(frozen=True, slots=True)
+class Destination:
+    key: str
+    name: str
+    country: str
+    alert: str
+    flights: tuple[Flight, ...]
+    hotels: tuple[Hotel, ...]
+
+    @property
+    def international(self) -> bool:
+        return self.country != "Pakistan"
+
+    def flights_as_dicts(self) -> list[dict]:
+        return [
+            {
+                "from": f.origin,
+                "airline": f.carrier,
+                "price": format_price(f.price_pkr, f.price_usd, self.international),
+                "price_pkr": f.price_pkr,
+                "price_usd": f.price_usd,
+                "duration": f.duration,
+            }
+            for f in self.flights
+        ]
+
+    def hotels_as_dicts(self) -> list[dict]:
+        return [
+            {
+                "name": h.name,
+                "price": format_price(h.night_pkr, h.night_usd, self.international, "/night"),
+                "night_pkr": h.night_pkr,
+                "night_usd": h.night_usd,
+                "type": h.type,
+            }
+            for h in self.hotels
+        ]
+
+
+class TravelCatalog:
+    def __init__(self, data: dict):
+        self.pkr_per_usd = data["pkr_per_usd"]
+        self.default_alert = data["default_alert"]
+        self.destinations: dict[str, Destination] = {}
+        self.aliases: dict[str, str] = {}
+        self._keys: list[str] = []
+        self._trigram_index: dict[str, array] = {}
+
+        intern = sys.intern
+        for raw in data["destinations"]:
+            key = normalize(raw["name"])
+            destination = Destination(
+                key=key,
+                name=raw["name"],
+                country=intern(raw.get("country", "Pakistan")),
+                alert=raw.get("alert") or self.default_alert,
+                flights=tuple(
+                    Flight(intern(f["from"]), intern(f["carrier"]), f["price_pkr"],
+                           f.get("price_usd") or self.to_usd(f["price_pkr"]), intern(f["duration"]))
+                    for f in raw.get("flights", ())
+                ),
+                hotels=tuple(
+                    Hotel(h["name"], h["night_pkr"], h.get("night_usd") or self.to_usd(h["night_pkr"]), intern(h["type"]))
+                    for h in raw.get("hotels", ())
+                ),
+            )
+            self.destinations[key] = destination
+            for alias in [key, *raw.get("aliases", ())]:
+                alias = normalize(alias)
+                if alias not in self.aliases:
+                    self.aliases[alias] = key
+                    self._index(alias)
+
+    @classmethod
+    def load(cls, path=CATALOG_PATH) -> "TravelCatalog":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def to_usd(self, pkr: int) -> int:
+        return round(pkr / self.pkr_per_usd)
+
+    def _index(self, alias: str):
+        position = len(self._keys)
+        self._keys.append(alias)
+        for gram in trigrams(alias):
+            self._trigram_index.setdefault(gram, array("I")).append(position)
+
+    def resolve(self, name: str) -> Destination | None:
+        """Finds a destination by name, alias or close spelling."""
+        key = self._resolve_key(normalize(name))
+        return self.destinations[key] if key else None
+
+    @lru_cache(maxsize=4096)
+    def _resolve_key(self, query: str) -> str | None:
+        if not query:
+            return None
+        key = self.aliases.get(query)
+        if key:
+            return key
+        # Shortlist aliases sharing the most trigrams, then score them properly
+        # (very common trigrams are skipped so the shortlist stays cheap on big catalogs)
+        shared = Counter()
+        too_common = max(200, len(self._keys) // 500)
+        for gram in trigrams(query):
+            postings = self._trigram_index.get(gram, ())
+            if len(postings) <= too_common:
+                shared.update(postings)
+        best, best_score = None, FUZZY_CUTOFF
+        for position, _ in shared.most_common(10):
+            alias = self._keys[position]
+            score = difflib.SequenceMatcher(None, query, alias).ratio()
+            if score > best_score:
+                best, best_score = alias, score
+        return self.aliases[best] if best else None
+
+
+catalog = TravelCatalog.load()
@@ -0,0 +1,71 @@
+import asyncio
+import os
+
+from catalog import Destination, TravelCatalog, normalize
+
+# Side-by-side comparison of several destinations in one tool call. Flights,
+# hotels, alerts and platform data for every destination are gathered
+# concurrently (bounded by COMPARE_CONCURRENCY) instead of one tool round trip
+# per destination and data source.
+COMPARE_CONCURRENCY = int(os.getenv("COMPARE_CONCURRENCY", "8"))
+MAX_DESTINATIONS = 10
+
+
+class DestinationComparer:
+    def __init__(self, catalog: TravelCatalog, platform_fetch, concurrency=COMPARE_CONCURRENCY):
+        self.catalog = catalog
+        self.platform_fetch = platform_fetch
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+    async def _platform(self, platform: str, destination: str):
+        async with self.semaphore:
+            try:
+                return await self.platform_fetch(platform, destination)
+            except Exception as e:
+                return f"{platform} unavailable: {e}"
+
+    async def _one(self, name: str, destination: Destination | None) -> dict:
+        if destination is None:
+            return {"destination": name, "error": "Unknown destination"}
+        flights, hotels = await asyncio.gather(
+            self._platform("Skyscanner", destination.name),
+            self._platform("Booking.com", destination.name),
+        )
+        # Without a provider the platforms answer from the catalog, which the
+        # row below already carries
+        platforms = {
+            kind: answer for kind, answer in (("flights", flights), ("hotels", hotels))
+            if not (isinstance(answer, dict) and answer.get("source") == "catalog")
+        }
+        cheapest = min(destination.flights, key=lambda f: f.price_pkr, default=None)
+        row = {
+            "destination": destination.name,
+            "cheapest_flight": cheapest and {
+                "from": cheapest.origin, "airline": cheapest.carrier,
+                "price_pkr": cheapest.price_pkr, "price_usd": cheapest.price_usd, "duration": cheapest.duration,
+            },
+            "hotels": [{"name": h.name, "type": h.type, "night_pkr": h.night_pkr} for h in destination.hotels],
+            "alert": destination.alert,
+        }
+        if platforms:
+            row["platforms"] = platforms
+        return row
+
+    async def compare(self, destinations: list[str]) -> dict:
+        # "Dubai", "dubai " and "dubay" are the same destination
+        picked = {}
+        for name in destinations:
+            destination = self.catalog.resolve(name)
+            picked.setdefault(destination.key if destination else normalize(name), (name, destination))
+        rows = await asyncio.gather(*(self._one(name, destination)
+                                      for name, destination in list(picked.values())[:MAX_DESTINATIONS]))
+        priced = [r for r in rows if r.get("cheapest_flight")]
+        summary = {}
+        if priced:
+            summary["cheapest_flight"] = min(priced, key=lambda r: r["cheapest_flight"]["price_pkr"])["destination"]
+        with_hotels = [r for r in rows if r.get("hotels")]
+        if with_hotels:
+            summary["cheapest_hotel"] = min(
+                with_hotels, key=lambda r: min(h["night_pkr"] for h in r["hotels"])
+            )["destination"]
+        return {"comparison": rows, "summary": summary}
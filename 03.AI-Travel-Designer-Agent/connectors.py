@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+
+import httpx
+
+from catalog import TravelCatalog, normalize
+
+logger = logging.getLogger(__name__)
+
+# Connectors to the travel platforms behind integrate_platform and
+# compare_destinations. Each provider gets its own pooled HTTP client, a TTL
+# cache that serves stale data while refreshing in the background, request
+# coalescing for identical in-flight queries, a hard timeout and a circuit
+# breaker. Without a provider URL (or when the provider is down) answers come
+# from the local catalog, so a slow platform never stalls a booking turn.
+SKYSCANNER_URL = os.getenv("SKYSCANNER_URL")
+BOOKING_URL = os.getenv("BOOKING_URL")
+CONNECTOR_TIMEOUT = float(os.getenv("CONNECTOR_TIMEOUT", "3"))
+CONNECTOR_MAX_CONNECTIONS = int(os.getenv("CONNECTOR_MAX_CONNECTIONS", "20"))
+CONNECTOR_CACHE_TTL = float(os.getenv("CONNECTOR_CACHE_TTL", "300"))
+CONNECTOR_STALE_TTL = float(os.getenv("CONNECTOR_STALE_TTL", "1800"))
+CONNECTOR_CACHE_SIZE = int(os.getenv("CONNECTOR_CACHE_SIZE", "2048"))
+BREAKER_FAILURES = int(os.getenv("CONNECTOR_BREAKER_FAILURES", "5"))
+BREAKER_RESET = float(os.getenv("CONNECTOR_BREAKER_RESET", "30"))
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive errors; lets one trial request through after `reset_after` seconds."""
+
+    def __init__(self, failures=BREAKER_FAILURES, reset_after=BREAKER_RESET):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial = False
+        self.trips = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half-open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial:
+            self.trial = True
+            return True
+        return False
+
+    def success(self):
+        self.consecutive = 0
+        self.opened_at = None
+        self.trial = False
+
+    def failure(self):
+        self.consecutive += 1
+        if self.trial or self.consecutive >= self.failures:
+            if self.opened_at is None or self.trial:
+                self.trips += 1
+            self.opened_at = time.monotonic()
+        self.trial = False
+
+
+class Connector:
+    def __init__(self, name: str, base_url: str | None, path: str, fallback, timeout=CONNECTOR_TIMEOUT,
+                 ttl=CONNECTOR_CACHE_TTL, stale_ttl=CONNECTOR_STALE_TTL, cache_size=CONNECTOR_CACHE_SIZE):
+        self.name = name
+        self.base_url = base_url
+        self.path = path
+        self.fallback = fallback  # destination name -> list of results from the catalog
+        self.timeout = timeout
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.cache_size = cache_size
+        self.breaker = CircuitBreaker()
+        self._client: httpx.AsyncClient | None = None
+        self._cache = OrderedDict()  # key -> (fetched_at, results)
+        self._inflight = {}
+        self._refreshing = set()
+        self.counts = dict.fromkeys(
+            ("requests", "fresh_hits", "stale_hits", "coalesced", "upstream_calls", "failures", "fallbacks"), 0
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=CONNECTOR_MAX_CONNECTIONS,
+                                    max_keepalive_connections=CONNECTOR_MAX_CONNECTIONS),
+            )
+        return self._client
+
+    async def fetch(self, destination: str) -> dict:
+        """Returns {"platform", "destination", "source", "results"}; source is live, cache, stale or catalog."""
+        self.counts["requests"] += 1
+        key = normalize(destination)
+        if not self.base_url:
+            return self._answer(destination, "catalog", self.fallback(destination))
+
+        entry = self._cache.get(key)
+        age = time.monotonic() - entry[0] if entry else None
+        if entry and age < self.ttl:
+            self.counts["fresh_hits"] += 1
+            self._cache.move_to_end(key)
+            return self._answer(destination, "cache", entry[1])
+        if entry and age < self.ttl + self.stale_ttl:
+            # Serve the old answer now and refresh it off the request path
+            self.counts["stale_hits"] += 1
+            if key not in self._inflight:
+                task = asyncio.create_task(self._quiet(self._load(key, destination)))
+                self._refreshing.add(task)
+                task.add_done_callback(self._refreshing.discard)
+            return self._answer(destination, "stale", entry[1])
+
+        try:
+            return self._answer(destination, "live", await self._load(key, destination))
+        except Exception as e:
+            self.counts["fallbacks"] += 1
+            answer = self._answer(destination, "catalog", self.fallback(destination))
+            answer["error"] = f"{self.name} unavailable: {e or type(e).__name__}"
+            return answer
+
+    async def _load(self, key: str, destination: str) -> list:
+        # Identical queries already in flight share one upstream call
+        task = self._inflight.get(key)
+        if task is not None:
+            self.counts["coalesced"] += 1
+            return await asyncio.shield(task)
+        task = self._inflight[key] = asyncio.create_task(self._request(key, destination))
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _request(self, key: str, destination: str) -> list:
+        if not self.breaker.allow():
+            raise CircuitOpen(f"circuit open after {self.breaker.consecutive} failures")
+        self.counts["upstream_calls"] += 1
+        try:
+            async with asyncio.timeout(self.timeout):
+                response = await self.client.get(self.path, params={"destination": destination})
+                response.raise_for_status()
+                results = response.json()["results"]
+        except Exception:
+            self.counts["failures"] += 1
+            self.breaker.failure()
+            raise
+        self.breaker.success()
+        self._cache[key] = (time.monotonic(), results)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return results
+
+    async def _quiet(self, refresh):
+        try:
+            await refresh
+        except Exception as e:
+            logger.info("%s background refresh failed: %s", self.name, e)
+
+    def _answer(self, destination: str, source: str, results: list) -> dict:
+        return {"platform": self.name, "destination": destination, "source": source, "results": results}
+
+    def stats(self) -> dict:
+        served = self.counts["fresh_hits"] + self.counts["stale_hits"]
+        return self.counts | {
+            "cache_entries": len(self._cache),
+            "cache_hit_ratio": round(served / self.counts["requests"], 3) if self.counts["requests"] else 0.0,
+            "breaker": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+        }
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class PlatformConnectors:
+    def __init__(self, catalog: TravelCatalog, skyscanner_url=SKYSCANNER_URL, booking_url=BOOKING_URL):
+        def flights(name):
+            found = catalog.resolve(name)
+            return found.flights_as_dicts() if found else []
+
+        def hotels(name):
+            found = catalog.resolve(name)
+            return found.hotels_as_dicts() if found else []
+
+        self.connectors = {
+            "skyscanner": Connector("Skyscanner", skyscanner_url, "/flights", flights),
+            "booking.com": Connector("Booking.com", booking_url, "/hotels", hotels),
+        }
+
+    def get(self, platform: str) -> Connector | None:
+        return self.connectors.get(platform.strip().lower())
+
+    async def fetch(self, platform: str, destination: str) -> dict:
+        connector = self.get(platform)
+        if connector is None:
+            raise ValueError(f"Platform {platform} not supported")
+        return await connector.fetch(destination)
+
+    def stats(self) -> dict:
+        return {name: connector.stats() for name, connector in self.connectors.items()}
+
+    async def aclose(self):
+        for connector in self.connectors.values():
+            await connector.aclose()
@@ -0,0 +1,145 @@
+import re
+
+from catalog import TravelCatalog, catalog, normalize
+
+# Trip slot extraction before the agents run: compiled patterns and a
+# gazetteer of catalog destinations and departure cities pull the budget,
+# destination, origin and trip length out of each message. The slots are kept
+# in the session state and pinned into the prompt as known facts, so the model
+# does not have to dig them out of the chat history on every turn.
+
+# An amount with optional currency and multiplier: "₹50,000", "PKR 1.5 lakh",
+# "50k", "$1,200", "300000 rupees"
+AMOUNT_RE = re.compile(
+    r"(?P<pre>₹|\$|\brs\.?|\bpkr\b|\busd\b)?\s*"
+    r"(?P<number>\d{1,3}(?:,\d{2,3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+    r"(?:\s*(?P<mult>k|thousand|lakhs?|lacs?|m|mn|million)\b)?"
+    r"(?:\s*(?P<post>pkr\b|rs\b|rupees?\b|usd\b|dollars?\b|\$))?",
+    re.IGNORECASE,
+)
+MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000,
+               "lacs": 100_000, "m": 1_000_000, "mn": 1_000_000, "million": 1_000_000}
+USD_MARKERS = {"$", "usd", "dollar", "dollars"}
+# A bare number is only a budget right after one of these words
+BUDGET_CUE_RE = re.compile(r"\b(?:budget|under|within|up ?to|upto|max(?:imum)?|spend|afford|around|about|only)\W*$",
+                           re.IGNORECASE)
+# When a message has several amounts, the budget is the one these words point
+# to, before ("budget is 100k", "under 200k") or after it ("60000 budget",
+# "50k max", "₹50,000 is my limit")
+BUDGET_BEFORE_RE = re.compile(r"\b(?:budget(?: is| of)?|under|within|up ?to|upto|max(?:imum)?|spend|afford)\W*$",
+                              re.IGNORECASE)
+BUDGET_AFTER_RE = re.compile(r"\W*(?:(?:is|as) )?(?:(?:my|our|the) )?(?:total )?(?:budget|max(?:imum)?|limit)\b",
+                             re.IGNORECASE)
+# ...and never when it counts something else
+NOT_MONEY_RE = re.compile(r"\s*(?:nights?|days?|weeks?|people|persons?|adults?|kids?|children|travell?ers?|stars?|"
+                          r"am\b|pm\b|km\b|hours?|hrs?|%|°)", re.IGNORECASE)
+
+NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+                "eight": 8, "nine": 9, "ten": 10, "fourteen": 14}
+LENGTH_RE = re.compile(r"\b(?P<count>\d{1,2}|%s)[\s-]*(?P<unit>nights?|days?|weeks?)\b" % "|".join(NUMBER_WORDS),
+                       re.IGNORECASE)
+WEEKEND_RE = re.compile(r"\bweekend\b", re.IGNORECASE)
+
+# Words after which an unknown word is tried as a misspelled destination
+DESTINATION_CUES = ("to", "in", "visit", "for", "at", "explore")
+# Shortest word tried that way
+FUZZY_MIN_CHARS = 4
+
+
+class TripExtractor:
+    """Pulls budget, destination, origin and trip length out of a message without a model call."""
+
+    def __init__(self, catalog: TravelCatalog):
+        self.catalog = catalog
+        self.origins = {normalize(f.origin): f.origin for d in catalog.destinations.values() for f in d.flights}
+        # One alternation over every alias and departure city, longest first so
+        # "neelum valley" wins over any shorter alias it contains
+        names = sorted(set(catalog.aliases) | set(self.origins), key=len, reverse=True)
+        self.places_re = re.compile(r"\b(%s)\b" % "|".join(map(re.escape, names)))
+        self.fuzzy_re = re.compile(r"\b(?:%s) ([a-z]{%d,}(?: [a-z]+)?)" % ("|".join(DESTINATION_CUES), FUZZY_MIN_CHARS))
+        self.extracted = 0
+        self.slots_filled = 0
+
+    def extract(self, text: str) -> dict:
+        """Slots found in text: budget (PKR), destination (catalog key), origin (city), nights."""
+        slots = {}
+        budget = self.budget(text)
+        if budget is not None:
+            slots["budget"] = budget
+        slots |= self.places(text)
+        nights = self.nights(text)
+        if nights is not None:
+            slots["nights"] = nights
+        self.extracted += 1
+        self.slots_filled += len(slots)
+        return slots
+
+    def budget(self, text: str) -> int | None:
+        """The amount of money next to a budget cue in text, else the last amount, in PKR."""
+        amounts, cued_amounts = [], []
+        for match in AMOUNT_RE.finditer(text):
+            pre, post, mult = (match["pre"] or "").lower(), (match["post"] or "").lower(), (match["mult"] or "").lower()
+            if NOT_MONEY_RE.match(text, match.end()) and not (pre or post):
+                continue
+            cued = BUDGET_BEFORE_RE.search(text, 0, match.start()) or BUDGET_AFTER_RE.match(text, match.end())
+            if not (pre or post or mult or cued or BUDGET_CUE_RE.search(text, 0, match.start())):
+                continue  # a year, a count, a flight number...
+            amount = float(match["number"].replace(",", "")) * MULTIPLIERS.get(mult, 1)
+            if pre.rstrip(".") in USD_MARKERS or post in USD_MARKERS:
+                amount *= self.catalog.pkr_per_usd
+            amounts.append(round(amount))
+            if cued:
+                cued_amounts.append(round(amount))
+        # "my budget is 100k, flight around $300 is fine": the cued amount wins
+        found = cued_amounts or amounts
+        return found[-1] if found else None
+
+    def places(self, text: str) -> dict:
+        """Destination and origin mentioned in text, using the words right before each place."""
+        query = normalize(text)
+        slots = {}
+        for match in self.places_re.finditer(query):
+            name = match[1]
+            before = query[:match.start()].split()[-1:]
+            if name in self.origins and (before == ["from"] or name not in self.catalog.aliases):
+                slots["origin"] = self.origins[name]
+            elif before != ["from"]:
+                slots["destination"] = self.catalog.aliases[name]
+        if "destination" not in slots:
+            # "a trip to neelam" / "hotels in istambul": a close spelling right after a cue
+            for match in self.fuzzy_re.finditer(query):
+                destination = self.catalog.resolve(match[1]) or self.catalog.resolve(match[1].split()[0])
+                if destination is not None:
+                    slots["destination"] = destination.key
+        return slots
+
+    def nights(self, text: str) -> int | None:
+        match = LENGTH_RE.search(text)
+        if match is None:
+            return 2 if WEEKEND_RE.search(text) else None
+        count = match["count"].lower()
+        count = NUMBER_WORDS[count] if count in NUMBER_WORDS else int(count)
+        unit = match["unit"].lower()
+        if unit.startswith("week"):
+            return count * 7
+        if unit.startswith("day"):
+            return max(1, count - 1)  # a 4-day trip is 3 hotel nights
+        return max(1, count)
+
+    def describe(self, slot: str, value) -> str:
+        """Compact, prompt-ready form of a slot value."""
+        if slot == "budget":
+            return f"₹{value:,} PKR (~${self.catalog.to_usd(value):,})"
+        if slot == "destination":
+            return self.catalog.destinations[value].name
+        return str(value)
+
+    def stats(self) -> dict:
+        return {
+            "messages": self.extracted,
+            "slots_filled": self.slots_filled,
+            "avg_slots": round(self.slots_filled / self.extracted, 2) if self.extracted else 0.0,
+        }
+
+
+extractor = TripExtractor(catalog)
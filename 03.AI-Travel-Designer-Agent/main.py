@@ -1,10 +1,23 @@
-from agents import Agent, Runner, RunConfig, OpenAIChatCompletionsModel, function_tool
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
-import chainlit as cl
-from typing import cast
+import logging
 import os
-import random
+
+from agent_common.affinity import AgentAffinity
+from agent_common.health import loop_lag, session_stats
+from agent_common.memory import ConversationMemory
+from agent_common.provider import aclose, get_run_config, pool_metrics, scheduler_stats, tier_stats, warm_up
+from agent_common.scheduler import set_session
+from agent_common.session_store import sessions
+from agent_common.streaming import run_into_message, ttft_summary
+from agent_common.supervisor import RunSupervisor, Superseded, supervisor_stats
+from agent_common.tool_cache import tool_cache_stats
+from agent_common.tracing_local import flush as flush_traces, install_local_tracing, mount_metrics, stage_summary
+from agent_common.usage import ledger
+import chainlit as cl
+from dotenv import load_dotenv
+
+from agent_graph import REGISTRY, connectors, triage_agent
+from extraction import extractor
+from router import router
 
 # Load environment variables
 load_dotenv()
@@ -13,274 +26,147 @@ gemini_api_key = os.getenv("GEMINI_API_KEY")
 if not gemini_api_key:
     raise ValueError("GEMINI_API_KEY is not set.")
 
-@cl.on_chat_start
-async def start():
-    # Initialize AsyncOpenAI client
-    client = AsyncOpenAI(
-        api_key=gemini_api_key,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai"
-    )
-
-    # Define the model
-    model = OpenAIChatCompletionsModel(
-        model="gemini-2.0-flash",
-        openai_client=client
-    )
-
-    # Configure the runner
-    config = RunConfig(
-        model=model,
-        model_provider=client,
-        tracing_disabled=True
-    )
-
-    # Tools for travel planning
-    @function_tool
-    def get_flights(destination):
-        """Returns realistic flight data for 2025, tailored for Pakistani travelers."""
-        flights = {
-            "dubai": [
-                {"from": "Karachi", "airline": "Emirates", "price": "$350 (₹98,000 PKR)", "duration": "2h 15m"},
-                {"from": "Lahore", "airline": "Flydubai", "price": "$300 (₹84,000 PKR)", "duration": "2h 30m"}
-            ],
-            "istanbul": [
-                {"from": "Karachi", "airline": "Turkish Airlines", "price": "$450 (₹126,000 PKR)", "duration": "5h 45m"},
-                {"from": "Islamabad", "airline": "PIA", "price": "$400 (₹112,000 PKR)", "duration": "6h"}
-            ],
-            "maldives": [
-                {"from": "Karachi", "airline": "Qatar Airways", "price": "$600 (₹168,000 PKR)", "duration": "5h via Doha"},
-                {"from": "Lahore", "airline": "Emirates", "price": "$650 (₹182,000 PKR)", "duration": "5h 30m"}
-            ],
-            "hunza": [
-                {"from": "Islamabad", "airline": "Bus (NATCO)", "price": "₹6,000 PKR", "duration": "14h"},
-                {"from": "Karachi", "airline": "PIA (to Gilgit)", "price": "₹25,000 PKR", "duration": "2h + 3h road"}
-            ],
-            "murree": [
-                {"from": "Islamabad", "airline": "Bus (Daewoo)", "price": "₹5,000 PKR", "duration": "2h"},
-                {"from": "Lahore", "airline": "Bus", "price": "₹7,000 PKR", "duration": "5h"}
-            ],
-            "skardu": [
-                {"from": "Islamabad", "airline": "PIA", "price": "₹20,000 PKR", "duration": "1h"},
-                {"from": "Karachi", "airline": "Serene Air", "price": "₹30,000 PKR", "duration": "2h"}
-            ],
-            "neelum valley": [
-                {"from": "Islamabad", "airline": "Bus", "price": "₹3,000 PKR", "duration": "5h"},
-                {"from": "Lahore", "airline": "Bus", "price": "₹6,000 PKR", "duration": "8h"}
-            ],
-            "khanpur dam": [
-                {"from": "Islamabad", "airline": "Bus", "price": "₹2,000 PKR", "duration": "1h"},
-                {"from": "Rawalpindi", "airline": "Bus", "price": "₹2,000 PKR", "duration": "1h"}
-            ],
-            "default": [
-                {"from": "N/A", "airline": "N/A", "price": "Research flights", "duration": "N/A"}
-            ]
-        }
-        return flights.get(destination.lower(), flights["default"])
-
-    @function_tool
-    def suggest_hotels(destination):
-        """Returns realistic hotel suggestions for 2025, tailored for Pakistani travelers."""
-        hotels = {
-            "dubai": [
-                {"name": "Burj Al Arab", "price": "$500/night (₹140,000 PKR)", "type": "Luxury"},
-                {"name": "Premier Inn", "price": "$80/night (₹22,400 PKR)", "type": "Budget"}
-            ],
-            "istanbul": [
-                {"name": "Pera Palace", "price": "$120/night (₹33,600 PKR)", "type": "Historic"},
-                {"name": "Ibis Istanbul", "price": "$60/night (₹16,800 PKR)", "type": "Budget"}
-            ],
-            "maldives": [
-                {"name": "Sun Siyam Resort", "price": "$250/night (₹70,000 PKR)", "type": "Beachfront"},
-                {"name": "Guesthouse Male", "price": "$100/night (₹28,000 PKR)", "type": "Budget"}
-            ],
-            "hunza": [
-                {"name": "Serena Hotel", "price": "₹18,000 PKR/night", "type": "Luxury"},
-                {"name": "Local Guesthouse", "price": "₹5,000 PKR/night", "type": "Budget"}
-            ],
-            "murree": [
-                {"name": "PC Bhurban", "price": "₹15,000 PKR/night", "type": "Luxury"},
-                {"name": "Hilltop Hotel", "price": "₹6,000 PKR/night", "type": "Budget"}
-            ],
-            "skardu": [
-                {"name": "Shangrila Resort", "price": "₹20,000 PKR/night", "type": "Luxury"},
-                {"name": "Skardu Inn", "price": "₹7,000 PKR/night", "type": "Budget"}
-            ],
-            "neelum valley": [
-                {"name": "Neelum View Hotel", "price": "₹4,000 PKR/night", "type": "Budget"},
-                {"name": "Keran Resort", "price": "₹6,000 PKR/night", "type": "Mid-range"}
-            ],
-            "khanpur dam": [
-                {"name": "Khanpur Lake Resort", "price": "₹3,000 PKR/night", "type": "Budget"},
-                {"name": "Local Campsite", "price": "₹2,000 PKR/night", "type": "Budget"}
-            ],
-            "default": [
-                {"name": "Research hotels", "price": "N/A", "type": "N/A"}
-            ]
-        }
-        return hotels.get(destination.lower(), hotels["default"])
-
-    @function_tool
-    def confirm_booking(flight, hotel, destination):
-        """Simulates booking confirmation with a mock receipt."""
-        return {
-            "confirmation": f"Booking confirmed for {destination.title()}!",
-            "flight": flight,
-            "hotel": hotel,
-            "receipt_id": f"TRV-{destination.upper()}-2025-{random.randint(1000, 9999)}",
-            "message": "You'll receive a confirmation email."
-        }
-
-    @function_tool
-    def get_travel_alerts(destination):
-        """Returns mock travel alerts for a destination in 2025."""
-        alerts = {
-            "dubai": "Weather: Sunny, 35°C. No disruptions expected.",
-            "istanbul": "Flight delays possible due to high traffic. Check status before departure.",
-            "maldives": "Monsoon season alert: Expect occasional rain.",
-            "hunza": "Road conditions: Clear. Book buses early for peak season.",
-            "murree": "Fog alert: Drive cautiously in early mornings.",
-            "skardu": "Flight cancellations possible due to weather. Confirm with airline.",
-            "neelum valley": "Road access good. Book early for peak season.",
-            "khanpur dam": "Safe for boating. Check local safety guidelines.",
-            "default": "No specific alerts. Check local conditions before travel."
-        }
-        return alerts.get(destination, alerts["default"])
-
-    @function_tool
-    def integrate_platform(platform, destination):
-        """Simulates integration with travel platforms."""
-        platforms = {
-            "skyscanner": f"Connected to Skyscanner: Fetched flight data for {destination.title()}.",
-            "booking.com": f"Connected to Booking.com: Fetched hotel data for {destination.title()}.",
-            "default": f"Platform {platform} not supported. Try Skyscanner or Booking.com."
-        }
-        return platforms.get(platform.lower(), platforms["default"])
-
-    @function_tool
-    def manage_budget(flight_price, hotel_price, budget):
-        """Tracks trip costs against budget and suggests alternatives if over budget."""
-        try:
-            flight_cost = float(flight_price.split("₹")[1].split(" ")[0].replace(",", ""))
-            hotel_cost = float(hotel_price.split("₹")[1].split(" ")[0].replace(",", ""))
-            total_cost = flight_cost + hotel_cost
-            budget = float(budget)
-            if total_cost > budget:
-                return f"Warning: Total cost (₹{total_cost:,} PKR) exceeds budget (₹{budget:,} PKR). Try Murree or Khanpur Dam for budget-friendly options."
-            return f"Total cost: ₹{total_cost:,} PKR (Flight: ₹{flight_cost:,} PKR, Hotel: ₹{hotel_cost:,} PKR). Within budget (₹{budget:,} PKR)."
-        except:
-            return "Error calculating budget. Please provide valid prices and budget."
-
-    # Initialize chat history and session data
-    cl.user_session.set("chat_history", [])
-    cl.user_session.set("budget", None)
-    cl.user_session.set("destination", None)
+logger = logging.getLogger(__name__)
+affinity = AgentAffinity(REGISTRY, triage_agent.name)
+
+# Agent, handoff, tool and model spans stay on this machine; per-stage
+# latency percentiles and the other runtime stats are served on /metrics
+install_local_tracing()
+METRICS = {
+    "pool": pool_metrics,
+    "ttft": ttft_summary,
+    "tiers": tier_stats,
+    "scheduler": scheduler_stats,
+    "supervisor": supervisor_stats,
+    "loop_lag": loop_lag.snapshot,
+    "sessions": session_stats,
+    "usage": ledger.stats,
+    "session_store": sessions.stats,
+    "extraction": extractor.stats,
+    "routing": router.stats,
+    "affinity": affinity.stats,
+    "connectors": connectors.stats,
+    "tool_cache": tool_cache_stats,
+}
+
+
+@cl.on_app_startup
+async def startup():
+    # Open pooled connections to the model API before the first chat arrives
+    await warm_up()
+    loop_lag.start()
+    from chainlit.server import app
+    mount_metrics(app, extra=METRICS)
+
+
+@cl.on_app_shutdown
+async def shutdown():
+    logger.info("Model connection pool at shutdown: %s", pool_metrics())
+    logger.info("Time to first token: %s", ttft_summary())
+    logger.info("Model tiers: %s", tier_stats())
+    logger.info("Request scheduler: %s", scheduler_stats())
+    logger.info("Run supervision: %s", supervisor_stats())
+    logger.info("Stage latency: %s", stage_summary())
+    logger.info("Token usage: %s", ledger.stats())
+    logger.info("Event loop lag: %s", loop_lag.snapshot())
+    logger.info("Slot extraction: %s", extractor.stats())
+    logger.info("Local routing: %s", router.stats())
+    logger.info("Agent affinity: %s", affinity.stats())
+    logger.info("Platform connectors: %s", connectors.stats())
+    logger.info("Tool cache: %s", tool_cache_stats())
+    await connectors.aclose()
+    logger.info("Session store: %s", sessions.stats())
+    await sessions.close()
+    loop_lag.stop()
+    flush_traces()
+    await aclose()
 
-    # Define agents with clear, concise instructions
-    DestinationAgent = Agent(
-        name="destination_agent",
-        instructions="""
-        Suggest 2-3 destinations based on user mood, interests, or budget (e.g., “50,000 PKR”). Use chat history and session data (destination/budget) for personalization. Provide PKR/USD costs for Pakistani travelers in 2025. End with “Want to book, explore attractions, or adjust budget?” Deliver concise, friendly, actionable answers.
-        """,
-        handoff_description="Handles destination suggestions."
-    )
 
-    BookingAgent = Agent(
-        name="booking_agent",
-        instructions="""
-            You are the booking agent. You can use the following tools:
-            - get_flights(destination)
-            - suggest_hotels(destination)
-            - confirm_booking(flight, hotel, destination)
-            - manage_budget(flight_price, hotel_price, budget)
-            - integrate_platform(platform, destination)
-
-            Your goal is to:
-            1. Suggest realistic flights & hotels
-            2. Respect budget if provided
-            3. Call tools to simulate booking
-            4. Always respond with actionable info
-
-            ALWAYS use tools. NEVER say “I cannot search…” or “I cannot confirm…”
-            """,
-        handoff_description="Handles travel bookings.",
-        tools=[get_flights, suggest_hotels, confirm_booking, integrate_platform, manage_budget]
-    )
-
-    ExploreAgent = Agent(
-        name="explore_agent",
-        instructions="""
-        For attraction/food queries, suggest 2-3 attractions and food options using get_travel_alerts() for alerts. Use chat history and session data (destination). Tailor for Pakistani travelers in 2025. End with “Need booking help, more destinations, or budget tracking?” Deliver concise, friendly answers.
-        """,
-        handoff_description="Handles attractions and food suggestions.",
-        tools=[get_travel_alerts]
-    )
-
-    triage_agent = Agent(
-        name="triage_agent",
-        instructions="""
-            You are the triage agent for travel planning.
-
-            **Always** route messages based on these keywords:
-
-            - To `BookingAgent`: if input mentions flights, hotels, booking, Skyscanner, Booking.com, confirm, budget check.
-            - To `ExploreAgent`: if input mentions explore, food, attraction, alerts, or names of cities with "explore".
-            - To `DestinationAgent`: if input is vague or just mentions mood/interest (e.g. “I want nature”, “Where should I go?”)
-
-            If unsure, prefer routing to BookingAgent.
-            """,
-        handoffs=[DestinationAgent, BookingAgent, ExploreAgent]
-    )
-
-    # Store agents and config
-    cl.user_session.set("destination_agent", DestinationAgent)
-    cl.user_session.set("booking_agent", BookingAgent)
-    cl.user_session.set("explore_agent", ExploreAgent)
-    cl.user_session.set("triage_agent", triage_agent)
-    cl.user_session.set("config", config)
+@cl.on_chat_start
+async def start():
+    # Agents and config are shared; chat history and trip data live in the
+    # session store (restored if this chat was already going on another worker)
+    state = await sessions.get(cl.context.session.thread_id)
+    state.setdefault("memory", ConversationMemory())
+    state.setdefault("budget", None)
+    state.setdefault("destination", None)
+    state.setdefault("origin", None)
+    state.setdefault("nights", None)
+    cl.user_session.set("supervisor", RunSupervisor())
 
     await cl.Message(
         content="Welcome to the AI Travel Designer! Where would you like to go?"
     ).send()
 
+@cl.on_chat_end
+async def end():
+    # None when on_chat_start failed before creating it
+    if (supervisor := cl.user_session.get("supervisor")) is not None:
+        supervisor.cancel()
+    # Written back and dropped from this worker; a reconnect loads it again
+    await sessions.evict(cl.context.session.thread_id)
+
 @cl.on_message
 async def main(message: cl.Message):
+    # Fair queuing of this turn's model requests across sessions
+    set_session(cl.user_session.get("id"))
+
     msg = cl.Message(content="Let me think about that...")
     await msg.send()
 
-    triage_agent: Agent = cast(Agent, cl.user_session.get("triage_agent"))
-    config: RunConfig = cast(RunConfig, cl.user_session.get("config"))
-    history = cl.user_session.get("chat_history") or []
+    config = get_run_config()
+    key = cl.context.session.thread_id
+    state = await sessions.get(key)
+    memory: ConversationMemory = state.setdefault("memory", ConversationMemory())
 
     # Use raw input (assume Gemini handles Urdu)
-    user_input = message.content.lower()
+    user_input = message.content
 
-    # Store budget or destination
-    if "budget" in user_input:
-        try:
-            budget = float(user_input.split("budget")[1].split()[0].replace("₹", "").replace(",", ""))
-            cl.user_session.set("budget", budget)
-        except:
-            pass
+    # Fill the trip slots locally; they reach the agents as pinned facts, so
+    # the model does not re-derive them from the history every turn
+    for slot, value in extractor.extract(user_input).items():
+        state[slot] = value
+        memory.pin(slot, extractor.describe(slot, value))
 
     # Append to history
-    history.append({"role": "user", "content": user_input})
+    memory.add("user", user_input)
 
+    turn = None
     try:
-        # Pass chat history
-        result = await Runner.run(
-            starting_agent=triage_agent,
-            input=history,
-            run_config=config
-        )
+        # Skip the triage model call when the intent is clear locally,
+        # otherwise stay with the specialist from the previous turn
+        route = router.route(user_input)
+        sticky = None if route else affinity.start_agent(state.get("last_agent"))
+        agent = REGISTRY[route] if route else sticky or triage_agent
+        hooks = router.triage_timer() if agent is triage_agent else None
+
+        # Pass the recent turns plus summary and pinned facts, compacted if they
+        # go over the prompt budget. A newer message cancels this run; only the
+        # latest turn updates the session (its tokens are counted either way)
+        supervisor: RunSupervisor = cl.user_session.get("supervisor")
+        items = ledger.fit(agent, memory.to_input(), shrink=memory.compact)
+        turn = ledger.turn(hooks)
+        result = await supervisor.run(run_into_message(agent, items, config, msg, hooks=turn))
         response_result = result.final_output
-
-        msg.content = response_result
-        await msg.update()
+        if sticky is not None:
+            affinity.record(sticky, result.last_agent)
+        state["last_agent"] = result.last_agent.name
 
         # Update history
-        history.append({"role": "assistant", "content": response_result})
-        cl.user_session.set("chat_history", history)
+        memory.add("assistant", response_result)
+        logger.info("Memory after turn: %s", memory.stats())
 
+    except Superseded:
+        # A newer message took over; this turn leaves the session state alone
+        msg.content = "_Stopped: answering your newer message instead._"
+        await msg.update()
+    except TimeoutError:
+        msg.content = "Sorry, that took too long. Please try again."
+        await msg.update()
     except Exception as e:
         msg.content = f"Oops, something went wrong: {str(e)}"
-        await msg.update()
\ No newline at end of file
+        await msg.update()
+    finally:
+        if turn is not None:
+            turn.end(state)
+        sessions.save(key, state)
@@ -0,0 +1,54 @@
+from agent_common.router import IntentRouter
+
+# Mirrors the triage agent's keyword routing: BookingAgent for flights, hotels
+# and budget checks, ExploreAgent for food, attractions and alerts,
+# DestinationAgent for vague mood/interest messages.
+ROUTE_RULES = {
+    "booking_agent": [
+        r"flights?\b", r"hotels?\b", r"book", r"skyscanner", r"booking\.com", r"confirm", r"budget",
+        r"tickets?\b", r"fly\b",
+    ],
+    "explore_agent": [
+        r"explore", r"food", r"eat\b", r"restaurants?\b", r"attractions?\b", r"alerts?\b", r"sightseeing",
+        r"things to do", r"places to visit",
+    ],
+    "destination_agent": [
+        r"where should i go", r"i want (?:nature|mountains|beach|snow|peace|adventure)", r"i feel",
+        r"i(?:'m| am) in the mood", r"suggest (?:a |some )?(?:destination|place)", r"holiday ideas?",
+    ],
+}
+
+TRAINING_EXAMPLES = {
+    "booking_agent": [
+        "find me flights from karachi to dubai",
+        "book a hotel in istanbul",
+        "cheap flight and hotel for hunza",
+        "confirm my booking for skardu",
+        "check my budget of 100000 pkr for maldives",
+        "show hotels on booking.com for murree",
+        "how much is a ticket from lahore to dubai",
+        "can you book the premier inn for me",
+    ],
+    "explore_agent": [
+        "what should i explore in istanbul",
+        "best food to try in hunza",
+        "top attractions in dubai",
+        "any travel alerts for skardu",
+        "things to do in neelum valley",
+        "where can i eat biryani in karachi",
+        "is it safe to visit murree this week",
+        "famous places to visit in maldives",
+    ],
+    "destination_agent": [
+        "i want nature",
+        "where should i go this summer",
+        "i feel stressed and need a break",
+        "suggest a place for my honeymoon",
+        "somewhere with mountains and snow",
+        "i love beaches, any ideas",
+        "a cheap trip for students",
+        "i want adventure",
+    ],
+}
+
+router = IntentRouter(ROUTE_RULES, TRAINING_EXAMPLES)
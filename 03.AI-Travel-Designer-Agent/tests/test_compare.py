@@ -0,0 +1,27 @@
+import asyncio
+
+from catalog import catalog
+from compare import DestinationComparer
+
+
+def compare(destinations, answer):
+    async def fetch(platform, destination):
+        return answer | {"platform": platform, "destination": destination}
+
+    return asyncio.run(DestinationComparer(catalog, platform_fetch=fetch).compare(destinations))
+
+
+def test_spellings_of_one_destination_are_compared_once():
+    rows = compare(["Dubai", "dubai ", "dubay", "Istanbul"], {"source": "catalog", "results": []})["comparison"]
+    assert [row["destination"] for row in rows] == ["Dubai", "Istanbul"]
+
+
+def test_catalog_answers_are_not_repeated_as_platform_data():
+    row = compare(["Dubai"], {"source": "catalog", "results": []})["comparison"][0]
+    assert "platforms" not in row
+    assert row["cheapest_flight"] and row["hotels"]
+
+
+def test_live_platform_data_is_kept():
+    row = compare(["Dubai"], {"source": "live", "results": [{"price_pkr": 1}]})["comparison"][0]
+    assert set(row["platforms"]) == {"flights", "hotels"}
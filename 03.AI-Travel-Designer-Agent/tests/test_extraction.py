@@ -0,0 +1,51 @@
+import pytest
+
+from catalog import catalog
+from extraction import TripExtractor
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return TripExtractor(catalog)
+
+
+def test_all_slots_from_one_message(extractor):
+    assert extractor.extract("Plan a trip to Dubai from Karachi for 5 nights under 200k") == {
+        "budget": 200_000, "destination": "dubai", "origin": "Karachi", "nights": 5,
+    }
+
+
+@pytest.mark.parametrize("text, budget", [
+    ("I have PKR 1.5 lakh", 150_000),
+    ("budget 80000", 80_000),
+    ("₹50,000 is my limit", 50_000),
+    ("$1,200 budget, 2 weeks away", 1_200 * catalog.pkr_per_usd),
+    ("flight PK 303 in 2025 for 3 people", None),
+    ("budget for 3 people", None),
+    ("my budget is 100k, flight around $300 is fine", 100_000),
+    ("I have 60000 budget", 60_000),
+    ("hotel 20k a night, 50k max", 50_000),
+    ("flights are $300 or 90k", 90_000),
+])
+def test_budget(extractor, text, budget):
+    assert extractor.budget(text) == budget
+
+
+@pytest.mark.parametrize("text, nights", [
+    ("5 nights", 5),
+    ("a 4-day trip", 3),
+    ("two weeks", 14),
+    ("this weekend", 2),
+    ("sometime soon", None),
+])
+def test_nights(extractor, text, nights):
+    assert extractor.nights(text) == nights
+
+
+def test_misspelled_destination_after_a_cue(extractor):
+    assert extractor.places("hotels in istambul") == {"destination": "istanbul"}
+    assert extractor.places("a trip to neelam") == {"destination": "neelum valley"}
+
+
+def test_a_city_after_from_is_the_origin(extractor):
+    assert extractor.places("flights from lahore to hunza") == {"origin": "Lahore", "destination": "hunza"}
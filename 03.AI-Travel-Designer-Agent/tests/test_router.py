@@ -0,0 +1,31 @@
+import pytest
+
+from router import TRAINING_EXAMPLES, router
+
+
+@pytest.mark.parametrize("text, label", [
+    ("find me flights to dubai", "booking_agent"),
+    ("top attractions in istanbul", "explore_agent"),
+    ("where should i go this summer", "destination_agent"),
+])
+def test_keyword_rules(text, label):
+    assert router.route(text) == label
+
+
+def test_classifier_fits_its_training_examples():
+    for label, texts in TRAINING_EXAMPLES.items():
+        for text in texts:
+            assert router.classifier.predict(text)[0] == label
+
+
+def test_long_off_topic_messages_are_left_to_triage():
+    text = ("my grandmother keeps asking whether her tomatoes will survive the winter frost, "
+            "and honestly I have no idea what to tell her about the garden")
+    assert router.classifier.predict(text)[1] == 0.0
+    assert router.route(text) is None
+
+
+def test_confidence_does_not_grow_with_repetition():
+    label, confidence = router.classifier.predict(" ".join(["cheap hunza"] * 3))
+    assert 0.0 < confidence < router.threshold
+    assert router.classifier.predict(" ".join(["cheap hunza"] * 20)) == (label, pytest.approx(confidence))
@@ -0,0 +1,123 @@
+from types import MappingProxyType
+from typing import Literal
+
+from agent_common.tiers import apply_tiers
+from agents import Agent, RunContextWrapper, function_tool
+
+from engine import World
+
+# The agent graph is built once per process. Chat sessions only reference it;
+# the game World stays in the session store. Dice, damage, items and location
+# are resolved by engine.py: commands before the run, free-text actions
+# through the resolve_action tool. The agents only narrate.
+
+# Model tier per agent (see agent_common.tiers): short combat and inventory narration on
+# the fast model, story narration cascades
+TIER_POLICY = {"GameMaster": "fast", "NarratorAgent": "cascade", "MonsterAgent": "fast", "ItemAgent": "fast"}
+
+NARRATE_ONLY = (
+    "The game engine resolves every action. When you are given an outcome, narrate exactly that. "
+    "When the player asks for an action without one (fighting, moving on, searching or looting, checking items, "
+    "drinking a potion, starting over), call resolve_action first and narrate what it returns. "
+    "If it is unclear what the player wants to do, ask them. Never invent dice rolls, damage, items or locations."
+)
+# Actions the agents may resolve through the tool in one turn
+MAX_TOOL_ACTIONS = 3
+
+
+class GameTurn:
+    """Run context of a free-text turn: the World it plays on and the outcomes the engine resolved."""
+
+    __slots__ = ("world", "outcomes")
+
+    def __init__(self, world: World):
+        self.world = world
+        self.outcomes = []
+
+
+@function_tool
+def resolve_action(ctx: RunContextWrapper[GameTurn],
+                   action: Literal["explore", "fight", "inventory", "heal", "restart"]) -> str:
+    """Resolves a game action with the game engine and returns the outcome to narrate.
+
+    Args:
+        action: explore (move on, look around, search or loot), fight (attack or keep fighting the monster),
+            inventory (check items), heal (drink a potion) or restart (start a new game).
+    """
+    turn = ctx.context
+    if not isinstance(turn, GameTurn):
+        return "This action is already resolved: narrate the outcome you were given."
+    if len(turn.outcomes) >= MAX_TOOL_ACTIONS:
+        return "No more actions this turn: narrate what has happened so far."
+    outcome = turn.world.step(action)
+    turn.outcomes.append(outcome)
+    return "\n".join(f"- {event.detail}" for event in outcome.events) + f"\nPlayer state now: {turn.world.player.summary()}"
+
+# Engine action -> agent that narrates it
+ACTION_AGENTS = {
+    "explore": "NarratorAgent",
+    "restart": "NarratorAgent",
+    "fight": "MonsterAgent",
+    "inventory": "ItemAgent",
+    "heal": "ItemAgent",
+}
+
+
+def build_registry():
+    """Builds every agent and returns a read-only name -> agent mapping."""
+    # Define Agents
+    narrator_agent = Agent(
+        name="NarratorAgent",
+        instructions=(
+            "You are the Narrator for a fantasy adventure game. "
+            "Create immersive story descriptions based on player actions (e.g., 'explore', 'move forward'). "
+            + NARRATE_ONLY
+        ),
+        tools=[resolve_action],
+    )
+
+    monster_agent = Agent(
+        name="MonsterAgent",
+        instructions=(
+            "You handle combat in a fantasy adventure game. "
+            "When the player chooses to fight, describe the monster encounter and every roll you are given. "
+            "A roll of 10+ on a D20 is a hit, dealing 5 damage. Below 10 is a miss. "
+            + NARRATE_ONLY
+        ),
+        tools=[resolve_action],
+    )
+
+    item_agent = Agent(
+        name="ItemAgent",
+        instructions=(
+            "You manage the player's inventory and rewards in a fantasy adventure game. "
+            "When the player checks inventory, uses an item or receives a reward, describe their items. "
+            + NARRATE_ONLY
+        ),
+        tools=[resolve_action],
+    )
+
+    game_master_agent = Agent(
+        name="GameMaster",
+        instructions=(
+            "You are the Game Master for a fantasy adventure game. "
+            "Based on the player's input, decide whether to hand off to the NarratorAgent (for story progression), "
+            "MonsterAgent (for combat), or ItemAgent (for inventory/rewards); they resolve actions with the game engine. "
+            "If the input is unclear, ask the player to clarify, suggesting 'explore', 'fight' or 'check inventory'."
+        ),
+        handoff_description="Hand back here only when the user changes to a topic outside your specialty.",
+        handoffs=[narrator_agent, monster_agent, item_agent]
+    )
+
+    # Specialists keep the conversation on follow-up turns and hand back to
+    # game_master_agent only when the topic changes
+    for specialist in (narrator_agent, monster_agent, item_agent):
+        specialist.handoffs.append(game_master_agent)
+
+    agents = (narrator_agent, monster_agent, item_agent, game_master_agent)
+    apply_tiers(agents, TIER_POLICY)
+    return MappingProxyType({agent.name: agent for agent in agents})
+
+
+REGISTRY = build_registry()
+game_master_agent = REGISTRY["GameMaster"]
@@ -0,0 +1,205 @@
+import random
+import re
+from collections import deque
+
+# Local, deterministic game rules. The engine resolves every action (dice,
+# damage, health, items, location): commands before the model is called, and
+# free-text actions through the agents' engine tool. The agents only narrate
+# outcomes. Each session owns one World, seeded once, so the same seed and
+# actions always replay the same game.
+
+START_HEALTH = 20
+START_INVENTORY = ("sword", "shield")
+START_LOCATION = "a dark forest"
+LOCATIONS = ("a dark forest", "an ancient castle", "a mystical cave")
+HIT_ROLL = 10  # D20 roll needed to hit
+HIT_DAMAGE = 5
+POTION_HEAL = 5
+LOG_SIZE = 50
+
+# (event text, health change, item gained)
+EVENTS = (
+    ("You find a hidden treasure chest with gold!", 0, "gold"),
+    ("A trap springs! Lose 5 health.", -5, None),
+    ("You discover a mysterious potion.", 0, "potion"),
+    ("A friendly NPC offers you a map.", 0, "map"),
+)
+MONSTERS = (("goblin", 5), ("wolf", 10), ("skeleton", 10), ("troll", 15))
+
+# Commands: a short message that starts with the action's verb ("attack the
+# goblin", "let's explore", "check my inventory"). Messages that only mention
+# one of these words ("I look at the map and go back") are left to the agents,
+# which resolve actions through the engine tool.
+COMMAND_PREFIX = r"^(?:(?:please|ok|okay|now|then|i|i'll|i will|let's|lets|let me)\s+)*"
+MAX_COMMAND_WORDS = 8
+ACTION_PATTERNS = (
+    ("restart", re.compile(COMMAND_PREFIX + r"(?:restart|new game|start over|play again)\b")),
+    ("heal", re.compile(COMMAND_PREFIX + r"(?:(?:drink|use|quaff)\b.*\bpotion\b|heal\b)")),
+    ("fight", re.compile(COMMAND_PREFIX + r"(?:fight|attack|strike|hit|battle)\b")),
+    ("inventory", re.compile(
+        COMMAND_PREFIX + r"(?:(?:check|show|open|view)\s+(?:my\s+)?(?:inventory|items|bag)\b|(?:inventory|items|bag)$)")),
+    ("explore", re.compile(COMMAND_PREFIX + r"(?:explore|move|walk|go|travel|search|head|continue|look around|look$)\b")),
+)
+
+
+def parse_action(text: str) -> str | None:
+    """Maps a command to an engine action, or None when the agents have to interpret the message."""
+    text = " ".join(text.lower().split()).strip(" .!")
+    if not text or len(text.split()) > MAX_COMMAND_WORDS:
+        return None
+    for action, pattern in ACTION_PATTERNS:
+        if pattern.match(text):
+            return action
+    return None
+
+
+class PlayerState:
+    __slots__ = ("health", "inventory", "location")
+
+    def __init__(self, health=START_HEALTH, inventory=START_INVENTORY, location=START_LOCATION):
+        self.health = health
+        self.inventory = list(inventory)
+        self.location = location
+
+    def summary(self) -> str:
+        return f"Health: {self.health}, Inventory: {self.inventory}, Location: {self.location}"
+
+
+class Event:
+    __slots__ = ("turn", "kind", "detail")
+
+    def __init__(self, turn: int, kind: str, detail: str):
+        self.turn = turn
+        self.kind = kind
+        self.detail = detail
+
+    def __repr__(self):
+        return f"Event({self.turn}, {self.kind!r}, {self.detail!r})"
+
+
+class Outcome:
+    __slots__ = ("action", "events", "game_over")
+
+    def __init__(self, action: str):
+        self.action = action
+        self.events: list[Event] = []
+        self.game_over = False
+
+    def as_prompt(self, player_input: str, player: PlayerState) -> str:
+        """Model input: what the player typed plus the already-resolved outcome to narrate."""
+        lines = [f"- {event.detail}" for event in self.events]
+        return (
+            f"Player action: {player_input}\n"
+            "Outcome (already decided by the game engine; narrate exactly this, "
+            "do not roll dice or change health, items or location):\n"
+            + "\n".join(lines)
+            + f"\nPlayer state now: {player.summary()}"
+        )
+
+
+class World:
+    __slots__ = ("seed", "rng", "player", "monster", "turn", "version", "log", "over")
+
+    def __init__(self, seed: int | None = None):
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.player = PlayerState()
+        self.monster = None  # [name, health] while a fight is on
+        self.turn = 0
+        self.version = 0  # bumped whenever an action changes the state
+        self.log = deque(maxlen=LOG_SIZE)
+        self.over = False
+
+    def fork(self) -> "World":
+        """Independent copy, RNG state included, for trying an action without touching this world."""
+        clone = World.__new__(World)
+        clone.seed = self.seed
+        clone.rng = random.Random()
+        clone.rng.setstate(self.rng.getstate())
+        clone.player = PlayerState(self.player.health, self.player.inventory, self.player.location)
+        clone.monster = list(self.monster) if self.monster else None
+        clone.turn = self.turn
+        clone.version = self.version
+        clone.log = deque(self.log, maxlen=LOG_SIZE)  # events are never changed once logged
+        clone.over = self.over
+        return clone
+
+    def record(self, outcome: Outcome, kind: str, detail: str):
+        event = Event(self.turn, kind, detail)
+        outcome.events.append(event)
+        self.log.append(event)
+
+    def roll(self, sides: int = 20) -> int:
+        return self.rng.randint(1, sides)
+
+    def step(self, action: str) -> Outcome:
+        """Resolves one action and returns what happened."""
+        outcome = Outcome(action)
+        self.turn += 1
+        if action == "restart":
+            version = self.version
+            self.__init__(self.rng.randrange(2**32))
+            self.version = version + 1
+            self.record(outcome, "restart", f"A new adventure begins in {self.player.location}.")
+            return outcome
+        if self.over:
+            self.record(outcome, "game_over", "The adventure has ended. Type 'restart' to play again.")
+            outcome.game_over = True
+            return outcome
+
+        getattr(self, f"_{action}")(outcome)
+        if action != "inventory":
+            self.version += 1
+        if self.player.health <= 0:
+            self.player.health = 0
+            self.over = outcome.game_over = True
+            self.record(outcome, "game_over", "Game Over! Your health reached 0.")
+        return outcome
+
+    def _explore(self, outcome: Outcome):
+        player = self.player
+        player.location = self.rng.choice([place for place in LOCATIONS if place != player.location])
+        self.monster = None
+        self.record(outcome, "move", f"The player moves to {player.location}.")
+        text, health, item = self.rng.choice(EVENTS)
+        player.health += health
+        if item:
+            player.inventory.append(item)
+        self.record(outcome, "event", text)
+
+    def _fight(self, outcome: Outcome):
+        if self.monster is None:
+            name, health = self.rng.choice(MONSTERS)
+            self.monster = [name, health]
+            self.record(outcome, "encounter", f"A {name} ({health} health) attacks in {self.player.location}!")
+        name = self.monster[0]
+
+        roll = self.roll()
+        if roll >= HIT_ROLL:
+            self.monster[1] -= HIT_DAMAGE
+            self.record(outcome, "attack", f"Player rolls {roll} on a D20: hit, the {name} takes {HIT_DAMAGE} damage.")
+        else:
+            self.record(outcome, "attack", f"Player rolls {roll} on a D20: miss.")
+        if self.monster[1] <= 0:
+            self.monster = None
+            self.record(outcome, "victory", f"The {name} is defeated.")
+            return
+
+        roll = self.roll()
+        if roll >= HIT_ROLL:
+            self.player.health -= HIT_DAMAGE
+            self.record(outcome, "defend", f"The {name} rolls {roll}: hit, the player takes {HIT_DAMAGE} damage.")
+        else:
+            self.record(outcome, "defend", f"The {name} rolls {roll}: miss.")
+
+    def _inventory(self, outcome: Outcome):
+        self.record(outcome, "inventory", f"The player carries: {', '.join(self.player.inventory) or 'nothing'}.")
+
+    def _heal(self, outcome: Outcome):
+        player = self.player
+        if "potion" not in player.inventory:
+            self.record(outcome, "heal", "The player has no potion to drink.")
+            return
+        player.inventory.remove("potion")
+        player.health = min(START_HEALTH, player.health + POTION_HEAL)
+        self.record(outcome, "heal", f"The player drinks a potion and recovers to {player.health} health.")
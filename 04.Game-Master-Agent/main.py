@@ -1,9 +1,21 @@
-import random
-from agents import Agent, OpenAIChatCompletionsModel, RunConfig, Runner, function_tool
-from openai import AsyncOpenAI
+import logging
+import os
+
+from agent_common.affinity import AgentAffinity
+from agent_common.health import loop_lag, session_stats
+from agent_common.provider import aclose, get_run_config, pool_metrics, scheduler_stats, tier_stats, warm_up
+from agent_common.scheduler import set_session
+from agent_common.session_store import sessions
+from agent_common.streaming import run_into_message, ttft_summary
+from agent_common.supervisor import RunSupervisor, Superseded, supervisor_stats
+from agent_common.tracing_local import flush as flush_traces, install_local_tracing, mount_metrics, stage_summary
+from agent_common.usage import ledger
 import chainlit as cl
 from dotenv import load_dotenv
-import os
+
+from agent_graph import ACTION_AGENTS, REGISTRY, GameTurn, game_master_agent
+from engine import World, parse_action
+from speculation import SPECULATE, Speculator, speculation_stats
 
 # Load environment variables
 load_dotenv()
@@ -12,155 +24,166 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY is not set. Please set it in the .env file.")
 
+logger = logging.getLogger(__name__)
+affinity = AgentAffinity(REGISTRY, game_master_agent.name)
+
+# Agent, handoff, tool and model spans stay on this machine; per-stage
+# latency percentiles and the other runtime stats are served on /metrics
+install_local_tracing()
+METRICS = {
+    "pool": pool_metrics,
+    "ttft": ttft_summary,
+    "tiers": tier_stats,
+    "scheduler": scheduler_stats,
+    "supervisor": supervisor_stats,
+    "loop_lag": loop_lag.snapshot,
+    "sessions": session_stats,
+    "usage": ledger.stats,
+    "session_store": sessions.stats,
+    "affinity": affinity.stats,
+    "speculation": speculation_stats,
+}
+
+
+@cl.on_app_startup
+async def startup():
+    # Open pooled connections to the model API before the first chat arrives
+    await warm_up()
+    loop_lag.start()
+    from chainlit.server import app
+    mount_metrics(app, extra=METRICS)
+
+
+@cl.on_app_shutdown
+async def shutdown():
+    logger.info("Model connection pool at shutdown: %s", pool_metrics())
+    logger.info("Time to first token: %s", ttft_summary())
+    logger.info("Model tiers: %s", tier_stats())
+    logger.info("Request scheduler: %s", scheduler_stats())
+    logger.info("Run supervision: %s", supervisor_stats())
+    logger.info("Stage latency: %s", stage_summary())
+    logger.info("Token usage: %s", ledger.stats())
+    logger.info("Event loop lag: %s", loop_lag.snapshot())
+    logger.info("Agent affinity: %s", affinity.stats())
+    if SPECULATE:
+        logger.info("Speculative narration: %s", speculation_stats())
+    logger.info("Session store: %s", sessions.stats())
+    await sessions.close()
+    loop_lag.stop()
+    flush_traces()
+    await aclose()
+
 
 # Chainlit Integration
 @cl.on_chat_start
 async def start():
-    # Initialize AsyncOpenAI client
-    client = AsyncOpenAI(
-        api_key=GEMINI_API_KEY,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai"
-    )
-
-    # Define the model
-    model = OpenAIChatCompletionsModel(
-        model="gemini-2.0-flash",
-        openai_client=client
-    )
-
-    # Configure the runner
-    config = RunConfig(
-        model=model,
-        model_provider=client,
-        tracing_disabled=True
-    )
-
-    # Define Tools
-    @function_tool
-    def roll_dice(sides: int) -> int:
-        """Rolls a dice with the specified number of sides."""
-        return random.randint(1, sides)
-
-    @function_tool
-    def generate_event() -> str:
-        """Generates a random game event."""
-        events = [
-            "You find a hidden treasure chest with gold!",
-            "A trap springs! Lose 5 health.",
-            "You discover a mysterious potion.",
-            "A friendly NPC offers you a map."
-        ]
-        return random.choice(events)
-
-    # Define Agents
-    narrator_agent = Agent(
-        name="NarratorAgent",
-        instructions=(
-            "You are the Narrator for a fantasy adventure game. "
-            "Create immersive story descriptions based on player actions (e.g., 'explore', 'move forward'). "
-            "Use the generate_event tool to add random events during exploration."
-        ),
-        model=model,
-        tools=[roll_dice, generate_event]
-    )
-
-    monster_agent = Agent(
-        name="MonsterAgent",
-        instructions=(
-            "You handle combat in a fantasy adventure game. "
-            "When the player chooses to fight, describe a monster encounter and use roll_dice to determine outcomes. "
-            "A roll of 10+ on a D20 is a hit, dealing 5 damage. Below 10 is a miss."
-        ),
-        model=model,
-        tools=[roll_dice]
-    )
-
-    item_agent = Agent(
-        name="ItemAgent",
-        instructions=(
-            "You manage the player's inventory and rewards in a fantasy adventure game. "
-            "When the player checks inventory or receives a reward, describe their items or add new ones using generate_event."
-        ),
-        model=model,
-        tools=[generate_event]
-    )
-
-    game_master_agent = Agent(
-        name="GameMaster",
-        instructions=(
-            "You are the Game Master for a fantasy adventure game. "
-            "Based on the player's input, decide whether to hand off to the NarratorAgent (for story progression), "
-            "MonsterAgent (for combat), or ItemAgent (for inventory/rewards). "
-            "If the input is unclear, ask the player to clarify. "
-            "Use tools when appropriate (e.g., roll_dice for combat, generate_event for exploration)."
-        ),
-        model=model,
-        handoffs=[narrator_agent, monster_agent, item_agent]
-    )
-
-    # Store agents and config
-    cl.user_session.set("narrator_agent", narrator_agent)
-    cl.user_session.set("monster_agent", monster_agent)
-    cl.user_session.set("item_agent", item_agent)
-    cl.user_session.set("game_master_agent", game_master_agent)
-    cl.user_session.set("client", client)
-    cl.user_session.set("config", config)
-    
-
+    # Agents are shared; the game World lives in the session store (restored
+    # if this game was already going on another worker), its speculations here
+    state = await sessions.get(cl.context.session.thread_id)
+    world = state.setdefault("world", World())
+    cl.user_session.set("supervisor", RunSupervisor())
     await cl.Message(
         content="Welcome to the Fantasy Adventure Game! Type 'explore', 'fight', or 'check inventory' to begin."
     ).send()
+    if SPECULATE:
+        set_session(cl.user_session.get("id"))
+        speculator = Speculator(get_run_config())
+        cl.user_session.set("speculator", speculator)
+        speculator.schedule(world)
+
+@cl.on_chat_end
+async def end():
+    # None when on_chat_start failed before creating it
+    if (supervisor := cl.user_session.get("supervisor")) is not None:
+        supervisor.cancel()
+    speculator: Speculator | None = cl.user_session.get("speculator")
+    if speculator is not None:
+        speculator.cancel()
+    # Written back and dropped from this worker; a reconnect loads it again
+    await sessions.evict(cl.context.session.thread_id)
 
 @cl.on_message
 async def main(message: cl.Message):
+    # Fair queuing of this turn's model requests across sessions
+    set_session(cl.user_session.get("id"))
+
     # Initialize or retrieve session state
-    if not cl.user_session.get("player_state"):
-        cl.user_session.set("player_state", {
-            "health": 20,
-            "inventory": ["sword", "shield"],
-            "location": "a dark forest"
-        })
-
-    player_input = message.content.strip().lower()
-    player_state = cl.user_session.get("player_state")
-    game_master = cl.user_session.get("game_master_agent")
-    config = cl.user_session.get("config")
+    key = cl.context.session.thread_id
+    state = await sessions.get(key)
+    world: World = state.setdefault("world", World())
+    speculator: Speculator | None = cl.user_session.get("speculator")
+    supervisor: RunSupervisor = cl.user_session.get("supervisor")
+
+    msg = cl.Message(content="The Game Master is thinking...")
+    await msg.send()
 
+    turn = None
     try:
-        # Run the GameMasterAgent with the player's input
-        result = await Runner.run(
-            game_master,
-            input=message.content
-        )
-
-        # Parse the result and update player state
-        response = result.final_output
+        # The turn plays on a fork of the World, which becomes the session's
+        # World only once the turn completes: a superseded, timed-out or failed
+        # turn leaves health, inventory and location as they were.
+        # Commands are resolved up front and go straight to the agent that
+        # narrates them; anything else starts at the last specialist or the
+        # GameMaster, and the specialists resolve actions with the engine tool
+        fork = world.fork()
+        version = world.version
+        action = parse_action(message.content)
+        sticky = None
+        context = None
+        if action is not None:
+            outcomes = [fork.step(action)]
+            agent = REGISTRY[ACTION_AGENTS[action]]
+            prompt = outcomes[0].as_prompt(message.content, fork.player)
+        else:
+            sticky = affinity.start_agent(state.get("last_agent"))
+            agent = sticky or game_master_agent
+            prompt = f"Player says: {message.content}\nPlayer state: {world.player.summary()}"
+            context = GameTurn(fork)
+            outcomes = context.outcomes
+
+        async def narrate():
+            if speculator is not None and action is not None:
+                # Narrated in the background while the player was reading the last turn
+                speculation = await speculator.take(action, version, outcomes[0])
+                if speculation is not None:
+                    return speculation.text, speculation.agent, None
+            result = await run_into_message(agent, ledger.fit(agent, prompt), get_run_config(), msg, hooks=turn,
+                                            context=context)
+            return result.final_output, result.last_agent.name, result.last_agent
+
+        # A newer message cancels this turn, including a wait for its speculated
+        # narration, and only the latest turn updates the session (its tokens
+        # are counted either way)
+        turn = ledger.turn()
+        response, state["last_agent"], last_agent = await supervisor.run(narrate())
+        if sticky is not None:
+            affinity.record(sticky, last_agent)
+        state["world"] = world = fork
+
         if not response:
             response = "Please try again with a valid action."
-
-        # Update player state based on response
-        if "damage" in response.lower():
-            damage = 5 if "hit" in response.lower() else 0
-            player_state["health"] -= damage
-            if player_state["health"] <= 0:
-                response += "\nGame Over! Your health reached 0."
-
-
-        # Update location if the player moves
-        if "explore" in player_input or "move" in player_input:
-            locations = ["a dark forest", "an ancient castle", "a mystical cave"]
-            player_state["location"] = random.choice(locations)
-
-        # Save updated state
-        cl.user_session.set("player_state", player_state)
+        if any(outcome.game_over for outcome in outcomes) and "Game Over" not in response:
+            response += "\nGame Over! Your health reached 0. Type 'restart' to play again."
 
         # Send response to Chainlit
-        await cl.Message(
-            content=f"{response}\n\n**Player State**: Health: {player_state['health']}, Inventory: {player_state['inventory']}, Location: {player_state['location']}"
-        ).send()
-
+        msg.content = f"{response}\n\n**Player State**: {world.player.summary()}"
+        await msg.update()
+
+        # Start on the likely next actions while the player reads this one
+        if speculator is not None:
+            speculator.schedule(world)
+
+    except Superseded:
+        # A newer message took over; this turn's World fork is dropped
+        msg.content = "_Stopped: answering your newer message instead._"
+        await msg.update()
+    except TimeoutError:
+        msg.content = "Sorry, that took too long. Please try again."
+        await msg.update()
     except Exception as e:
-        await cl.Message(
-            content=f"An error occurred: {str(e)}. Please check your API key or try again."
-        ).send()
-
+        msg.content = f"An error occurred: {str(e)}. Please check your API key or try again."
+        await msg.update()
+    finally:
+        if turn is not None:
+            turn.end(state)
+        sessions.save(key, state)
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import time
+
+from agent_common.scheduler import OUTPUT_TOKEN_ALLOWANCE, batch_priority
+from agent_common.usage import input_tokens, ledger, prompt_parts
+from agents import Runner, RunConfig
+
+from agent_graph import ACTION_AGENTS, REGISTRY
+from engine import World
+
+logger = logging.getLogger(__name__)
+
+# Speculative narration (opt-in with SPECULATE=1). While the player reads a
+# turn, the likely next actions are played on forks of the World (same RNG
+# state, so the engine outcome is exactly what the real turn will produce)
+# and narrated in the background. If the player then picks one of them, the
+# narration is served without waiting for the model. Any speculation made for
+# an older state is cancelled as soon as the state changes.
+SPECULATE = os.getenv("SPECULATE", "0") == "1"
+SPECULATE_ACTIONS = tuple(os.getenv("SPECULATE_ACTIONS", "explore,fight,inventory").split(","))
+SPECULATION_TOKEN_BUDGET = int(os.getenv("SPECULATION_TOKEN_BUDGET", "20000"))  # per session
+SPECULATION_CONCURRENCY = int(os.getenv("SPECULATION_CONCURRENCY", "4"))  # per process
+
+# Speculative runs are background work: they never take more than a few model
+# slots and run at batch priority in the request scheduler, so interactive
+# turns from other players are not held up
+_slots = asyncio.Semaphore(SPECULATION_CONCURRENCY)
+
+
+class SpeculationStats:
+    def __init__(self):
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.failed = 0
+        self.hits = 0
+        self.misses = 0
+        self.tokens = 0
+        self.wasted_tokens = 0
+        self.saved_seconds = 0.0
+        self.skipped_over_budget = 0
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "started": self.started,
+            "completed": self.completed,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "tokens": self.tokens,
+            "wasted_tokens": self.wasted_tokens,
+            "saved_s": round(self.saved_seconds, 2),
+            "avg_saved_ms_per_hit": round(self.saved_seconds / self.hits * 1000, 1) if self.hits else 0.0,
+            "skipped_over_budget": self.skipped_over_budget,
+        }
+
+
+stats = SpeculationStats()
+
+
+class Speculation:
+    __slots__ = ("text", "agent", "seconds", "tokens")
+
+    def __init__(self, text: str, agent: str, seconds: float, tokens: int):
+        self.text = text
+        self.agent = agent
+        self.seconds = seconds
+        self.tokens = tokens
+
+
+def estimate_run_tokens(agent, prompt: str) -> int:
+    """Tokens one narration is expected to use: its whole prompt plus the output allowance."""
+    return sum(prompt_parts(agent).values()) + input_tokens(prompt) + OUTPUT_TOKEN_ALLOWANCE
+
+
+class Speculator:
+    """Per-session cache of speculative narrations, one per likely next action."""
+
+    def __init__(self, run_config: RunConfig | None = None, budget: int = SPECULATION_TOKEN_BUDGET):
+        self.run_config = run_config
+        self.tokens_left = budget
+        self.entries = {}  # action -> (version, event details, task)
+
+    def schedule(self, world: World):
+        """Starts narrating the likely next actions for the world's current state."""
+        if self.entries and all(version == world.version for version, _, _ in self.entries.values()):
+            return  # already speculating on this state
+        self.cancel()
+        if world.over:
+            return
+        for action in SPECULATE_ACTIONS:
+            fork = world.fork()
+            outcome = fork.step(action)
+            prompt = outcome.as_prompt(action, fork.player)
+            # Each run's estimate is reserved before it starts, so the runs
+            # started together cannot overrun the budget between them
+            estimate = estimate_run_tokens(REGISTRY[ACTION_AGENTS[action]], prompt)
+            if estimate > self.tokens_left:
+                stats.skipped_over_budget += 1
+                break
+            self.tokens_left -= estimate
+            details = tuple(event.detail for event in outcome.events)
+            task = asyncio.create_task(self._narrate(action, prompt))
+            # Handed back once the run is over; by then _narrate has charged what it actually used
+            task.add_done_callback(lambda _, estimate=estimate: self._release(estimate))
+            self.entries[action] = (world.version, details, task)
+            stats.started += 1
+
+    def _release(self, tokens: int):
+        self.tokens_left += tokens
+
+    async def _narrate(self, action: str, prompt: str) -> Speculation:
+        async with _slots:
+            started = time.perf_counter()
+            hooks = ledger.turn(background=True)
+            result = None
+            try:
+                with batch_priority():
+                    result = await Runner.run(REGISTRY[ACTION_AGENTS[action]], prompt, run_config=self.run_config,
+                                              hooks=hooks)
+            finally:
+                # Charged to the budget whether the run completes, fails or is cancelled
+                hooks.end()
+                tokens = hooks.total.input_tokens + hooks.total.output_tokens
+                self.tokens_left -= tokens
+                stats.tokens += tokens
+                if result is None:
+                    stats.wasted_tokens += tokens
+        stats.completed += 1
+        return Speculation(result.final_output, result.last_agent.name, time.perf_counter() - started, tokens)
+
+    async def take(self, action: str, version: int, outcome) -> Speculation | None:
+        """The narration speculated for this action at this state version, if it matches the real outcome.
+
+        Call after the real World.step(); every other speculation is stale afterwards and is dropped.
+        Waits for a speculation still running, so call it inside the turn's supervised run: the wait
+        then counts against the turn's deadline and a newer message cancels it.
+        """
+        entry = self.entries.pop(action, None)
+        self.cancel()
+        if entry is None:
+            stats.misses += 1
+            return None
+        spec_version, details, task = entry
+        if spec_version != version or details != tuple(event.detail for event in outcome.events):
+            self._drop(task)
+            stats.misses += 1
+            return None
+        try:
+            # Still running: waiting for it is quicker than starting over
+            waited = time.perf_counter()
+            speculation = await task
+        except Exception as e:
+            logger.info("Speculative narration failed: %s", e)
+            stats.failed += 1
+            stats.misses += 1
+            return None
+        # Perceived saving: the model latency minus whatever the player still had to wait
+        stats.hits += 1
+        stats.saved_seconds += max(0.0, speculation.seconds - (time.perf_counter() - waited))
+        return speculation
+
+    def _drop(self, task: asyncio.Task):
+        if task.done():
+            if not task.cancelled() and task.exception() is None:
+                stats.wasted_tokens += task.result().tokens
+        else:
+            task.cancel()
+            stats.cancelled += 1
+
+    def cancel(self):
+        """Drops every pending speculation (the state they were made for is gone)."""
+        for _, _, task in self.entries.values():
+            self._drop(task)
+        self.entries.clear()
+
+
+def speculation_stats() -> dict:
+    return stats.snapshot()
@@ -0,0 +1,38 @@
+import asyncio
+import json
+
+from agents import RunContextWrapper
+
+from agent_graph import MAX_TOOL_ACTIONS, GameTurn, resolve_action
+from engine import World
+
+
+def call(context, action: str) -> str:
+    return asyncio.run(resolve_action.on_invoke_tool(RunContextWrapper(context), json.dumps({"action": action})))
+
+
+def test_resolve_action_steps_the_turns_world():
+    world = World(seed=4)
+    turn = GameTurn(world.fork())
+    reply = call(turn, "fight")
+    assert "Player state now:" in reply
+    assert [outcome.action for outcome in turn.outcomes] == ["fight"]
+    assert turn.world.version == world.version + 1
+    assert world.turn == 0  # only the fork moved on
+
+
+def test_resolve_action_is_capped_per_turn():
+    turn = GameTurn(World(seed=4))
+    for _ in range(MAX_TOOL_ACTIONS):
+        call(turn, "explore")
+    assert call(turn, "explore").startswith("No more actions")
+    assert len(turn.outcomes) == MAX_TOOL_ACTIONS
+
+
+def test_resolve_action_without_a_game_turn_changes_nothing():
+    assert call(None, "fight").startswith("This action is already resolved")
+
+
+def test_action_schema_only_allows_engine_actions():
+    schema = resolve_action.params_json_schema["properties"]["action"]
+    assert set(schema["enum"]) == {"explore", "fight", "inventory", "heal", "restart"}
@@ -0,0 +1,80 @@
+import pytest
+
+from engine import HIT_DAMAGE, START_HEALTH, World, parse_action
+
+
+@pytest.mark.parametrize("text, action", [
+    ("explore", "explore"),
+    ("Look", "explore"),
+    ("let's go north", "explore"),
+    ("attack the goblin!", "fight"),
+    ("I attack", "fight"),
+    ("drink a potion", "heal"),
+    ("check my inventory", "inventory"),
+    ("inventory", "inventory"),
+    ("restart", "restart"),
+    ("please start over", "restart"),
+])
+def test_commands(text, action):
+    assert parse_action(text) == action
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "I look at the map and go back",
+    "is there a hit point limit?",
+    "what happens if I fight the troll?",
+    "tell me about the potion",
+    "attack the goblin and then grab the treasure before the troll wakes up",
+])
+def test_other_messages_are_left_to_the_agents(text):
+    assert parse_action(text) is None
+
+
+def play(world: World, actions) -> list:
+    return [[event.detail for event in world.step(action).events] for action in actions]
+
+
+def test_same_seed_and_actions_replay_the_same_game():
+    actions = ["explore", "fight", "fight", "explore", "heal", "fight"]
+    assert play(World(seed=7), actions) == play(World(seed=7), actions)
+
+
+def test_a_fork_plays_exactly_like_its_world_and_leaves_it_alone():
+    world = World(seed=3)
+    play(world, ["explore", "fight"])
+    before = (world.player.summary(), world.version, list(world.log))
+    fork = world.fork()
+    forked = play(fork, ["fight", "explore"])
+    assert (world.player.summary(), world.version, list(world.log)) == before
+    assert play(world, ["fight", "explore"]) == forked
+
+
+def test_healing_uses_a_potion_and_caps_health():
+    world = World(seed=1)
+    world.player.inventory.append("potion")
+    world.player.health = START_HEALTH - 2
+    world.step("heal")
+    assert world.player.health == START_HEALTH
+    assert "potion" not in world.player.inventory
+    assert world.step("heal").events[0].detail == "The player has no potion to drink."
+
+
+def test_game_over_at_zero_health_until_restart():
+    world = World(seed=5)
+    world.player.health = HIT_DAMAGE
+    while not world.over:
+        outcome = world.step("fight")
+    assert outcome.game_over and world.player.health == 0
+    assert world.step("explore").game_over
+    world.step("restart")
+    assert not world.over and world.player.health == START_HEALTH
+
+
+def test_checking_the_inventory_does_not_change_the_version():
+    world = World(seed=2)
+    version = world.version
+    world.step("inventory")
+    assert world.version == version
+    world.step("explore")
+    assert world.version == version + 1
@@ -0,0 +1,33 @@
+import asyncio
+
+from agent_graph import ACTION_AGENTS, REGISTRY
+from engine import World
+from speculation import SPECULATE_ACTIONS, Speculator, estimate_run_tokens, stats
+
+
+def estimates(world: World) -> list[int]:
+    result = []
+    for action in SPECULATE_ACTIONS:
+        fork = world.fork()
+        prompt = fork.step(action).as_prompt(action, fork.player)
+        result.append(estimate_run_tokens(REGISTRY[ACTION_AGENTS[action]], prompt))
+    return result
+
+
+def test_runs_are_only_started_while_their_estimate_fits_the_budget():
+    async def main():
+        world = World()
+        budget = sum(estimates(world)[:2]) + 1
+        speculator = Speculator(budget=budget)
+        skipped = stats.skipped_over_budget
+        speculator.schedule(world)
+        assert list(speculator.entries) == list(SPECULATE_ACTIONS[:2])
+        assert speculator.tokens_left == 1
+        assert stats.skipped_over_budget == skipped + 1
+        # Runs cancelled before they used anything hand their reservation back
+        tasks = [task for _, _, task in speculator.entries.values()]
+        speculator.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert speculator.tokens_left == budget
+
+    asyncio.run(main())
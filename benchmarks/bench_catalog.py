@@ -0,0 +1,91 @@
+"""Travel catalog lookups, budget search and memory at scale.
+
+Usage:
+    python benchmarks/bench_catalog.py [--destinations 50000]
+
+Builds a synthetic catalog (the real data plus generated destinations), then
+times exact, alias and misspelled lookups and budget searches against it.
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "03.AI-Travel-Designer-Agent"))
+
+from budget import BudgetPlanner  # noqa: E402
+from catalog import CATALOG_PATH, TravelCatalog  # noqa: E402
+
+
+def synthetic(n: int, rng: random.Random) -> dict:
+    with open(CATALOG_PATH, encoding="utf-8") as f:
+        data = json.load(f)
+    template = data["destinations"][0]
+    for i in range(n):
+        name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))).title() + f" {i}"
+        data["destinations"].append({
+            "name": name,
+            "country": "Pakistan",
+            "aliases": [name.split()[0] + f" town {i}"],
+            "flights": [dict(f, price_pkr=rng.randint(2000, 200000), price_usd=None) for f in template["flights"]],
+            "hotels": [dict(h, night_pkr=rng.randint(2000, 60000), night_usd=None) for h in template["hotels"]],
+        })
+    return data
+
+
+def time_lookups(catalog: TravelCatalog, queries: list[str]) -> float:
+    catalog._resolve_key.cache_clear()
+    started = time.perf_counter()
+    for query in queries:
+        catalog.resolve(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    i = rng.randrange(len(name))
+    return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--destinations", type=int, default=50000)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    data = synthetic(args.destinations, rng)
+    started = time.perf_counter()
+    catalog = TravelCatalog(data)
+    build_s = time.perf_counter() - started
+    # Build a second copy under tracemalloc so tracing does not skew the build time
+    tracemalloc.start()
+    copy = TravelCatalog(data)
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    del copy
+    tracemalloc.stop()
+
+    names = [d.name for d in rng.sample(list(catalog.destinations.values()), 2000)]
+    print(f"destinations: {len(catalog.destinations):,}  build: {build_s:.2f}s  memory: {memory_mb:.1f} MB")
+    print(f"exact lookup:      {time_lookups(catalog, names):8.1f} µs")
+    print(f"alias lookup:      {time_lookups(catalog, ['neelam', 'dxb', 'khanpur'] * 100):8.1f} µs")
+    print(f"misspelled lookup: {time_lookups(catalog, [misspell(n, rng) for n in names[:500]]):8.1f} µs")
+
+    planner = BudgetPlanner(catalog)
+    for label, kwargs in [
+        ("budget, all destinations", {"budget_pkr": 60000, "origin": "Islamabad", "nights": 3}),
+        ("budget, best value", {"budget_pkr": 300000, "nights": 2, "rank": "value"}),
+        ("budget, 5 destinations", {"budget_pkr": 300000, "nights": 2, "destinations": names[:5]}),
+    ]:
+        started = time.perf_counter()
+        for _ in range(10):
+            planner.find_trips(**kwargs)
+        print(f"{label + ':':<26} {(time.perf_counter() - started) / 10 * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Chat-start latency and RSS per 1,000 sessions, per-session graph vs shared graph.
+
+Usage:
+    python benchmarks/bench_chat_start.py [--sessions 1000] [--app 03.AI-Travel-Designer-Agent]
+
+"per-session" repeats what start() used to do on every chat: a new AsyncOpenAI
+client, model and RunConfig plus a fresh agent graph stored in the session.
+The re-decoration of tools is not repeated, so it is a lower bound of the old
+cost. "shared" is the current start(): the session only gets its own state.
+Each mode runs in a fresh interpreter so RSS numbers do not bleed together.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ["02.Career-Mentor-Agent", "03.AI-Travel-Designer-Agent", "04.Game-Master-Agent"]
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def run_mode(app: str, mode: str, sessions: int) -> dict:
+    sys.path[:0] = [str(ROOT / app), str(ROOT / "common")]  # the app, then the shared agent_common package
+    os.chdir(ROOT / app)
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+
+    from agent_common import provider
+    from agents import OpenAIChatCompletionsModel, OpenAIProvider, RunConfig
+    from openai import AsyncOpenAI
+
+    import agent_graph
+
+    provider.get_run_config()
+    store = []
+    rss_before = rss_kb()
+    started = time.perf_counter()
+    for _ in range(sessions):
+        if mode == "per-session":
+            client = AsyncOpenAI(api_key="bench", base_url=provider.GEMINI_BASE_URL)
+            model = OpenAIChatCompletionsModel(model=provider.GEMINI_MODEL, openai_client=client)
+            config = RunConfig(
+                model=model,
+                model_provider=OpenAIProvider(openai_client=client, use_responses=False),
+                tracing_disabled=True,
+            )
+            session = dict(agent_graph.build_registry())
+            session["config"] = config
+            session["chat_history"] = []
+        else:
+            session = {"chat_history": []}
+        store.append(session)
+    elapsed = time.perf_counter() - started
+    rss_after = rss_kb()
+    return {
+        "app": app,
+        "mode": mode,
+        "sessions": sessions,
+        "start_latency_us": round(elapsed / sessions * 1e6, 1),
+        "rss_kb_per_1000": round((rss_after - rss_before) / sessions * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--app", choices=APPS, action="append")
+    parser.add_argument("--mode", choices=["per-session", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.app[0], args.mode, args.sessions)))
+        return
+
+    print(f"{'app':<30} {'mode':<12} {'start µs':>10} {'RSS KB/1k':>10}")
+    for app in args.app or APPS:
+        for mode in ("per-session", "shared"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--app", app, "--mode", mode, "--sessions", str(args.sessions)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            row = json.loads(out.strip().splitlines()[-1])
+            print(f"{app:<30} {mode:<12} {row['start_latency_us']:>10} {row['rss_kb_per_1000']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Platform connector throughput: naive per-call requests vs pooled, cached connectors.
+
+Usage:
+    python benchmarks/bench_connectors.py [--turns 200] [--concurrency 50] [--latency 0.3]
+
+Starts benchmarks/fake_platforms.py, then replays booking turns (one
+Skyscanner and one Booking.com lookup each, over a handful of popular
+destinations). "naive" opens a new HTTP client per call with no cache, like
+a straightforward integrate_platform would. "connectors" uses
+connectors.PlatformConnectors. A third run makes the stand-in fail half of
+its requests to show the timeouts and circuit breaker keeping turns fast.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "03.AI-Travel-Designer-Agent"))
+
+from catalog import catalog  # noqa: E402
+from connectors import PlatformConnectors  # noqa: E402
+
+POPULAR = ["Dubai", "Istanbul", "Skardu", "Hunza", "Bangkok", "London", "Baku", "Murree"]
+
+
+def start_server(port: int, latency: float, error_rate: float) -> subprocess.Popen:
+    server = subprocess.Popen([
+        sys.executable, str(ROOT / "benchmarks" / "fake_platforms.py"), "--port", str(port),
+        "--latency", str(latency), "--error-rate", str(error_rate),
+    ])
+    for _ in range(100):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError("stand-in platform server did not start")
+
+
+async def naive_fetch(base_url: str, platform: str, destination: str):
+    path = "/flights" if platform == "Skyscanner" else "/hotels"
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        response = await client.get(path, params={"destination": destination})
+        response.raise_for_status()
+        return response.json()["results"]
+
+
+async def replay(fetch, turns: int, concurrency: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    destinations = [d for d in POPULAR if catalog.resolve(d)] or list(catalog.destinations)[:8]
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def turn(destination):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await asyncio.gather(fetch("Skyscanner", destination), fetch("Booking.com", destination))
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(turn(rng.choice(destinations)) for _ in range(turns)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "turns_per_s": round(turns / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 1),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+        "errors": errors,
+    }
+
+
+async def run(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port}"
+    report = {"naive": await replay(lambda p, d: naive_fetch(base_url, p, d), args.turns, args.concurrency)}
+
+    connectors = PlatformConnectors(catalog, skyscanner_url=base_url, booking_url=base_url)
+    report["connectors"] = await replay(connectors.fetch, args.turns, args.concurrency)
+    report["connectors"]["stats"] = connectors.stats()
+    await connectors.aclose()
+    return report
+
+
+async def run_flaky(args) -> dict:
+    base_url = f"http://127.0.0.1:{args.port + 1}"
+    connectors = PlatformConnectors(catalog, skyscanner_url=base_url, booking_url=base_url)
+    for connector in connectors.connectors.values():
+        connector.ttl = connector.stale_ttl = 0  # every turn goes upstream
+    report = await replay(connectors.fetch, args.turns, args.concurrency)
+    report["stats"] = connectors.stats()
+    await connectors.aclose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--port", type=int, default=8801)
+    args = parser.parse_args()
+
+    server = start_server(args.port, args.latency, 0.0)
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        server.terminate()
+
+    flaky = start_server(args.port + 1, args.latency, 0.5)
+    try:
+        report["connectors_with_50pct_errors"] = asyncio.run(run_flaky(args))
+    finally:
+        flaky.terminate()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Prompt size over a long conversation: unbounded chat_history vs ConversationMemory.
+
+Usage:
+    python benchmarks/bench_memory.py [--turns 200] [--app 03.AI-Travel-Designer-Agent]
+
+The summarizer is a local stand-in (no model calls) that takes a few
+milliseconds and keeps the tail of the transcript, so only the memory policy
+is measured.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+USER_LINES = [
+    "My budget is 150,000 PKR, can you find flights to Dubai?",
+    "What about hotels near the beach, nothing too expensive please.",
+    "Is Skardu nicer than Hunza in October? I like mountains and quiet places.",
+    "Tell me about food I should try and any travel alerts for that week.",
+    "Which skills do I need to become a data scientist from Lahore?",
+]
+
+
+async def fake_summarizer(summary: str, turns: list[dict]) -> str:
+    await asyncio.sleep(0.005)
+    return (summary + " " + " ".join(t["content"][:60] for t in turns))[-900:]
+
+
+async def run(turns: int, memory_module):
+    rng = random.Random(7)
+    memory = memory_module.ConversationMemory(summarizer=fake_summarizer)
+    memory.pin("budget", "₹150,000 PKR")
+    history = []
+    rows = []
+    for turn in range(1, turns + 1):
+        user = rng.choice(USER_LINES)
+        memory.add("user", user)
+        history.append({"role": "user", "content": user})
+
+        bounded = sum(memory_module.estimate_tokens(i["content"]) for i in memory.to_input())
+        unbounded = sum(memory_module.estimate_tokens(i["content"]) for i in history)
+        rows.append((turn, unbounded, bounded))
+
+        reply = " ".join(rng.choice(USER_LINES) for _ in range(3))
+        memory.add("assistant", reply)
+        history.append({"role": "assistant", "content": reply})
+        # Let the background summarizer run like it would between user messages
+        await asyncio.sleep(0)
+    await memory.wait_for_summary()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--app", default="03.AI-Travel-Designer-Agent")
+    args = parser.parse_args()
+
+    sys.path[:0] = [str(ROOT / args.app), str(ROOT / "common")]  # the app, then the shared agent_common package
+    from agent_common import memory
+
+    rows = asyncio.run(run(args.turns, memory))
+    print(f"{'turn':>5} {'unbounded tokens':>17} {'memory tokens':>14}")
+    for turn, unbounded, bounded in rows:
+        if turn == 1 or turn % 20 == 0:
+            print(f"{turn:>5} {unbounded:>17} {bounded:>14}")
+
+    steady = [bounded for turn, _, bounded in rows[len(rows) // 4:]]
+    print(f"\nmemory prompt after warm-up: min {min(steady)}, max {max(steady)} tokens "
+          f"(window {memory.MEMORY_WINDOW_TOKENS} + summary {memory.MEMORY_SUMMARY_TOKENS})")
+    print(f"unbounded prompt at turn {rows[-1][0]}: {rows[-1][1]} tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Request scheduler under a rate-limited, flaky model endpoint.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--app 02.Career-Mentor-Agent] [--sessions 8] [--rpm 600]
+
+Starts benchmarks/fake_openai.py with a requests-per-minute limit and 10% random
+429s / 3% 503s. One "heavy" session fires 40 turns at once while the other
+sessions send 4 turns each and a batch job sends 20 background requests.
+"unscheduled" is the old behaviour (no admission control, no retries),
+"scheduled" uses scheduler.py and the retrying provider transport. Each
+mode runs in a fresh interpreter because the limits are read at import.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ["02.Career-Mentor-Agent", "03.AI-Travel-Designer-Agent", "04.Game-Master-Agent"]
+PORT = 8770
+
+
+def run_mode(app: str, sessions: int):
+    sys.path[:0] = [str(ROOT / app), str(ROOT / "common")]  # the app, then the shared agent_common package
+    os.chdir(ROOT / app)
+    from agent_common import provider
+    from agent_common.scheduler import batch_priority, set_session
+    from agents import Agent, Runner
+
+    agent = Agent(name="bench", instructions="Answer briefly.", model="fast")
+    config = provider.get_run_config()
+
+    async def turn(session: str, text: str, batch=False):
+        set_session(session)
+        started = time.perf_counter()
+        try:
+            if batch:
+                with batch_priority():
+                    await Runner.run(agent, text, run_config=config)
+            else:
+                await Runner.run(agent, text, run_config=config)
+            return session, time.perf_counter() - started, None
+        except Exception as e:
+            return session, time.perf_counter() - started, type(e).__name__
+
+    async def main():
+        jobs = [turn("heavy", f"question {i}") for i in range(40)]
+        jobs += [turn(f"user-{s}", f"question {i}") for s in range(sessions) for i in range(4)]
+        jobs += [turn("batch", f"summary {i}", batch=True) for i in range(20)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*(asyncio.create_task(job) for job in jobs))
+        report = {"elapsed_s": round(time.perf_counter() - started, 2)}
+        for group in ("heavy", "user", "batch"):
+            rows = [r for r in results if r[0].startswith(group)]
+            ok = sorted(seconds for _, seconds, error in rows if error is None)
+            report[group] = {
+                "turns": len(rows),
+                "failed": len(rows) - len(ok),
+                "p50_s": round(ok[len(ok) // 2], 2) if ok else None,
+                "max_s": round(ok[-1], 2) if ok else None,
+            }
+        report["scheduler"] = provider.scheduler_stats()
+        return report
+
+    print(json.dumps(asyncio.run(main())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="02.Career-Mentor-Agent", choices=APPS)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return run_mode(args.app, args.sessions)
+
+    server = subprocess.Popen([
+        sys.executable, str(ROOT / "benchmarks" / "fake_openai.py"), "--port", str(PORT), "--latency", "0.2",
+        "--rpm", str(args.rpm), "--throttle-rate", "0.1", "--error-rate", "0.03",
+    ])
+    time.sleep(1.5)
+    env = os.environ | {"GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{PORT}",
+                        "BACKOFF_BASE_S": "0.2"}
+    report = {}
+    try:
+        for mode, mode_env in (
+            ("unscheduled", {"GEMINI_RPM": "0", "GEMINI_TPM": "0", "MODEL_MAX_RETRIES": "0"}),
+            # Leave some headroom under the server's limit
+            ("scheduled", {"GEMINI_RPM": str(args.rpm * 0.9)}),
+        ):
+            out = subprocess.run(
+                [sys.executable, __file__, "--app", args.app, "--sessions", str(args.sessions), "--mode", mode],
+                env=env | mode_env, capture_output=True, text=True, check=True,
+            ).stdout
+            report[mode] = json.loads(out.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
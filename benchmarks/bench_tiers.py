@@ -0,0 +1,107 @@
+"""Model tiering: latency and cost with every agent on the large model vs the tier policy.
+
+Usage:
+    python benchmarks/bench_tiers.py [--app 03.AI-Travel-Designer-Agent] [--turns 60]
+
+Starts benchmarks/fake_openai.py with a slow large model and a fast small
+model that refuses 10% of the time, then sends a mix of short and long-form
+turns through the triage agent and every specialist. "all-large" pins every
+agent to the large tier (MODEL_TIERS), "tiered" uses the app's TIER_POLICY.
+Each mode runs in a fresh interpreter because tiers are read at import.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ["02.Career-Mentor-Agent", "03.AI-Travel-Designer-Agent", "04.Game-Master-Agent"]
+PORT = 8767
+FAST, LARGE = "fake-fast-lite", "fake-large"
+
+PROMPTS = [
+    "hi",
+    "what is the cheapest option?",
+    "thanks!",
+    "give me a detailed step-by-step plan for the next two weeks",
+    "ok, what next?",
+    "compare the top three choices in detail",
+]
+
+
+def run_mode(app: str, turns: int):
+    sys.path[:0] = [str(ROOT / app), str(ROOT / "common")]  # the app, then the shared agent_common package
+    os.chdir(ROOT / app)
+    from agent_common import provider
+    from agents import Runner
+
+    import agent_graph
+
+    async def main():
+        config = provider.get_run_config()
+        agents = list(agent_graph.REGISTRY.values())
+        started = time.perf_counter()
+        for i in range(turns):
+            agent = agents[i % len(agents)]
+            await Runner.run(agent, PROMPTS[i % len(PROMPTS)], run_config=config, max_turns=1)
+        elapsed = time.perf_counter() - started
+        tiers = provider.tier_stats()
+        return {
+            "avg_turn_ms": round(elapsed / turns * 1000, 1),
+            "cost_usd": round(sum(t["cost_usd"] for t in tiers.values()), 6),
+            "tiers": tiers,
+        }
+
+    print(json.dumps(asyncio.run(main())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="03.AI-Travel-Designer-Agent", choices=APPS)
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return run_mode(args.app, args.turns)
+
+    server = subprocess.Popen([
+        sys.executable, str(ROOT / "benchmarks" / "fake_openai.py"), "--port", str(PORT),
+        "--model-latency", f"{FAST}=0.05", f"{LARGE}=0.4", "--refusal-model", "lite", "--refusal-rate", "0.1",
+    ])
+    time.sleep(1.5)
+    env = os.environ | {
+        "GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{PORT}",
+        "FAST_MODEL": FAST, "LARGE_MODEL": LARGE, "FAST_MODEL_PRICE": "0.075,0.30", "LARGE_MODEL_PRICE": "1.25,10",
+    }
+    report = {}
+    try:
+        for mode, tiers in (("all-large", "large"), ("tiered", None)):
+            mode_env = dict(env)
+            if tiers:
+                mode_env["MODEL_TIERS"] = ",".join(f"{name}=large" for name in agent_names(args.app))
+            out = subprocess.run(
+                [sys.executable, __file__, "--app", args.app, "--turns", str(args.turns), "--mode", mode],
+                env=mode_env, capture_output=True, text=True, check=True,
+            ).stdout
+            report[mode] = json.loads(out.strip().splitlines()[-1])
+    finally:
+        server.terminate()
+    print(json.dumps(report, indent=2))
+
+
+def agent_names(app: str) -> list[str]:
+    out = subprocess.run(
+        [sys.executable, "-c", "import agent_graph; print(','.join(agent_graph.REGISTRY))"],
+        cwd=ROOT / app, env=os.environ | {"GEMINI_API_KEY": "bench", "PYTHONPATH": str(ROOT / "common")},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return out.strip().splitlines()[-1].split(",")
+
+
+if __name__ == "__main__":
+    main()
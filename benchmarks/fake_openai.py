@@ -0,0 +1,217 @@
+"""Local stand-in for an OpenAI-compatible chat completions API.
+
+Usage:
+    python benchmarks/fake_openai.py [--port 8766] [--latency 0.2] [--model-latency gemini-2.0-flash-lite=0.05]
+                                     [--refusal-rate 0.2 --refusal-model lite] [--tokens-per-s 200]
+                                     [--rpm 120] [--throttle-rate 0.1] [--error-rate 0.05]
+                                     [--script rules.json]
+
+Serves GET /models and POST /chat/completions (streaming and not) with fixed
+latency per model, optional streamed pacing and a share of refusals from
+chosen models, so model tiering can be exercised without an API key. It can
+also enforce a requests-per-minute limit and inject 429s and 503s, like a
+busy Gemini endpoint. Point an app at it with
+GEMINI_BASE_URL=http://127.0.0.1:8766.
+
+--script makes replies scriptable, so agent graphs can be driven through
+handoffs and tool calls. It is a JSON list of rules; the first rule whose
+conditions all hold decides the reply, otherwise the default text is sent:
+
+    {"user": "skill|roadmap",              regex searched in the last user message
+     "after": "transfer_to_skill_agent",   a tool whose result is among the trailing messages
+                                           (null: the last message is the user's)
+     "tool": "get_career_roadmap",         a tool the request offers
+     "call": {"name": "get_career_roadmap", "arguments": {"career": "data scientist"}},
+                                           or a list of calls (parallel tool calls), or
+     "text": "...",                        a fixed text reply
+     "latency": 0.3, "tokens_per_s": 50}   per-rule overrides
+
+Handoffs are tool calls too: the SDK names them transfer_to_<agent name>.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from collections import deque
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+REFUSAL = "I'm sorry, I can't help with that."
+
+
+def load_script(path: str | None) -> list[dict]:
+    if not path:
+        return []
+    with open(path, encoding="utf-8") as f:
+        rules = json.load(f)
+    for rule in rules:
+        if rule.get("user"):
+            rule["user_re"] = re.compile(rule["user"], re.IGNORECASE)
+    return rules
+
+
+def text_of(content) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+def trailing_tools(messages: list[dict]) -> set[str]:
+    """Names of the tools whose results end the conversation (empty if it ends with a user turn)."""
+    names = {}
+    for message in messages:
+        for call in message.get("tool_calls") or ():
+            names[call["id"]] = call["function"]["name"]
+    answered = set()
+    for message in reversed(messages):
+        if message.get("role") != "tool":
+            break
+        answered.add(names.get(message.get("tool_call_id"), "?"))
+    return answered
+
+
+def match_rule(rules: list[dict], request: dict) -> dict | None:
+    messages = request["messages"]
+    last_user = next((text_of(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+    after = trailing_tools(messages)
+    offered = {tool["function"]["name"] for tool in request.get("tools") or () if tool.get("type") == "function"}
+    for rule in rules:
+        if "user_re" in rule and not rule["user_re"].search(last_user):
+            continue
+        if "after" in rule and (rule["after"] not in after if rule["after"] else after):
+            continue
+        if "tool" in rule and rule["tool"] not in offered:
+            continue
+        return rule
+    return None
+
+
+def build_app(args) -> Starlette:
+    model_latency = dict(item.split("=", 1) for item in args.model_latency)
+    rules = load_script(args.script)
+    served = {"throttled_429": 0, "errors_503": 0}
+    window = deque()  # request times over the last minute, for --rpm
+
+    def rejection():
+        now = time.monotonic()
+        while window and now - window[0] > 60:
+            window.popleft()
+        if args.rpm and len(window) >= args.rpm:
+            served["throttled_429"] += 1
+            retry_after = max(1, int(60 - (now - window[0])) + 1)
+            return JSONResponse({"error": {"message": "Resource has been exhausted", "code": 429}},
+                                status_code=429, headers={"Retry-After": str(retry_after)})
+        if random.random() < args.throttle_rate:
+            served["throttled_429"] += 1
+            return JSONResponse({"error": {"message": "Resource has been exhausted", "code": 429}}, status_code=429)
+        if random.random() < args.error_rate:
+            served["errors_503"] += 1
+            return JSONResponse({"error": {"message": "The model is overloaded", "code": 503}}, status_code=503)
+        window.append(now)
+        return None
+
+    def reply_for(request: dict) -> str:
+        model = request["model"]
+        if args.refusal_model and args.refusal_model in model and random.random() < args.refusal_rate:
+            return REFUSAL
+        last = request["messages"][-1].get("content") or ""
+        if isinstance(last, list):
+            last = " ".join(part.get("text", "") for part in last)
+        return f"({model}) Here is what I found about: {str(last)[:80]}"
+
+    def tool_calls_for(rule: dict) -> list[dict]:
+        calls = rule["call"] if isinstance(rule["call"], list) else [rule["call"]]
+        return [
+            {"id": f"call_{time.time_ns()}_{i}", "type": "function",
+             "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))}}
+            for i, call in enumerate(calls)
+        ]
+
+    def usage(request: dict, text: str) -> dict:
+        # Tool schemas are part of the prompt the model is billed for, like the messages
+        chars = sum(len(str(m.get("content") or "")) for m in request["messages"])
+        prompt = (chars + len(json.dumps(request.get("tools") or []))) // 4
+        completion = len(text) // 4
+        return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+    async def models(request):
+        return JSONResponse({"object": "list", "data": []})
+
+    async def completions(request):
+        body = await request.json()
+        model = body["model"]
+        rejected = rejection()
+        if rejected is not None:
+            return rejected
+        served[model] = served.get(model, 0) + 1
+        rule = match_rule(rules, body) or {}
+        await asyncio.sleep(float(rule.get("latency", model_latency.get(model, args.latency))))
+        tokens_per_s = rule.get("tokens_per_s", args.tokens_per_s)
+        calls = tool_calls_for(rule) if "call" in rule else None
+        text = "" if calls else rule.get("text") or reply_for(body)
+        counted = text + "".join(call["function"]["arguments"] for call in calls or ())
+        finish = "tool_calls" if calls else "stop"
+        base = {"id": f"chatcmpl-{time.time_ns()}", "created": int(time.time()), "model": model}
+        if not body.get("stream"):
+            message = {"role": "assistant", "content": text or None}
+            if calls:
+                message["tool_calls"] = calls
+            return JSONResponse(base | {
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+                "usage": usage(body, counted),
+            })
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            data = base | {"object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(data)}\n\n"
+
+        async def events():
+            for index, call in enumerate(calls or ()):
+                yield chunk({"tool_calls": [call | {"index": index}]})
+            for word in text.split(" ") if text else ():
+                yield chunk({"content": word + " "})
+                if tokens_per_s:
+                    await asyncio.sleep(1 / tokens_per_s)
+            done = base | {"object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "delta": {}, "finish_reason": finish}], "usage": usage(body, counted)}
+            yield f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    async def stats(request):
+        return JSONResponse(served)
+
+    return Starlette(routes=[
+        Route("/models", models),
+        Route("/chat/completions", completions, methods=["POST"]),
+        Route("/stats", stats),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds before each response starts")
+    parser.add_argument("--model-latency", nargs="*", default=[], metavar="MODEL=SECONDS",
+                        help="per-model latency overrides")
+    parser.add_argument("--refusal-rate", type=float, default=0.0, help="share of refusals from --refusal-model")
+    parser.add_argument("--refusal-model", default="", help="substring of the model names that refuse")
+    parser.add_argument("--tokens-per-s", type=float, default=0.0, help="pace streamed words (0 = no pacing)")
+    parser.add_argument("--rpm", type=int, default=0, help="answer 429 above this many requests per minute")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of random 429 responses")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of random 503 responses")
+    parser.add_argument("--script", help="JSON rules for scripted replies, tool calls and handoffs")
+    args = parser.parse_args()
+    uvicorn.run(build_app(args), port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Local stand-in for the Skyscanner and Booking.com APIs, for load tests.
+
+Usage:
+    python benchmarks/fake_platforms.py [--port 8801] [--latency 0.3] [--jitter 0.1] [--error-rate 0.0]
+
+Serves GET /flights?destination=... and GET /hotels?destination=... from the
+travel catalog with some added latency, price noise and random 503s. Point
+the app at it with SKYSCANNER_URL=http://127.0.0.1:8801 and
+BOOKING_URL=http://127.0.0.1:8801.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+from pathlib import Path
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "03.AI-Travel-Designer-Agent"))
+
+from catalog import catalog  # noqa: E402
+
+
+def build_app(latency: float, jitter: float, error_rate: float) -> Starlette:
+    served = {"flights": 0, "hotels": 0, "errors": 0}
+
+    async def respond(request, kind: str):
+        await asyncio.sleep(max(0.0, random.gauss(latency, jitter)))
+        if random.random() < error_rate:
+            served["errors"] += 1
+            return JSONResponse({"error": "upstream unavailable"}, status_code=503)
+        served[kind] += 1
+        found = catalog.resolve(request.query_params.get("destination", ""))
+        if found is None:
+            return JSONResponse({"results": []})
+        rows = found.flights_as_dicts() if kind == "flights" else found.hotels_as_dicts()
+        price_key = "price_pkr" if kind == "flights" else "night_pkr"
+        for row in rows:
+            row[price_key] = round(row[price_key] * random.uniform(0.95, 1.1))
+        return JSONResponse({"results": rows})
+
+    async def flights(request):
+        return await respond(request, "flights")
+
+    async def hotels(request):
+        return await respond(request, "hotels")
+
+    async def stats(request):
+        return JSONResponse(served)
+
+    return Starlette(routes=[Route("/flights", flights), Route("/hotels", hotels), Route("/stats", stats)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8801)
+    parser.add_argument("--latency", type=float, default=0.3, help="mean response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="standard deviation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+    uvicorn.run(build_app(args.latency, args.jitter, args.error_rate), port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
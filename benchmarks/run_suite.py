@@ -0,0 +1,303 @@
+"""Per-app latency suite: the real agent graphs against a scripted fake model API.
+
+Usage:
+    python benchmarks/run_suite.py [--apps 02.Career-Mentor-Agent ...] [--repeat 5]
+    python benchmarks/run_suite.py --save      # record benchmarks/baselines.json
+    python benchmarks/run_suite.py --check     # exit 1 on a regression against it
+
+Starts benchmarks/fake_openai.py with a --script per app, so every turn goes
+through the same handoffs and tool calls as it would with Gemini: the Smart
+Student agent, Career triage -> skill (roadmap tool) / job / career agents,
+Travel triage -> booking (flights + hotels) / explore (alerts) / destination
+(budget search), and Game Master handoffs to the narrator, monster and item
+agents. Each app runs in a fresh interpreter with local tracing on, and the
+spans give, per turn:
+
+    turn_ms       wall time of the whole run
+    overhead_ms   turn time not spent inside model or tool spans (SDK + app code)
+    model_calls, tool_calls, handoffs
+    alloc_peak_kb peak Python allocations during the turn (tracemalloc, separate pass)
+    retained_kb   memory still held after all turns of that pass
+
+--check compares against the saved baselines: median latencies and
+allocations may grow by --tolerance (plus a small absolute slack), call
+counts may not grow.
+Baselines are machine specific; record them where you check them.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINES = ROOT / "benchmarks" / "baselines.json"
+PORT = 8768
+LATENCY = 0.02  # fake model latency per call, seconds
+
+# Metrics --check gates on (tail latencies and retained memory are too noisy
+# over a few dozen turns; they are reported only), and the absolute slack on
+# top of --tolerance so tiny numbers do not flap
+CHECKED = ("turn_p50_ms", "overhead_p50_ms", "model_calls_per_turn",
+           "tool_calls_per_turn", "handoffs_per_turn", "alloc_peak_kb")
+SLACK = {"_ms": 2.0, "_kb": 64.0}
+
+
+def transfer(agent: str) -> dict:
+    return {"name": f"transfer_to_{agent}"}
+
+
+SCENARIOS = {
+    "01.Smart-Student-Agent": {
+        "entry": ("main", "agent"),
+        "stream": False,
+        "run_config": False,  # its own client, not the shared provider
+        "turns": [
+            "Explain photosynthesis in simple words",
+            "Give me three study tips for my exams",
+            "Summarize: The mitochondria is the powerhouse of the cell and makes ATP.",
+        ],
+        "rules": [],
+    },
+    "02.Career-Mentor-Agent": {
+        "entry": ("agent_graph", "triage_agent"),
+        "stream": True,
+        "turns": [
+            "What skills do I need to become a data scientist?",
+            "What is a data scientist job like in Pakistan?",
+            "I like tech and design",
+        ],
+        "rules": [
+            {"user": "skill|roadmap|learn", "after": None, "tool": "transfer_to_skill_agent",
+             "call": transfer("skill_agent")},
+            {"user": "job|salary", "after": None, "tool": "transfer_to_job_agent", "call": transfer("job_agent")},
+            {"after": None, "tool": "transfer_to_career_agent", "call": transfer("career_agent")},
+            {"after": "transfer_to_skill_agent", "tool": "get_career_roadmap",
+             "call": {"name": "get_career_roadmap", "arguments": {"career": "data scientist"}}},
+        ],
+    },
+    "03.AI-Travel-Designer-Agent": {
+        "entry": ("agent_graph", "triage_agent"),
+        "stream": True,
+        "turns": [
+            "Book me a flight and a hotel to Dubai",
+            "Any travel alerts for Hunza?",
+            "Where can I go from Lahore on a budget of 300000 PKR?",
+        ],
+        "rules": [
+            {"user": "book|flight|hotel", "after": None, "tool": "transfer_to_booking_agent",
+             "call": transfer("booking_agent")},
+            {"user": "alert|safe", "after": None, "tool": "transfer_to_explore_agent",
+             "call": transfer("explore_agent")},
+            {"user": "budget", "after": None, "tool": "transfer_to_destination_agent",
+             "call": transfer("destination_agent")},
+            {"after": "transfer_to_booking_agent", "tool": "get_flights", "call": [
+                {"name": "get_flights", "arguments": {"destination": "Dubai"}},
+                {"name": "suggest_hotels", "arguments": {"destination": "Dubai"}},
+            ]},
+            {"after": "transfer_to_explore_agent", "tool": "get_travel_alerts",
+             "call": {"name": "get_travel_alerts", "arguments": {"destination": "Hunza"}}},
+            {"after": "transfer_to_destination_agent", "tool": "find_trips_within_budget",
+             "call": {"name": "find_trips_within_budget",
+                      "arguments": {"budget_pkr": 300000, "origin": "Lahore", "nights": 3}}},
+        ],
+    },
+    "04.Game-Master-Agent": {
+        "entry": ("agent_graph", "game_master_agent"),
+        "stream": True,
+        "turns": [
+            "Player says: I look around the dark cave\nPlayer state: Health: 100, Inventory: Sword, Potion",
+            "Player says: I attack the goblin!\nPlayer state: Health: 100, Inventory: Sword, Potion",
+            "Player says: I drink a potion\nPlayer state: Health: 80, Inventory: Sword, Potion",
+        ],
+        "rules": [
+            {"user": "attack|fight", "after": None, "tool": "transfer_to_monsteragent",
+             "call": transfer("monsteragent")},
+            {"user": "potion|inventory", "after": None, "tool": "transfer_to_itemagent",
+             "call": transfer("itemagent")},
+            {"after": None, "tool": "transfer_to_narratoragent", "call": transfer("narratoragent")},
+        ],
+    },
+}
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def span_totals(path: str, offset: int) -> list[dict]:
+    """Per-trace totals from the local trace file, in the order the turns finished."""
+    traces = defaultdict(lambda: {"model_ms": 0.0, "tool_ms": 0.0, "model_calls": 0, "tool_calls": 0, "handoffs": 0})
+    turns = []
+    with open(path, encoding="utf-8") as f:
+        f.seek(offset)
+        for line in f:
+            record = json.loads(line)
+            totals = traces[record["trace_id"]]
+            kind = record["kind"]
+            if kind == "model":
+                totals["model_ms"] += record["ms"]
+                totals["model_calls"] += 1
+            elif kind == "tool":
+                totals["tool_ms"] += record["ms"]
+                totals["tool_calls"] += 1
+            elif kind == "handoff":
+                totals["handoffs"] += 1
+            elif kind == "turn":
+                totals["turn_ms"] = record["ms"]
+                turns.append(totals)
+    return turns
+
+
+def run_mode(app: str, repeat: int):
+    scenario = SCENARIOS[app]
+    sys.path[:0] = [str(ROOT / app), str(ROOT / "common")]  # the app, then the shared agent_common package
+    os.chdir(ROOT / app)
+    from agent_common import tracing_local
+    from agents import Runner
+
+    module, attr = scenario["entry"]
+    agent = getattr(importlib.import_module(module), attr)
+    tracing_local.install_local_tracing()
+    run_config = None
+    if scenario.get("run_config", True):
+        from agent_common.provider import get_run_config
+        run_config = get_run_config()
+
+    async def turn(prompt: str):
+        if not scenario["stream"]:
+            return await Runner.run(agent, prompt, run_config=run_config)
+        result = Runner.run_streamed(agent, prompt, run_config=run_config)
+        async for _ in result.stream_events():
+            pass
+        return result
+
+    async def main():
+        for prompt in scenario["turns"]:  # warm-up: imports, schemas, connections
+            await turn(prompt)
+        tracing_local.flush()
+        offset = os.path.getsize(tracing_local.processor.sink.path)
+
+        for _ in range(repeat):
+            for prompt in scenario["turns"]:
+                await turn(prompt)
+        tracing_local.flush()
+        turns = span_totals(tracing_local.processor.sink.path, offset)
+
+        # Allocations are measured in their own pass: tracemalloc slows everything down
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        peaks = []
+        for prompt in scenario["turns"]:
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await turn(prompt)
+            peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+        retained = (tracemalloc.get_traced_memory()[0] - base) / 1024
+        tracemalloc.stop()
+
+        turn_ms = sorted(t["turn_ms"] for t in turns)
+        overhead = sorted(max(0.0, t["turn_ms"] - t["model_ms"] - t["tool_ms"]) for t in turns)
+        count = len(turns) or 1
+        return {
+            "turns": len(turns),
+            "turn_p50_ms": round(percentile(turn_ms, 0.5), 2),
+            "turn_p95_ms": round(percentile(turn_ms, 0.95), 2),
+            "overhead_p50_ms": round(percentile(overhead, 0.5), 2),
+            "overhead_p95_ms": round(percentile(overhead, 0.95), 2),
+            "model_calls_per_turn": round(sum(t["model_calls"] for t in turns) / count, 2),
+            "tool_calls_per_turn": round(sum(t["tool_calls"] for t in turns) / count, 2),
+            "handoffs_per_turn": round(sum(t["handoffs"] for t in turns) / count, 2),
+            "alloc_peak_kb": round(percentile(sorted(peaks), 0.5), 1),
+            "retained_kb": round(retained, 1),
+        }
+
+    print(json.dumps(asyncio.run(main())))
+
+
+def run_app(app: str, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "rules.json"
+        script.write_text(json.dumps(SCENARIOS[app]["rules"]))
+        server = subprocess.Popen([
+            sys.executable, str(ROOT / "benchmarks" / "fake_openai.py"), "--port", str(PORT),
+            "--latency", str(LATENCY), "--script", str(script),
+        ])
+        time.sleep(1.5)
+        env = os.environ | {
+            "GEMINI_API_KEY": "bench", "GEMINI_BASE_URL": f"http://127.0.0.1:{PORT}",
+            # No client-side rate limiting or retries: only the code path is measured
+            "GEMINI_RPM": "0", "GEMINI_TPM": "0", "MODEL_MAX_RETRIES": "0",
+            "TRACING_LOCAL": "1", "TRACE_DIR": str(Path(tmp) / "traces"),
+        }
+        try:
+            out = subprocess.run(
+                [sys.executable, __file__, "--apps", app, "--repeat", str(repeat), "--mode", "run"],
+                env=env, capture_output=True, text=True, check=True,
+            ).stdout
+        finally:
+            server.terminate()
+            server.wait()
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def regressions(report: dict, baselines: dict, tolerance: float) -> list[str]:
+    found = []
+    for app, metrics in report.items():
+        base = baselines.get(app)
+        if base is None:
+            continue
+        for name in CHECKED:
+            if name not in base:
+                continue
+            value = metrics[name]
+            if name.endswith("_per_turn"):
+                limit = base[name]
+            else:
+                slack = next((s for suffix, s in SLACK.items() if name.endswith(suffix)), 0.0)
+                limit = base[name] * (1 + tolerance) + slack
+            if value > limit + 1e-9:
+                found.append(f"{app} {name}: {value} > {round(limit, 2)} (baseline {base[name]})")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5, help="timed passes over each app's turns")
+    parser.add_argument("--save", action="store_true", help=f"write the results to {BASELINES.name}")
+    parser.add_argument("--check", action="store_true", help="fail if a metric regressed against the baselines")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth for --check")
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return run_mode(args.apps[0], args.repeat)
+
+    report = {app: run_app(app, args.repeat) for app in args.apps}
+    print(json.dumps(report, indent=2))
+
+    if args.save:
+        saved = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+        BASELINES.write_text(json.dumps(saved | report, indent=2) + "\n")
+        print(f"Baselines written to {BASELINES}", file=sys.stderr)
+    if args.check:
+        if not BASELINES.exists():
+            sys.exit(f"No baselines at {BASELINES}; run with --save first")
+        found = regressions(report, json.loads(BASELINES.read_text()), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print("No regressions", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Soak test: many concurrent Chainlit sessions over the websocket protocol.
+
+Usage:
+    python benchmarks/soak.py [--app 03.AI-Travel-Designer-Agent] [--sessions 50] [--duration 120]
+                              [--think 1.0] [--ramp 10] [--sample 5] [--latency 0.3]
+
+Starts benchmarks/fake_openai.py (scripted like run_suite.py, so turns go
+through real handoffs and tool calls) and one `chainlit run` worker of the
+app wired to it. It then connects --sessions Socket.IO clients the way the
+browser does (/ws/socket.io, connection_successful, client_message) and has
+each replay a multi-turn conversation in a loop until --duration is up:
+the career questions, the booking flow or the combat loop. Every --sample
+seconds it prints throughput, turn and first-token latency percentiles for
+that window, plus the worker's event-loop lag, RSS and per-session state
+size from its /metrics endpoint.
+
+At the end it reports the totals. It flags each cl.user_session key (and
+Chainlit's own message context) whose size per session keeps growing with
+the number of turns, and RSS that keeps climbing once all sessions are up.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import socketio
+
+from run_suite import SCENARIOS
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ["02.Career-Mentor-Agent", "03.AI-Travel-Designer-Agent", "04.Game-Master-Agent"]
+FAKE_PORT = 8770
+
+CONVERSATIONS = {
+    "02.Career-Mentor-Agent": [
+        "What skills do I need to become a data scientist?",
+        "What is a data scientist job like in Pakistan?",
+        "I like tech and design",
+        "How do I learn UI/UX design?",
+    ],
+    "03.AI-Travel-Designer-Agent": [
+        "Book me a flight and a hotel to Dubai",
+        "Any travel alerts for Dubai?",
+        "Where can I go from Lahore on a budget of 300000 PKR?",
+        "Book me a flight to Istanbul",
+    ],
+    "04.Game-Master-Agent": ["explore", "fight", "fight", "check inventory", "heal", "fight", "restart"],
+}
+
+# A key is flagged when its size per session grows faster than this per turn
+GROWTH_KB_PER_TURN = 0.25
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+class Results:
+    def __init__(self):
+        self.turns = []  # (finished_at, seconds, first_token_seconds or None)
+        self.connected = 0
+        self.failed = 0
+
+    def window(self, since: float) -> list:
+        return [turn for turn in self.turns if turn[0] >= since]
+
+
+async def chat(url: str, turns: list[str], results: Results, deadline: float, think: float):
+    """One browser tab: connects, waits for the welcome message and replays turns until the deadline."""
+    client = socketio.AsyncClient(reconnection=False)
+    session_id, thread_id = str(uuid.uuid4()), str(uuid.uuid4())
+    welcome, done = asyncio.Event(), asyncio.Event()
+    first_token = None
+
+    @client.on("new_message")
+    async def on_message(step):
+        welcome.set()
+
+    @client.on("stream_token")
+    async def on_token(data):
+        nonlocal first_token
+        if first_token is None:
+            first_token = time.perf_counter()
+
+    @client.on("task_end")
+    async def on_task_end(data):
+        done.set()
+
+    try:
+        await client.connect(
+            url, socketio_path="ws/socket.io", transports=["websocket"], wait_timeout=10,
+            auth={"clientType": "webapp", "sessionId": session_id, "threadId": thread_id, "userEnv": "{}"},
+        )
+        await client.emit("connection_successful")
+        await asyncio.wait_for(welcome.wait(), 30)
+    except Exception:
+        results.failed += 1
+        await client.disconnect()
+        return
+    results.connected += 1
+
+    try:
+        turn = 0
+        while time.monotonic() < deadline:
+            done.clear()
+            first_token = None
+            sent = time.perf_counter()
+            await client.emit("client_message", {
+                "message": {
+                    "id": str(uuid.uuid4()), "threadId": thread_id, "name": "User", "type": "user_message",
+                    "output": turns[turn % len(turns)], "createdAt": datetime.now(timezone.utc).isoformat(),
+                },
+                "fileReferences": [],
+            })
+            await done.wait()
+            finished = time.perf_counter()
+            results.turns.append((time.monotonic(), finished - sent, first_token - sent if first_token else None))
+            turn += 1
+            await asyncio.sleep(random.uniform(0, 2 * think))
+    finally:
+        await client.disconnect()
+
+
+def summarize(turns: list, seconds: float) -> dict:
+    latencies = sorted(t[1] for t in turns)
+    first = sorted(t[2] for t in turns if t[2] is not None)
+    return {
+        "turns": len(turns),
+        "turns_per_s": round(len(turns) / seconds, 2) if seconds else 0.0,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "first_token_p95_ms": round(percentile(first, 0.95) * 1000, 1),
+    }
+
+
+def growth_flags(samples: list[dict], sessions: int) -> list[str]:
+    """Keys whose per-session size still grows with turns over the second half of the run.
+
+    State that is capped (a memory window, a bounded log) fills up early and
+    then levels off; only growth that continues after that is flagged.
+    """
+    full = [s for s in samples if s["metrics"]["sessions"]["sessions"] >= sessions]
+    if len(full) < 2:
+        return []
+    first, last = full[(len(full) - 1) // 2], full[-1]
+    turns = (last["turns"] - first["turns"]) / sessions
+    if turns <= 0:
+        return []
+    flags = []
+    before, after = first["metrics"]["sessions"]["avg_kb_by_key"], last["metrics"]["sessions"]["avg_kb_by_key"]
+    for key, size in after.items():
+        rate = (size - before.get(key, 0.0)) / turns
+        if rate > GROWTH_KB_PER_TURN:
+            flags.append(f"user_session[{key!r}] grows {rate:.2f} KB per turn ({before.get(key, 0.0)} -> {size} KB)")
+    rss_rate = (last["rss_kb"] - first["rss_kb"]) / sessions / turns
+    if rss_rate > GROWTH_KB_PER_TURN:
+        flags.append(f"RSS grows {rss_rate:.2f} KB per session per turn after ramp-up "
+                     f"({first['rss_kb']} -> {last['rss_kb']} KB)")
+    return flags
+
+
+async def soak(args, url: str, pid: int) -> dict:
+    results = Results()
+    http = httpx.AsyncClient(base_url=url)
+    rss_idle = rss_kb(pid)
+    started = time.monotonic()
+    deadline = started + args.duration
+    conversation = CONVERSATIONS[args.app]
+
+    async def start_chat(i: int):
+        await asyncio.sleep(args.ramp * i / args.sessions)
+        await chat(url, conversation, results, deadline, args.think)
+
+    chats = [asyncio.create_task(start_chat(i)) for i in range(args.sessions)]
+    samples = []
+    last = started
+    while time.monotonic() < deadline:
+        await asyncio.sleep(args.sample)
+        now = time.monotonic()
+        metrics = (await http.get("/metrics")).json()
+        window = summarize(results.window(last), now - last)
+        sample = {"t": round(now - started), "turns": len(results.turns), "rss_kb": rss_kb(pid),
+                  "window": window, "metrics": metrics}
+        samples.append(sample)
+        print(f"t={sample['t']:>4}s sessions={metrics['sessions']['sessions']:>4} turns/s={window['turns_per_s']:>6} "
+              f"p50={window['p50_ms']:>7}ms p99={window['p99_ms']:>7}ms lag_p99={metrics['loop_lag']['p99_ms']}ms "
+              f"rss={sample['rss_kb'] // 1024}MB session_avg={metrics['sessions']['avg_kb']}KB", file=sys.stderr)
+        last = now
+    await asyncio.gather(*chats)
+    elapsed = time.monotonic() - started
+    final = (await http.get("/metrics")).json()
+    await http.aclose()
+
+    rss_end = samples[-1]["rss_kb"] if samples else rss_kb(pid)
+    return {
+        "app": args.app,
+        "sessions": args.sessions,
+        "connected": results.connected,
+        "failed_connects": results.failed,
+        "duration_s": round(elapsed, 1),
+        "overall": summarize(results.turns, elapsed),
+        "loop_lag": final["loop_lag"],
+        # Where the worker's time went, from its trace spans
+        "stages": {kind: final["stages"][kind] for kind in ("turn", "agent", "model", "tool", "handoff")
+                   if kind in final["stages"]},
+        "scheduler": final["scheduler"],
+        "usage": {key: final["usage"][key] for key in ("turns", "total", "avg_tokens_per_turn", "budget")},
+        "rss_idle_mb": round(rss_idle / 1024, 1),
+        "rss_end_mb": round(rss_end / 1024, 1),
+        "rss_kb_per_session": round((rss_end - rss_idle) / max(1, results.connected), 1),
+        "session_state": final["sessions"],
+        "flags": growth_flags(samples, results.connected),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="03.AI-Travel-Designer-Agent", choices=APPS)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=120, help="seconds of load")
+    parser.add_argument("--think", type=float, default=1.0, help="mean pause between a reply and the next turn")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds over which sessions connect")
+    parser.add_argument("--sample", type=float, default=5, help="seconds between samples")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake model latency per call")
+    parser.add_argument("--port", type=int, default=8010, help="port for the Chainlit worker")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "rules.json"
+        script.write_text(json.dumps(SCENARIOS[args.app]["rules"]))
+        fake = subprocess.Popen([
+            sys.executable, str(ROOT / "benchmarks" / "fake_openai.py"), "--port", str(FAKE_PORT),
+            "--latency", str(args.latency), "--tokens-per-s", "200", "--script", str(script),
+        ])
+        env = os.environ | {
+            "GEMINI_API_KEY": "soak", "GEMINI_BASE_URL": f"http://127.0.0.1:{FAKE_PORT}",
+            "GEMINI_RPM": "0", "GEMINI_TPM": "0", "TRACE_DIR": str(Path(tmp) / "traces"),
+            "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT / "common"), os.environ.get("PYTHONPATH")])),
+        }
+        app = subprocess.Popen(
+            [sys.executable, "-m", "chainlit", "run", "main.py", "--headless", "--host", "127.0.0.1",
+             "--port", str(args.port)],
+            cwd=ROOT / args.app, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{args.port}"
+        try:
+            for _ in range(60):
+                try:
+                    if httpx.get(f"{url}/metrics").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.5)
+            else:
+                sys.exit("The Chainlit worker did not come up")
+            report = asyncio.run(soak(args, url, app.pid))
+        finally:
+            app.terminate()
+            fake.terminate()
+            app.wait()
+            fake.wait()
+    print(json.dumps(report, indent=2))
+    for flag in report["flags"]:
+        print(f"FLAG {flag}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
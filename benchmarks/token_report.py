@@ -0,0 +1,164 @@
+"""Token report: which instruction blocks and tool schemas cost the most per 1,000 turns.
+
+Usage:
+    python benchmarks/token_report.py [--apps 03.AI-Travel-Designer-Agent ...] [--repeat 3] [--top 25]
+    python benchmarks/token_report.py --apps 03.AI-Travel-Designer-Agent --metrics metrics.json
+    python benchmarks/token_report.py --json
+
+Every model request an agent makes carries its instructions and the JSON
+schemas of its tools and handoffs. The report estimates those blocks per
+agent (agent_common.usage.prompt_parts) and multiplies them by how many
+requests that agent makes per turn. What is left of the measured input
+tokens (chat history, pinned facts, tool results) and the output tokens are
+listed per agent too, so the biggest costs show up side by side.
+
+The request mix per agent comes from the "usage" section of a running app's
+/metrics snapshot (--metrics, e.g. `curl localhost:8000/metrics > metrics.json`)
+or, by default, from the run_suite.py scenario played against the scripted
+fake model API. The Smart Student app has no usage accounting and is not
+covered.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from run_suite import LATENCY, ROOT, SCENARIOS
+
+APPS = ["02.Career-Mentor-Agent", "03.AI-Travel-Designer-Agent", "04.Game-Master-Agent"]
+PORT = 8771
+
+
+def reachable(agent) -> list:
+    """The agent and every agent it can hand off to, directly or not."""
+    seen, queue = {}, [agent]
+    while queue:
+        current = queue.pop()
+        if current.name in seen:
+            continue
+        seen[current.name] = current
+        queue.extend(target for target in current.handoffs if hasattr(target, "handoffs"))
+    return list(seen.values())
+
+
+def app_mode(app: str, repeat: int, play: bool):
+    """In the app's directory: prints its prompt parts, and the ledger after the scenario if play."""
+    sys.path[:0] = [str(ROOT / app), str(ROOT / "common")]  # the app, then the shared agent_common package
+    os.chdir(ROOT / app)
+    from agent_common import usage
+    from agents import Runner, set_tracing_disabled
+
+    set_tracing_disabled(True)
+    scenario = SCENARIOS[app]
+    module, attr = scenario["entry"]
+    entry = getattr(importlib.import_module(module), attr)
+    report = {"parts": {agent.name: usage.prompt_parts(agent) for agent in reachable(entry)}}
+    if play:
+        from agent_common.provider import get_run_config
+
+        run_config = get_run_config()
+
+        async def main():
+            for _ in range(repeat):
+                for prompt in scenario["turns"]:
+                    turn = usage.ledger.turn()
+                    try:
+                        result = Runner.run_streamed(entry, prompt, run_config=run_config, hooks=turn)
+                        async for _ in result.stream_events():
+                            pass
+                    finally:
+                        turn.end()
+
+        asyncio.run(main())
+        report["usage"] = usage.ledger.stats()
+    print(json.dumps(report))
+
+
+def measure(app: str, repeat: int, play: bool) -> dict:
+    command = [sys.executable, __file__, "--apps", app, "--repeat", str(repeat), "--mode", "play" if play else "parts"]
+    env = os.environ | {"GEMINI_API_KEY": "report", "GEMINI_RPM": "0", "GEMINI_TPM": "0", "MODEL_MAX_RETRIES": "0"}
+    if not play:
+        return json.loads(subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout)
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "rules.json"
+        script.write_text(json.dumps(SCENARIOS[app]["rules"]))
+        server = subprocess.Popen([
+            sys.executable, str(ROOT / "benchmarks" / "fake_openai.py"), "--port", str(PORT),
+            "--latency", str(LATENCY), "--tokens-per-s", "0", "--script", str(script),
+        ])
+        time.sleep(1.5)
+        try:
+            out = subprocess.run(command, env=env | {"GEMINI_BASE_URL": f"http://127.0.0.1:{PORT}"},
+                                 capture_output=True, text=True, check=True).stdout
+        finally:
+            server.terminate()
+            server.wait()
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def rows(app: str, parts: dict, usage: dict) -> list[dict]:
+    """Tokens per 1,000 turns for every fixed prompt block, plus the variable input and the output per agent."""
+    turns = usage["turns"] or 1
+    found = []
+    for agent, counts in usage["agents"].items():
+        requests = counts["requests"]
+        fixed = parts.get(agent, {})
+        for block, tokens in fixed.items():
+            found.append({"app": app, "agent": agent, "kind": "fixed", "block": block, "tokens_per_request": tokens,
+                          "per_1k_turns": round(tokens * requests / turns * 1000)})
+        variable = max(0, counts["input_tokens"] - sum(fixed.values()) * requests)
+        found.append({"app": app, "agent": agent, "kind": "input", "block": "history, facts, tool results",
+                      "tokens_per_request": round(variable / requests) if requests else 0,
+                      "per_1k_turns": round(variable / turns * 1000)})
+        found.append({"app": app, "agent": agent, "kind": "output", "block": "output",
+                      "tokens_per_request": round(counts["output_tokens"] / requests) if requests else 0,
+                      "per_1k_turns": round(counts["output_tokens"] / turns * 1000)})
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", nargs="*", default=APPS, choices=APPS)
+    parser.add_argument("--repeat", type=int, default=3, help="passes over each scenario's turns")
+    parser.add_argument("--metrics", help="a /metrics JSON snapshot to take the request mix from (one app)")
+    parser.add_argument("--top", type=int, default=25, help="rows to print")
+    parser.add_argument("--json", action="store_true", help="print all rows as JSON instead of a table")
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return app_mode(args.apps[0], args.repeat, args.mode == "play")
+    if args.metrics and len(args.apps) != 1:
+        parser.error("--metrics needs exactly one --apps")
+
+    report = {}
+    for app in args.apps:
+        if args.metrics:
+            parts = measure(app, args.repeat, play=False)["parts"]
+            usage = json.loads(Path(args.metrics).read_text())["usage"]
+        else:
+            measured = measure(app, args.repeat, play=True)
+            parts, usage = measured["parts"], measured["usage"]
+        report[app] = sorted(rows(app, parts, usage), key=lambda row: row["per_1k_turns"], reverse=True)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for app, found in report.items():
+        total = sum(row["per_1k_turns"] for row in found) or 1
+        fixed = sum(row["per_1k_turns"] for row in found if row["kind"] == "fixed")
+        print(f"\n{app}: {total:,} tokens per 1,000 turns, {fixed / total:.0%} in instructions and schemas")
+        print(f"{'tokens/1k turns':>16} {'share':>6} {'per req':>8}  agent / block")
+        for row in found[:args.top]:
+            print(f"{row['per_1k_turns']:>16,} {row['per_1k_turns'] / total:>6.1%} {row['tokens_per_request']:>8,}  "
+                  f"{row['agent']} / {row['block']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Runtime shared by the agent apps in this repository.
+
+    provider       pooled model client, retries and the shared run config
+    scheduler      process-wide rate limits and fair queuing of model requests
+    tiers          fast / large / cascade model tiers per agent
+    streaming      agent output streamed into Chainlit messages
+    supervisor     one turn in flight per chat session, with a deadline
+    affinity       follow-up turns resume at the last specialist agent
+    router         keyword rules and a naive Bayes classifier ahead of the triage agent
+    memory         token-budgeted chat history with a rolling summary
+    session_store  per-conversation state outside the worker process
+    usage          token accounting and prompt budgets
+    tool_cache     memoization for pure tools
+    tracing_local  local trace processor and the /metrics endpoint
+    health         event loop lag and per-session state size
+
+streaming and health need Chainlit, which only the Chainlit apps install.
+"""
@@ -0,0 +1,35 @@
+from agents import Agent
+
+# Session-level agent affinity: a follow-up turn starts at the specialist the
+# previous turn ended on. The specialist hands back to the entry agent only
+# when the user changes topic, so ongoing exchanges skip the triage hop.
+
+
+class AgentAffinity:
+    def __init__(self, registry, entry_agent: str):
+        self.registry = registry
+        self.entry_agent = entry_agent
+        self.sticky_turns = 0
+        self.avoided_handoffs = 0
+        self.handed_back = 0
+
+    def start_agent(self, last_agent: str | None) -> Agent | None:
+        """The specialist to resume with, or None to start at the entry agent."""
+        if last_agent and last_agent != self.entry_agent:
+            return self.registry.get(last_agent)
+        return None
+
+    def record(self, started: Agent, ended: Agent):
+        """Counts whether a sticky turn stayed with its specialist."""
+        self.sticky_turns += 1
+        if ended.name == started.name:
+            self.avoided_handoffs += 1
+        else:
+            self.handed_back += 1
+
+    def stats(self) -> dict:
+        return {
+            "sticky_turns": self.sticky_turns,
+            "avoided_handoffs": self.avoided_handoffs,
+            "handed_back": self.handed_back,
+        }
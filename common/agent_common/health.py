@@ -0,0 +1,114 @@
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict, deque
+
+from agent_common.session_store import sessions
+
+# Process health for the /metrics endpoint: event loop lag (how late a
+# periodic timer fires; every blocked millisecond delays every chat) and the
+# size of each chat session's cl.user_session data, live session store state
+# and Chainlit message context, so state that grows with the conversation
+# shows up before it becomes a memory problem.
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+
+# Shared objects a session only points to (agents, clients, tasks, code) are
+# not counted towards its size
+SHARED_MODULES = ("agents", "openai", "httpx", "asyncio", "chainlit", "starlette", "concurrent")
+
+
+def percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))] if ordered else 0.0
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self.lags = deque(maxlen=600)
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.lags.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.lags)
+        return {
+            "p50_ms": round(percentile(ordered, 0.5) * 1000, 2),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+loop_lag = LoopLagMonitor()
+
+
+def deep_size(obj, seen: set | None = None) -> int:
+    """Approximate bytes held by obj and everything it owns (shared SDK objects excluded)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or callable(obj) or type(obj).__module__.split(".")[0] in SHARED_MODULES:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return size
+    if isinstance(obj, dict):
+        return size + sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return size + sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_size(vars(obj), seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        size += deep_size(getattr(obj, slot, None), seen)
+    return size
+
+
+def session_stats() -> dict:
+    """Session count and per-session state size, in total and per user_session / session store key."""
+    from chainlit.chat_context import chat_contexts
+    from chainlit.user_session import user_sessions
+
+    sizes = []
+    by_key = defaultdict(int)
+    messages = 0
+    for session_id, data in list(user_sessions.items()):
+        size = 0
+        for key, value in list(data.items()):
+            item = deep_size(value)
+            by_key[key] += item
+            size += item
+        # Chainlit keeps every message of the chat in its own context list
+        context = chat_contexts.get(session_id, ())
+        messages += len(context)
+        item = sum(deep_size(vars(message)) for message in context)
+        by_key["chat_context"] += item
+        sizes.append(size + item)
+    # Conversation state kept in the session store while the chat is live
+    for state in list(sessions.live.values()):
+        for key, value in list(state.items()):
+            by_key[f"store:{key}"] += deep_size(value)
+    stored = sum(v for k, v in by_key.items() if k.startswith("store:"))
+    count = len(sizes)
+    return {
+        "sessions": count,
+        "total_kb": round((sum(sizes) + stored) / 1024, 1),
+        "avg_kb": round((sum(sizes) + stored) / count / 1024, 2) if count else 0.0,
+        "max_kb": round(max(sizes, default=0) / 1024, 2),
+        "chat_context_messages": messages,
+        "avg_kb_by_key": {key: round(total / count / 1024, 2) for key, total in sorted(by_key.items())},
+    }
@@ -0,0 +1,181 @@
+import asyncio
+import logging
+import os
+from collections import deque
+
+from agents import Agent, Runner
+
+from agent_common.scheduler import batch_priority
+from agent_common.usage import ledger
+
+logger = logging.getLogger(__name__)
+
+# Prompt budget for the recent turns we send verbatim, and the cap on the running summary
+MEMORY_WINDOW_TOKENS = int(os.getenv("MEMORY_WINDOW_TOKENS", "1500"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "300"))
+# Always keep at least this many recent turns verbatim, whatever their size
+MEMORY_MIN_TURNS = 2
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token plus message overhead)."""
+    return len(text) // 4 + 4
+
+
+def clip(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * 4
+    return text if len(text) <= max_chars else "…" + text[-max_chars:]
+
+
+# Built once and shared by every conversation, like the apps' agent graphs
+summarizer = Agent(
+    name="memory_summarizer",
+    model="fast",
+    instructions=(
+        f"Merge the new conversation turns into the existing summary. Keep names, numbers, "
+        f"preferences and decisions. Reply with the updated summary only, under {MEMORY_SUMMARY_TOKENS * 3 // 4} words."
+    ),
+)
+
+
+async def summarize_with_agent(summary: str, turns: list[dict]) -> str:
+    """Default summarizer: asks the model to fold old turns into the running summary."""
+    from agent_common.provider import get_run_config
+
+    transcript = "\n".join(f"{t['role']}: {t['content']}" for t in turns)
+    # Background work: yields to interactive turns in the request scheduler
+    hooks = ledger.turn(background=True)
+    try:
+        with batch_priority():
+            result = await Runner.run(
+                summarizer,
+                input=f"Existing summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}",
+                run_config=get_run_config(),
+                hooks=hooks,
+            )
+    finally:
+        hooks.end()
+    return result.final_output
+
+
+class ConversationMemory:
+    """Token-budgeted chat history with a rolling summary and pinned facts.
+
+    Recent turns are kept verbatim up to window_tokens. Older turns are folded
+    into a summary in the background, so the prompt stays roughly the same size
+    however long the conversation gets. Pinned facts (budget, destination,
+    career interest...) are always sent.
+    """
+
+    def __init__(self, window_tokens=MEMORY_WINDOW_TOKENS, summary_tokens=MEMORY_SUMMARY_TOKENS,
+                 summarizer=summarize_with_agent):
+        self.window_tokens = window_tokens
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.turns = deque()
+        self.window_used = 0
+        self.summary = ""
+        self.pinned = {}
+        self.pending = []
+        self.prompt_tokens = deque(maxlen=200)
+        self._task = None
+        self._summarizing = []  # the batch being folded into the summary right now
+
+    def __getstate__(self):
+        # The background summary task stays with the process: turns it has not
+        # folded in yet are saved as pending and summarized again after a restore
+        state = self.__dict__.copy()
+        state["pending"] = self._summarizing + self.pending
+        state["_summarizing"] = []
+        state["_task"] = None
+        return state
+
+    def pin(self, key: str, value):
+        if value is None:
+            self.pinned.pop(key, None)
+        else:
+            self.pinned[key] = value
+
+    def add(self, role: str, content: str):
+        tokens = estimate_tokens(content)
+        self.turns.append((role, content, tokens))
+        self.window_used += tokens
+        while self.window_used > self.window_tokens and len(self.turns) > MEMORY_MIN_TURNS:
+            old_role, old_content, old_tokens = self.turns.popleft()
+            self.window_used -= old_tokens
+            self.pending.append({"role": old_role, "content": old_content})
+        if self.pending:
+            self._schedule_summary()
+
+    def compact(self, tokens: int) -> list[dict]:
+        """Moves the oldest verbatim turns out to the summary until about `tokens` are freed; returns the new input."""
+        freed = 0
+        while freed < tokens and len(self.turns) > MEMORY_MIN_TURNS:
+            role, content, size = self.turns.popleft()
+            self.window_used -= size
+            freed += size
+            self.pending.append({"role": role, "content": content})
+        if self.pending:
+            self._schedule_summary()
+        return self.to_input()
+
+    def _schedule_summary(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._summarize())
+        except RuntimeError:
+            # No running loop (e.g. scripts); the next async call will pick it up
+            self._task = None
+
+    async def _summarize(self):
+        while self.pending:
+            batch, self.pending = self.pending, []
+            self._summarizing = batch
+            try:
+                summary = await self.summarizer(self.summary, batch)
+                self.summary = clip(summary.strip(), self.summary_tokens)
+            except Exception as e:
+                logger.warning("Memory summarization failed, keeping a clipped transcript: %s", e)
+                lines = "\n".join(f"{t['role']}: {t['content']}" for t in batch)
+                self.summary = clip(f"{self.summary}\n{lines}".strip(), self.summary_tokens)
+            finally:
+                self._summarizing = []
+
+    async def wait_for_summary(self):
+        if self._task is not None:
+            await self._task
+
+    def _context_block(self) -> str | None:
+        parts = []
+        if self.pinned:
+            parts.append("Known facts: " + "; ".join(f"{k}: {v}" for k, v in self.pinned.items()))
+        summary = self.summary
+        if self.pending:
+            # Not summarized yet: send a clipped copy so nothing silently disappears
+            lines = "\n".join(f"{t['role']}: {t['content']}" for t in self.pending)
+            summary = f"{summary}\n{lines}".strip()
+        if summary:
+            parts.append("Conversation so far: " + clip(summary, self.summary_tokens))
+        return "\n".join(parts) or None
+
+    def to_input(self) -> list[dict]:
+        """Builds the Runner input and records its size for this turn."""
+        items = []
+        block = self._context_block()
+        if block:
+            items.append({"role": "system", "content": block})
+        items.extend({"role": role, "content": content} for role, content, _ in self.turns)
+        size = sum(estimate_tokens(item["content"]) for item in items)
+        self.prompt_tokens.append(size)
+        logger.debug("Prompt size: ~%d tokens (%d verbatim turns)", size, len(self.turns))
+        return items
+
+    def stats(self) -> dict:
+        return {
+            "turns_in_window": len(self.turns),
+            "window_tokens": self.window_used,
+            "summary_tokens": estimate_tokens(self.summary) if self.summary else 0,
+            "last_prompt_tokens": self.prompt_tokens[-1] if self.prompt_tokens else 0,
+            "max_prompt_tokens": max(self.prompt_tokens, default=0),
+        }
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import os
+import random
+import time
+
+import httpx
+from agents import ModelSettings, OpenAIChatCompletionsModel, RunConfig
+from dotenv import find_dotenv, load_dotenv
+from openai import AsyncOpenAI
+
+from agent_common.scheduler import OUTPUT_TOKEN_ALLOWANCE, scheduler
+from agent_common.tiers import TieredProvider
+
+# The .env of the app being run (its working directory), not one next to this package
+load_dotenv(find_dotenv(usecwd=True))
+logger = logging.getLogger(__name__)
+
+# One client, model and run config for the whole process. Every chat session
+# reuses them so connections stay warm instead of re-doing TCP/TLS per chat.
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/openai")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+# Connection pool tuning
+POOL_MAX_CONNECTIONS = int(os.getenv("POOL_MAX_CONNECTIONS", "100"))
+POOL_MAX_KEEPALIVE = int(os.getenv("POOL_MAX_KEEPALIVE", "20"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("POOL_KEEPALIVE_EXPIRY", "60"))
+POOL_WARM_CONNECTIONS = int(os.getenv("POOL_WARM_CONNECTIONS", "2"))
+REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "60"))
+
+# Retries for throttled (429) and failing (5xx) model requests; the OpenAI
+# client's own retries are off so every attempt goes through the scheduler
+MAX_RETRIES = int(os.getenv("MODEL_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("BACKOFF_BASE_S", "0.5"))
+BACKOFF_MAX = float(os.getenv("BACKOFF_MAX_S", "20"))
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class PoolMetrics:
+    """Counters for the shared connection pool."""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait: float, connected: bool):
+        self.requests += 1
+        self.wait_seconds += wait
+        self.max_wait_seconds = max(self.max_wait_seconds, wait)
+        if connected:
+            self.new_connections += 1
+
+    def snapshot(self, open_connections: int) -> dict:
+        reused = self.requests - self.new_connections
+        return {
+            "open_connections": open_connections,
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            "avg_wait_ms": round(self.wait_seconds / self.requests * 1000, 2) if self.requests else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 2),
+        }
+
+
+class MeteredTransport(httpx.AsyncHTTPTransport):
+    """httpx transport that measures pool wait time and connection reuse."""
+
+    def __init__(self, metrics: PoolMetrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+
+    @property
+    def open_connections(self) -> int:
+        return len(self._pool.connections)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        timings = {"connect": 0.0, "sent": None, "connected": False}
+        connect_started = 0.0
+
+        async def trace(name, info):
+            nonlocal connect_started
+            if name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+                timings["connected"] = True
+                connect_started = time.perf_counter()
+            elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+                timings["connect"] += time.perf_counter() - connect_started
+            elif name.endswith("send_request_headers.started") and timings["sent"] is None:
+                timings["sent"] = time.perf_counter()
+
+        request.extensions["trace"] = trace
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            sent = timings["sent"] or time.perf_counter()
+            wait = max(0.0, sent - started - timings["connect"])
+            self.metrics.record(wait, timings["connected"])
+
+
+def backoff(attempt: int, retry_after: str | None = None) -> float:
+    """Exponential backoff with jitter, never shorter than the server's Retry-After."""
+    cap = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)
+    delay = cap / 2 + random.uniform(0, cap / 2)
+    try:
+        return max(delay, float(retry_after)) if retry_after else delay
+    except ValueError:
+        return delay
+
+
+class ScheduledTransport(MeteredTransport):
+    """Waits for a scheduler slot before every attempt and retries 429/5xx and connection errors."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            tokens = len(request.content) // 4 + OUTPUT_TOKEN_ALLOWANCE
+        except httpx.RequestNotRead:
+            tokens = OUTPUT_TOKEN_ALLOWANCE
+        for attempt in range(MAX_RETRIES + 1):
+            await scheduler.acquire(tokens)
+            retry_after = None
+            try:
+                response = await super().handle_async_request(request)
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    scheduler.gave_up += 1
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    return response
+                if response.status_code == 429:
+                    scheduler.throttled += 1
+                else:
+                    scheduler.server_errors += 1
+                if attempt == MAX_RETRIES:
+                    scheduler.gave_up += 1
+                    return response
+                retry_after = response.headers.get("retry-after")
+                await response.aclose()
+            scheduler.retries += 1
+            await asyncio.sleep(backoff(attempt, retry_after))
+
+
+metrics = PoolMetrics()
+_transport: MeteredTransport | None = None
+_client: AsyncOpenAI | None = None
+_model: OpenAIChatCompletionsModel | None = None
+_run_config: RunConfig | None = None
+
+
+def get_client() -> AsyncOpenAI:
+    """Returns the process-wide AsyncOpenAI client, creating it on first use."""
+    global _client, _transport
+    if _client is None:
+        limits = httpx.Limits(
+            max_connections=POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=POOL_MAX_KEEPALIVE,
+            keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+        )
+        _transport = ScheduledTransport(metrics, limits=limits)
+        _client = AsyncOpenAI(
+            api_key=os.getenv("GEMINI_API_KEY"),
+            base_url=GEMINI_BASE_URL,
+            max_retries=0,
+            http_client=httpx.AsyncClient(transport=_transport, timeout=REQUEST_TIMEOUT),
+        )
+    return _client
+
+
+def get_model() -> OpenAIChatCompletionsModel:
+    global _model
+    if _model is None:
+        _model = OpenAIChatCompletionsModel(model=GEMINI_MODEL, openai_client=get_client())
+    return _model
+
+
+def get_run_config() -> RunConfig:
+    """Shared run config; agents name a model tier that the TieredProvider resolves.
+
+    Traces go to the local processor (see tracing_local) without prompts or outputs.
+    Streamed responses report token usage too (the SDK only asks api.openai.com
+    for it by default), for usage.py and the tier stats.
+    """
+    global _run_config
+    if _run_config is None:
+        _run_config = RunConfig(
+            model_provider=TieredProvider(get_client()),
+            model_settings=ModelSettings(include_usage=True),
+            trace_include_sensitive_data=False,
+        )
+    return _run_config
+
+
+def scheduler_stats() -> dict:
+    """Queue depth, wait times and retries of the shared request scheduler."""
+    return scheduler.stats()
+
+
+def tier_stats() -> dict:
+    """Calls, latency, tokens and cost per model tier."""
+    return _run_config.model_provider.snapshot() if _run_config else {}
+
+
+def pool_metrics() -> dict:
+    """Open connections, wait time and reuse ratio of the shared pool."""
+    return metrics.snapshot(_transport.open_connections if _transport else 0)
+
+
+async def warm_up(connections: int = POOL_WARM_CONNECTIONS):
+    """Opens a few keep-alive connections at server boot so the first chats skip the handshake."""
+    client = get_client()
+
+    async def ping():
+        try:
+            await client.models.list()
+        except Exception as e:
+            logger.warning("Connection warm-up failed: %s", e)
+
+    await asyncio.gather(*(ping() for _ in range(connections)))
+    logger.info("Model connection pool warmed: %s", pool_metrics())
+
+
+async def aclose():
+    global _client, _model, _run_config, _transport
+    if _client is not None:
+        await _client.close()
+    _client = _model = _run_config = _transport = None
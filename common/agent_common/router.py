@@ -0,0 +1,131 @@
+import math
+import os
+import re
+import time
+from collections import Counter
+
+from agents import RunHooks
+
+# Local routing before Runner.run: keyword rules first, then a small naive Bayes
+# classifier. Only ambiguous messages go through the triage agent's model call.
+ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") != "0"
+ROUTER_CONFIDENCE = float(os.getenv("ROUTER_CONFIDENCE", "0.8"))
+# The classifier only answers when enough of the message is words it was
+# trained on; a long off-topic message would otherwise pile up evidence from
+# a few stray words and score as confidently as an on-topic one
+ROUTER_MIN_KNOWN_WORDS = int(os.getenv("ROUTER_MIN_KNOWN_WORDS", "2"))
+ROUTER_MIN_KNOWN_RATIO = float(os.getenv("ROUTER_MIN_KNOWN_RATIO", "0.5"))
+# Evidence is scaled to at most this many known words (about one training example)
+ROUTER_EVIDENCE_WORDS = int(os.getenv("ROUTER_EVIDENCE_WORDS", "6"))
+
+WORD_RE = re.compile(r"[a-z0-9+#./']+")
+
+
+def tokenize(text: str) -> list[str]:
+    return WORD_RE.findall(text.lower())
+
+
+class NaiveBayes:
+    """Multinomial naive Bayes over words, trained from a few labelled examples."""
+
+    def __init__(self, examples: dict[str, list[str]]):
+        self.labels = list(examples)
+        self.priors = {}
+        self.word_counts = {}
+        self.totals = {}
+        self.vocab = set()
+        n_docs = sum(len(texts) for texts in examples.values())
+        for label, texts in examples.items():
+            counts = Counter(word for text in texts for word in tokenize(text))
+            self.vocab.update(counts)
+            self.word_counts[label] = counts
+            self.totals[label] = sum(counts.values())
+            self.priors[label] = math.log(len(texts) / n_docs)
+        self.vocab_size = len(self.vocab)
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """Returns the best label and its posterior probability (0.0 when too few words are known)."""
+        words = tokenize(text)
+        known = [w for w in words if w in self.vocab]
+        if len(known) < ROUTER_MIN_KNOWN_WORDS or len(known) < ROUTER_MIN_KNOWN_RATIO * len(words):
+            return self.labels[0], 0.0
+        # Unknown words carry no evidence; the rest is scaled down for long
+        # messages so the score does not grow with message length
+        weight = min(1.0, ROUTER_EVIDENCE_WORDS / len(known))
+        scores = {}
+        for label in self.labels:
+            counts, denom = self.word_counts[label], self.totals[label] + self.vocab_size
+            evidence = sum(math.log((counts[w] + 1) / denom) for w in known)
+            scores[label] = self.priors[label] + weight * evidence
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1 / norm
+
+
+class IntentRouter:
+    """Picks the specialist agent for a message, or None to fall back to triage."""
+
+    def __init__(self, rules: dict[str, list[str]], examples: dict[str, list[str]], threshold=ROUTER_CONFIDENCE):
+        self.rules = {
+            label: re.compile(r"\b(?:%s)" % "|".join(patterns), re.IGNORECASE)
+            for label, patterns in rules.items()
+        }
+        self.classifier = NaiveBayes(examples)
+        self.threshold = threshold
+        self.rule_hits = 0
+        self.model_hits = 0
+        self.fallbacks = 0
+        self.route_seconds = 0.0
+        self.triage_seconds = 0.0
+        self.triage_samples = 0
+
+    def route(self, text: str) -> str | None:
+        started = time.perf_counter()
+        try:
+            if not ROUTER_ENABLED:
+                return None
+            matched = [label for label, pattern in self.rules.items() if pattern.search(text)]
+            if len(matched) == 1:
+                self.rule_hits += 1
+                return matched[0]
+            # No rule or several rules matched: let the classifier decide
+            label, confidence = self.classifier.predict(text)
+            if confidence >= self.threshold and (not matched or label in matched):
+                self.model_hits += 1
+                return label
+            self.fallbacks += 1
+            return None
+        finally:
+            self.route_seconds += time.perf_counter() - started
+
+    def triage_timer(self) -> RunHooks:
+        """Run hooks that time how long the triage agent takes to hand off."""
+        return TriageTimer(self)
+
+    def observe_triage(self, seconds: float):
+        self.triage_seconds += seconds
+        self.triage_samples += 1
+
+    def stats(self) -> dict:
+        hits = self.rule_hits + self.model_hits
+        total = hits + self.fallbacks
+        avg_triage = self.triage_seconds / self.triage_samples if self.triage_samples else 0.0
+        return {
+            "routed": total,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "rule_hits": self.rule_hits,
+            "classifier_hits": self.model_hits,
+            "fallbacks": self.fallbacks,
+            "avg_route_us": round(self.route_seconds / total * 1e6, 1) if total else 0.0,
+            "avg_triage_ms": round(avg_triage * 1000, 1),
+            "est_saved_s": round(hits * avg_triage - self.route_seconds, 2),
+        }
+
+
+class TriageTimer(RunHooks):
+    def __init__(self, router: IntentRouter):
+        self.router = router
+        self.started = time.perf_counter()
+
+    async def on_handoff(self, context, from_agent, to_agent):
+        self.router.observe_triage(time.perf_counter() - self.started)
@@ -0,0 +1,157 @@
+import asyncio
+import contextvars
+import os
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Process-wide admission control for model API requests. Every request waits
+# for a slot from two token buckets (requests and tokens per minute). Waiting
+# requests are served interactive first, then batch (speculation, memory
+# summaries), and round-robin across chat sessions within each priority, so
+# one busy session cannot starve the others. The provider transport asks for
+# a slot before every attempt and retries 429/5xx with jittered backoff.
+# The limits are per process: with several workers or apps sharing one API
+# key, set each to its share of the key's quota. Unlimited unless set, so
+# requests are only slowed down by the quota that is actually configured.
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))  # 0 = unlimited
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "0"))  # 0 = unlimited
+# Burst size, in seconds' worth of the rate; small so a sliding one-minute
+# window upstream never sees much more than the per-minute limit
+SCHEDULER_BURST_S = float(os.getenv("SCHEDULER_BURST_S", "5"))
+# Output tokens assumed per request on top of the prompt estimate
+OUTPUT_TOKEN_ALLOWANCE = int(os.getenv("OUTPUT_TOKEN_ALLOWANCE", "500"))
+
+PRIORITIES = ("interactive", "batch")
+
+session_id = contextvars.ContextVar("scheduler_session", default="-")
+priority = contextvars.ContextVar("scheduler_priority", default="interactive")
+
+
+def set_session(session: str):
+    """Tags the model requests made from this task (and tasks it starts) with a chat session."""
+    session_id.set(session)
+
+
+@contextmanager
+def batch_priority():
+    """Model requests made inside this block yield to interactive turns."""
+    token = priority.set("batch")
+    try:
+        yield
+    finally:
+        priority.reset(token)
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float, burst_s: float = SCHEDULER_BURST_S):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_s) if per_minute else 0.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float) -> float:
+        """Seconds until amount is available (0 when it is available now)."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity:
+            self.level -= min(amount, self.capacity)
+
+
+class RequestScheduler:
+    def __init__(self, rpm: float = GEMINI_RPM, tpm: float = GEMINI_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        # priority -> session -> waiting (future, tokens, enqueued_at)
+        self.queues = {p: OrderedDict() for p in PRIORITIES}
+        self._timer: asyncio.TimerHandle | None = None
+        self.waits = {p: deque(maxlen=1000) for p in PRIORITIES}
+        self.granted = dict.fromkeys(PRIORITIES, 0)
+        self.max_depth = 0
+        self.retries = 0
+        self.throttled = 0  # 429 responses
+        self.server_errors = 0  # 5xx responses
+        self.gave_up = 0
+
+    @property
+    def depth(self) -> int:
+        return sum(len(waiters) for queue in self.queues.values() for waiters in queue.values())
+
+    async def acquire(self, tokens: int):
+        """Waits until this request may be sent."""
+        level = priority.get()
+        future = asyncio.get_running_loop().create_future()
+        self.queues[level].setdefault(session_id.get(), deque()).append((future, tokens, time.monotonic()))
+        self.max_depth = max(self.max_depth, self.depth)
+        self._dispatch()
+        await future
+
+    def _next(self):
+        """Head of the next session's queue: highest priority first, round-robin over sessions."""
+        for level in PRIORITIES:
+            queue = self.queues[level]
+            while queue:
+                session, waiters = next(iter(queue.items()))
+                while waiters and waiters[0][0].done():
+                    waiters.popleft()  # cancelled while waiting
+                if not waiters:
+                    del queue[session]
+                    continue
+                return level, session, waiters
+        return None
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while (head := self._next()) is not None:
+            level, session, waiters = head
+            future, tokens, enqueued = waiters[0]
+            delay = max(self.requests.delay(1), self.tokens.delay(tokens))
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            waiters.popleft()
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.waits[level].append(time.monotonic() - enqueued)
+            self.granted[level] += 1
+            future.set_result(None)
+            # This session goes to the back of the line
+            queue = self.queues[level]
+            if waiters:
+                queue.move_to_end(session)
+            else:
+                del queue[session]
+
+    def stats(self) -> dict:
+        waits = {}
+        for level, samples in self.waits.items():
+            ordered = sorted(samples)
+            waits[level] = {
+                "granted": self.granted[level],
+                "avg_wait_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+                "p95_wait_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1)
+                if ordered else 0.0,
+            }
+        return {
+            "queue_depth": self.depth,
+            "max_queue_depth": self.max_depth,
+            "retries": self.retries,
+            "throttled_429": self.throttled,
+            "server_errors_5xx": self.server_errors,
+            "gave_up": self.gave_up,
+        } | waits
+
+
+scheduler = RequestScheduler()
@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Per-conversation state (chat memory, trip details, the game world...) kept
+# outside the Chainlit worker. State is a plain dict per conversation, keyed
+# by the chat's thread id so a reconnect to another worker or a restart picks
+# it up again. It is loaded lazily on a session's first turn, written back in
+# batches (write-behind) as pickle+zlib blobs, and dropped from process memory
+# once the session goes idle, so a worker only holds the chats in progress.
+#
+# Unpickling runs code, so every blob is signed with HMAC-SHA256 and one whose
+# signature does not match is discarded unread: whoever can write the store
+# cannot make a worker execute anything without SESSION_SECRET as well. Set
+# the same SESSION_SECRET for every worker sharing a SQLite store; without one
+# each process signs with a random key and can only read back its own blobs.
+#
+#   memory  compressed blobs in this process (the default; lost on restart)
+#   sqlite  a SQLite file in WAL mode, shared by every worker on the host
+#
+# Two workers serving the same conversation at once is not coordinated: the
+# last write wins. Process-local objects (run supervisors, speculation tasks)
+# stay in cl.user_session.
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_DB = os.getenv("SESSION_DB", "sessions.sqlite")
+SESSION_FLUSH_S = float(os.getenv("SESSION_FLUSH_S", "1"))  # write-behind delay
+SESSION_IDLE_S = float(os.getenv("SESSION_IDLE_S", "900"))  # evicted from process memory after this
+SESSION_MAX_LIVE = int(os.getenv("SESSION_MAX_LIVE", "10000"))  # live sessions per worker
+SESSION_TTL_S = float(os.getenv("SESSION_TTL_S", str(7 * 24 * 3600)))  # deleted from the store after this
+SESSION_SECRET = os.getenv("SESSION_SECRET", "").encode()
+
+PICKLE_PROTOCOL = 5
+SIGNATURE_BYTES = hashlib.sha256().digest_size
+
+
+def dumps(state: dict, secret: bytes) -> bytes:
+    blob = zlib.compress(pickle.dumps(state, protocol=PICKLE_PROTOCOL), 1)
+    return hmac.digest(secret, blob, "sha256") + blob
+
+
+def loads(blob: bytes, secret: bytes) -> dict:
+    signature, blob = blob[:SIGNATURE_BYTES], blob[SIGNATURE_BYTES:]
+    if not hmac.compare_digest(signature, hmac.digest(secret, blob, "sha256")):
+        raise ValueError("bad signature (written with another SESSION_SECRET, or tampered with)")
+    return pickle.loads(zlib.decompress(blob))
+
+
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self):
+        self.blobs = {}  # key -> (blob, updated)
+
+    def load(self, key: str) -> bytes | None:
+        entry = self.blobs.get(key)
+        return entry[0] if entry else None
+
+    def save_many(self, items: dict[str, bytes]):
+        now = time.time()
+        for key, blob in items.items():
+            self.blobs[key] = (blob, now)
+
+    def purge(self, older_than: float) -> int:
+        stale = [key for key, (_, updated) in self.blobs.items() if updated < older_than]
+        for key in stale:
+            del self.blobs[key]
+        return len(stale)
+
+    def close(self):
+        pass
+
+
+class SQLiteBackend:
+    blocking = True  # run in a thread, off the event loop
+
+    def __init__(self, path: str = SESSION_DB):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("PRAGMA busy_timeout=5000")  # other workers write to the same file
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                key TEXT PRIMARY KEY,
+                state BLOB NOT NULL,
+                updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+        """)
+
+    def load(self, key: str) -> bytes | None:
+        with self.lock:
+            row = self.db.execute("SELECT state FROM sessions WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def save_many(self, items: dict[str, bytes]):
+        now = time.time()
+        with self.lock, self.db:
+            self.db.executemany(
+                "INSERT INTO sessions (key, state, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET state = excluded.state, updated = excluded.updated",
+                [(key, blob, now) for key, blob in items.items()],
+            )
+
+    def purge(self, older_than: float) -> int:
+        with self.lock, self.db:
+            return self.db.execute("DELETE FROM sessions WHERE updated < ?", (older_than,)).rowcount
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class SessionStore:
+    """Lazily loaded, write-behind cache of per-conversation state dicts."""
+
+    def __init__(self, backend=None, flush_s: float = SESSION_FLUSH_S, idle_s: float = SESSION_IDLE_S,
+                 max_live: int = SESSION_MAX_LIVE, ttl_s: float = SESSION_TTL_S, secret: bytes = SESSION_SECRET):
+        if backend is None:
+            backend = SQLiteBackend() if SESSION_STORE == "sqlite" else MemoryBackend()
+        if not secret and not isinstance(backend, MemoryBackend):
+            logger.warning("SESSION_SECRET is not set: sessions can only be restored by this process")
+        self.backend = backend
+        self.secret = secret or os.urandom(32)
+        self.flush_s = flush_s
+        self.idle_s = idle_s
+        self.max_live = max_live
+        self.ttl_s = ttl_s
+        self.live = OrderedDict()  # key -> state, least recently used first
+        self.used = {}  # key -> monotonic time of last use
+        self.dirty = set()
+        self._loading = {}  # key -> task, so concurrent first turns load once
+        self._flusher: asyncio.Task | None = None
+        self._purged = 0.0
+        self.loads = 0
+        self.created = 0
+        self.hits = 0
+        self.flushes = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.evicted = 0
+        self.write_errors = 0
+
+    async def get(self, key: str) -> dict:
+        """The conversation's state, loaded from the backend on first use (a new dict if there is none)."""
+        state = self.live.get(key)
+        if state is not None:
+            self.hits += 1
+            self._touch(key)
+            return state
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.create_task(self._load(key))
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        state = await task
+        if key not in self.live:
+            self.live[key] = state
+        self._touch(key)
+        self._start()
+        return self.live[key]
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    async def _load(self, key: str) -> dict:
+        blob = await self._call(self.backend.load, key)
+        if blob is None:
+            self.created += 1
+            return {}
+        self.loads += 1
+        try:
+            return loads(blob, self.secret)
+        except Exception as e:
+            # Unsigned, tampered with or written by an incompatible version: start the conversation over
+            logger.warning("Could not restore session %s: %s", key, e)
+            return {}
+
+    def _touch(self, key: str):
+        self.live.move_to_end(key)
+        self.used[key] = time.monotonic()
+
+    def save(self, key: str, state: dict):
+        """Marks the state as changed; it is written on the next flush.
+
+        A session evicted while a turn was using it (idle or over max_live) is
+        taken back in, so that turn's changes are written too. If a newer turn
+        has loaded the session again meanwhile, its state is the one kept.
+        """
+        live = self.live.get(key)
+        if live is None:
+            self.live[key] = state
+            self._touch(key)
+        elif live is not state:
+            return
+        self.dirty.add(key)
+        self._start()
+
+    def _start(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self.live or self.dirty:
+            await asyncio.sleep(self.flush_s)
+            await self.flush()
+            await self._evict_idle()
+
+    async def flush(self, keys=None):
+        """Writes the dirty sessions (or only the given ones) to the backend in one batch."""
+        keys = self.dirty if keys is None else self.dirty & set(keys)
+        if not keys:
+            return
+        items = {}
+        for key in list(keys):
+            self.dirty.discard(key)
+            try:
+                items[key] = dumps(self.live[key], self.secret)
+            except Exception as e:
+                self.write_errors += 1
+                logger.warning("Session %s is not serializable, not saved: %s", key, e)
+        if not items:
+            return
+        try:
+            await self._call(self.backend.save_many, items)
+        except Exception as e:
+            self.write_errors += 1
+            self.dirty.update(items)  # retried on the next flush
+            logger.warning("Could not write %d sessions: %s", len(items), e)
+            return
+        self.flushes += 1
+        self.written += len(items)
+        self.bytes_written += sum(len(blob) for blob in items.values())
+
+    async def _evict_idle(self):
+        cutoff = time.monotonic() - self.idle_s
+        excess = len(self.live) - self.max_live
+        idle = []
+        for key in self.live:  # least recently used first
+            if self.used[key] >= cutoff and len(idle) >= excess:
+                break
+            idle.append(key)
+        for key in idle:
+            await self.evict(key)
+        if self.ttl_s and time.monotonic() - self._purged > 3600:
+            self._purged = time.monotonic()
+            await self._call(self.backend.purge, time.time() - self.ttl_s)
+
+    async def evict(self, key: str):
+        """Writes the session if needed and drops it from process memory."""
+        if key in self.dirty:
+            await self.flush([key])
+        if key in self.dirty:
+            return  # the write failed; keep it until it succeeds
+        if self.live.pop(key, None) is not None:
+            self.used.pop(key, None)
+            self.evicted += 1
+
+    async def close(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+        await self.flush()
+        self.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "live": len(self.live),
+            "dirty": len(self.dirty),
+            "hits": self.hits,
+            "loads": self.loads,
+            "created": self.created,
+            "evicted": self.evicted,
+            "flushes": self.flushes,
+            "written": self.written,
+            "avg_state_bytes": round(self.bytes_written / self.written) if self.written else 0,
+            "write_errors": self.write_errors,
+        }
+
+
+sessions = SessionStore()
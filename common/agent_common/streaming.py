@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import chainlit as cl
+from agents import Agent, RunConfig, RunHooks, Runner
+from openai.types.responses import ResponseTextDeltaEvent
+
+logger = logging.getLogger(__name__)
+
+# Stream agent output token by token into the chat (set STREAM_RESPONSES=0 to wait for the full answer)
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "1") != "0"
+
+# Recent time-to-first-token samples, in seconds
+ttft_samples = deque(maxlen=1000)
+
+
+def ttft_summary() -> dict:
+    """Average and p95 time-to-first-token over the recent turns."""
+    if not ttft_samples:
+        return {"turns": 0}
+    ordered = sorted(ttft_samples)
+    return {
+        "turns": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1),
+    }
+
+
+async def run_into_message(agent: Agent, input, run_config: RunConfig | None, msg: cl.Message,
+                           hooks: RunHooks | None = None, context=None):
+    """Runs the agent and writes its answer into msg, streaming deltas when enabled.
+
+    Handoffs and tool calls show up as steps in the UI while the run is in progress.
+    context is the run context handed to the agents' tools. Returns the run
+    result; msg.content holds the final answer.
+    """
+    started = time.perf_counter()
+    if not STREAM_RESPONSES:
+        result = await Runner.run(starting_agent=agent, input=input, run_config=run_config, hooks=hooks,
+                                  context=context)
+        ttft_samples.append(time.perf_counter() - started)
+        msg.content = result.final_output
+        await msg.update()
+        return result
+
+    result = Runner.run_streamed(starting_agent=agent, input=input, run_config=run_config, hooks=hooks,
+                                 context=context)
+    try:
+        return await _stream_into_message(result, agent, msg, started)
+    except asyncio.CancelledError:
+        # Stop the run's background task too (model calls, tools, handoffs)
+        result.cancel()
+        raise
+
+
+async def _stream_into_message(result, agent: Agent, msg: cl.Message, started: float):
+    tool_steps = {}
+    first_token = True
+    async for event in result.stream_events():
+        if event.type == "raw_response_event":
+            if isinstance(event.data, ResponseTextDeltaEvent) and event.data.delta:
+                if first_token:
+                    first_token = False
+                    ttft_samples.append(time.perf_counter() - started)
+                    # Replace the placeholder text with the streamed answer
+                    msg.content = ""
+                await msg.stream_token(event.data.delta)
+
+        elif event.type == "agent_updated_stream_event":
+            if event.new_agent is not agent:
+                step = cl.Step(name=f"Handoff → {event.new_agent.name}", type="run")
+                step.output = event.new_agent.handoff_description or event.new_agent.name
+                await step.send()
+
+        elif event.type == "run_item_stream_event":
+            raw = getattr(event.item, "raw_item", None)
+            if event.name == "tool_called":
+                step = cl.Step(name=getattr(raw, "name", "tool"), type="tool")
+                step.input = getattr(raw, "arguments", "")
+                await step.send()
+                tool_steps[getattr(raw, "call_id", None)] = step
+            elif event.name == "tool_output":
+                call_id = raw.get("call_id") if isinstance(raw, dict) else getattr(raw, "call_id", None)
+                step = tool_steps.pop(call_id, None)
+                if step is not None:
+                    step.output = str(event.item.output)
+                    await step.update()
+
+    if asyncio.current_task().cancelling():
+        # stream_events() swallows cancellation and just ends; keep the turn cancelled
+        raise asyncio.CancelledError()
+    if first_token:
+        ttft_samples.append(time.perf_counter() - started)
+    # Sync the final answer in case some of it did not arrive as text deltas
+    msg.content = result.final_output or msg.content
+    await msg.update()
+    logger.debug("Time to first token: %s", ttft_summary())
+    return result
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Per-session run supervision. Each chat session runs at most one agent turn
+# at a time: a newer message cancels the run still in flight (model calls,
+# tool calls and handoffs included) and only the latest turn may update the
+# session state. Every turn also gets a deadline.
+TURN_DEADLINE_S = float(os.getenv("TURN_DEADLINE_S", "90"))
+
+
+class Superseded(Exception):
+    """The turn was cancelled because the user sent a newer message."""
+
+
+class SupervisorStats:
+    def __init__(self):
+        self.turns = 0
+        self.completed = 0
+        self.superseded = 0
+        self.deadline_exceeded = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "turns": self.turns,
+            "completed": self.completed,
+            "superseded": self.superseded,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+
+stats = SupervisorStats()
+
+
+class RunSupervisor:
+    def __init__(self, deadline: float = TURN_DEADLINE_S):
+        self.deadline = deadline
+        self.generation = 0
+        self._task: asyncio.Task | None = None
+
+    def begin(self) -> int:
+        """Starts a new turn: cancels the one in flight and returns the new generation."""
+        self.generation += 1
+        self.cancel()
+        stats.turns += 1
+        return self.generation
+
+    async def run(self, coro):
+        """Runs coro as the session's latest turn and returns its result.
+
+        Cancels the previous turn if it is still running. Raises Superseded if
+        a newer turn starts before this one is done, and TimeoutError after
+        the deadline.
+        """
+        generation = self.begin()
+        task = self._task = asyncio.create_task(coro)
+        try:
+            async with asyncio.timeout(self.deadline):
+                result = await task
+        except asyncio.CancelledError:
+            # Our own handler being cancelled (e.g. the stop button) is not a supersede
+            if asyncio.current_task().cancelling() or generation == self.generation:
+                raise
+            stats.superseded += 1
+            raise Superseded() from None
+        except TimeoutError:
+            stats.deadline_exceeded += 1
+            logger.info("Turn exceeded its %gs deadline", self.deadline)
+            raise
+        if generation != self.generation:
+            # Finished, but a newer message arrived meanwhile: its turn wins
+            stats.superseded += 1
+            raise Superseded()
+        stats.completed += 1
+        return result
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+
+def supervisor_stats() -> dict:
+    return stats.snapshot()
@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import deque
+
+from agents import Model, ModelProvider, OpenAIChatCompletionsModel
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Model tiers. Agents name a tier instead of a model ("fast", "large" or
+# "cascade") and the run config's TieredProvider maps it to a model:
+#   fast     small, quick model for triage, routing and short factual turns
+#   large    bigger model for long-form answers
+#   cascade  fast first; escalates to large for long-form requests or when a
+#            cheap check on the fast answer fails (empty, refusal, bad tool call)
+# Latency, tokens and cost are accounted per tier.
+FAST_MODEL = os.getenv("FAST_MODEL", "gemini-2.0-flash-lite")
+LARGE_MODEL = os.getenv("LARGE_MODEL", os.getenv("GEMINI_MODEL", "gemini-2.0-flash"))
+DEFAULT_TIER = os.getenv("DEFAULT_TIER", "cascade")
+# Per-agent overrides, e.g. MODEL_TIERS="triage_agent=large,booking_agent=fast"
+MODEL_TIERS = os.getenv("MODEL_TIERS", "")
+# USD per million input,output tokens
+FAST_PRICE = tuple(float(p) for p in os.getenv("FAST_MODEL_PRICE", "0.075,0.30").split(","))
+LARGE_PRICE = tuple(float(p) for p in os.getenv("LARGE_MODEL_PRICE", "0.10,0.40").split(","))
+# Requests longer than this (in characters) or asking for long-form output go straight to large
+LONG_FORM_CHARS = int(os.getenv("LONG_FORM_CHARS", "600"))
+# Streamed fast answers are checked once this much text has arrived
+CHECK_CHARS = 80
+
+LONG_FORM_RE = re.compile(
+    r"\b(in detail|detailed|step[- ]by[- ]step|itinerary|roadmap|full plan|write (a|an|me)|essay|story|compare)\b",
+    re.IGNORECASE,
+)
+REFUSAL_RE = re.compile(r"^\s*(i('m| am) (sorry|unable|not able)|i can(no|')t|as an ai)\b", re.IGNORECASE)
+
+
+def apply_tiers(agents, policy: dict[str, str]):
+    """Sets each agent's model to its tier name from policy (MODEL_TIERS overrides it)."""
+    overrides = dict(item.split("=", 1) for item in MODEL_TIERS.split(",") if "=" in item)
+    for agent in agents:
+        agent.model = overrides.get(agent.name) or policy.get(agent.name, DEFAULT_TIER)
+
+
+def last_user_text(input) -> str:
+    if isinstance(input, str):
+        return input
+    for item in reversed(input):
+        if isinstance(item, dict) and item.get("role") == "user":
+            content = item.get("content")
+            if isinstance(content, str):
+                return content
+            return " ".join(part.get("text", "") for part in content or () if isinstance(part, dict))
+    return ""
+
+
+def wants_long_form(input) -> bool:
+    text = last_user_text(input)
+    return len(text) > LONG_FORM_CHARS or bool(LONG_FORM_RE.search(text))
+
+
+def check_output(output) -> str | None:
+    """Cheap quality check of a fast-tier answer; returns why it failed, or None if it is fine."""
+    if not output:
+        return "empty"
+    text = ""
+    for item in output:
+        kind = getattr(item, "type", None)
+        if kind == "function_call":
+            try:
+                json.loads(item.arguments or "{}")
+            except ValueError:
+                return "bad tool arguments"
+            return None
+        if kind == "message":
+            text += "".join(getattr(part, "text", "") for part in item.content)
+    if not text.strip():
+        return "empty"
+    if REFUSAL_RE.search(text):
+        return "refusal"
+    return None
+
+
+class TierStats:
+    def __init__(self, model: str, price: tuple[float, float]):
+        self.model = model
+        self.price = price
+        self.calls = 0
+        self.failures = 0
+        self.escalations = 0  # cascade calls answered by this tier after the fast check failed
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latencies = deque(maxlen=1000)
+
+    def record(self, seconds: float, usage):
+        self.calls += 1
+        self.latencies.append(seconds)
+        if usage is not None:
+            self.input_tokens += usage.input_tokens or 0
+            self.output_tokens += usage.output_tokens or 0
+
+    def snapshot(self) -> dict:
+        ordered = sorted(self.latencies)
+        cost = (self.input_tokens * self.price[0] + self.output_tokens * self.price[1]) / 1e6
+        return {
+            "model": self.model,
+            "calls": self.calls,
+            "failures": self.failures,
+            "escalations": self.escalations,
+            "avg_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 1) if ordered else 0.0,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cost_usd": round(cost, 6),
+        }
+
+
+class TieredModel(Model):
+    """Runs one tier's model and accounts for it; "cascade" tries fast and escalates to large."""
+
+    def __init__(self, tier: str, provider: "TieredProvider"):
+        self.tier = tier
+        self.provider = provider
+
+    async def _get(self, tier: str, args, kwargs):
+        stats = self.provider.stats[tier]
+        started = time.perf_counter()
+        try:
+            response = await self.provider.models[tier].get_response(*args, **kwargs)
+        except Exception:
+            stats.failures += 1
+            raise
+        stats.record(time.perf_counter() - started, response.usage)
+        return response
+
+    async def get_response(self, system_instructions, input, *args, **kwargs):
+        args = (system_instructions, input, *args)
+        if self.tier != "cascade":
+            return await self._get(self.tier, args, kwargs)
+        if wants_long_form(input):
+            return await self._get("large", args, kwargs)
+        response = await self._get("fast", args, kwargs)
+        problem = check_output(response.output)
+        if problem is None:
+            return response
+        logger.info("Fast tier answer failed its check (%s), escalating", problem)
+        self.provider.stats["large"].escalations += 1
+        return await self._get("large", args, kwargs)
+
+    async def _stream(self, tier: str, args, kwargs):
+        stats = self.provider.stats[tier]
+        started = time.perf_counter()
+        usage = None
+        try:
+            async for event in self.provider.models[tier].stream_response(*args, **kwargs):
+                if event.type == "response.completed":
+                    usage = event.response.usage
+                yield event
+        except Exception:
+            stats.failures += 1
+            raise
+        finally:
+            # Also counts fast streams abandoned for an escalation
+            stats.record(time.perf_counter() - started, usage)
+
+    async def stream_response(self, system_instructions, input, *args, **kwargs):
+        args = (system_instructions, input, *args)
+        if self.tier != "cascade" or wants_long_form(input):
+            async for event in self._stream("large" if self.tier == "cascade" else self.tier, args, kwargs):
+                yield event
+            return
+
+        # Hold back the fast stream until there is enough to check (a tool call,
+        # CHECK_CHARS of text or the end), then either flush it or switch to large
+        buffered, text, problem = [], "", None
+        stream = self._stream("fast", args, kwargs)
+        async for event in stream:
+            buffered.append(event)
+            if event.type == "response.output_text.delta":
+                text += event.delta
+            done = event.type == "response.completed"
+            if done or len(text) >= CHECK_CHARS or event.type == "response.function_call_arguments.delta":
+                if done:
+                    problem = check_output(event.response.output)
+                elif text:
+                    problem = "refusal" if REFUSAL_RE.search(text) else None
+                break
+        if problem is not None:
+            await stream.aclose()
+            logger.info("Fast tier answer failed its check (%s), escalating", problem)
+            self.provider.stats["large"].escalations += 1
+            async for event in self._stream("large", args, kwargs):
+                yield event
+            return
+        for event in buffered:
+            yield event
+        async for event in stream:
+            yield event
+
+
+class TieredProvider(ModelProvider):
+    """ModelProvider that resolves tier names ("fast", "large", "cascade") on one shared client."""
+
+    def __init__(self, client: AsyncOpenAI, fast_model=FAST_MODEL, large_model=LARGE_MODEL):
+        self.client = client
+        self.models = {
+            "fast": OpenAIChatCompletionsModel(model=fast_model, openai_client=client),
+            "large": OpenAIChatCompletionsModel(model=large_model, openai_client=client),
+        }
+        self.stats = {"fast": TierStats(fast_model, FAST_PRICE), "large": TierStats(large_model, LARGE_PRICE)}
+        self.tiers = {tier: TieredModel(tier, self) for tier in ("fast", "large", "cascade")}
+
+    def get_model(self, model_name: str | None) -> Model:
+        tier = self.tiers.get(model_name or DEFAULT_TIER)
+        if tier is not None:
+            return tier
+        # A concrete model name bypasses tiering
+        return OpenAIChatCompletionsModel(model=model_name, openai_client=self.client)
+
+    def snapshot(self) -> dict:
+        return {tier: stats.snapshot() for tier, stats in self.stats.items()}
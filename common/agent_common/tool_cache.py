@@ -0,0 +1,129 @@
+import functools
+import inspect
+import os
+import time
+from collections import OrderedDict
+
+# Memoization for tools whose answer depends only on their arguments (catalog
+# and roadmap lookups). Goes under @function_tool:
+#
+#   @function_tool
+#   @memoize(key=normalize)
+#   def get_flights(destination): ...
+#
+# Answers are kept in a per-tool LRU with a short TTL, keyed on normalized
+# arguments, so busy sessions asking about the same popular keys share them.
+# Keys should be cheap to compute (a hit skips only the work the key does
+# not do) and list arguments keep their order. Only sync tools: they run to
+# completion on the event loop, so identical calls cannot overlap; async
+# lookups coalesce their own in-flight requests (see the travel connectors).
+# Errors are not cached. Cached answers are shared, not copied: only memoize
+# tools whose callers do not modify the result.
+TOOL_CACHE = os.getenv("TOOL_CACHE", "1") != "0"
+TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "60"))
+TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))  # entries per tool
+
+MISSING = object()
+caches: dict[str, "ToolCache"] = {}
+
+
+def normalize_arg(value):
+    """Hashable, case- and spacing-insensitive form of a tool argument."""
+    if isinstance(value, str):
+        return " ".join(value.casefold().split())
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_arg(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(normalize_arg(v) for v in value)
+    return value
+
+
+class ToolCache:
+    def __init__(self, name: str, ttl: float = TOOL_CACHE_TTL, size: int = TOOL_CACHE_SIZE):
+        self.name = name
+        self.ttl = ttl
+        self.size = size
+        self.entries = OrderedDict()  # key -> (expires_at, answer), least recently used first
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self.errors = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return MISSING
+        if entry[0] <= time.monotonic():
+            del self.entries[key]
+            self.expired += 1
+            return MISSING
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def store(self, key, answer):
+        self.entries[key] = (time.monotonic() + self.ttl, answer)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+            self.evicted += 1
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hit_ratio": round(self.hits / self.calls, 3) if self.calls else 0.0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "errors": self.errors,
+            "entries": len(self.entries),
+        }
+
+
+def memoize(ttl: float = TOOL_CACHE_TTL, size: int = TOOL_CACHE_SIZE, key=None):
+    """Caches a pure sync tool's answers; key(*args, **kwargs) overrides the default normalized-arguments key."""
+
+    def decorate(func):
+        cache = caches[func.__name__] = ToolCache(func.__name__, ttl, size)
+        signature = inspect.signature(func)
+
+        def make_key(args, kwargs):
+            if key is not None:
+                return key(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return tuple(normalize_arg(value) for value in bound.arguments.values())
+
+        if inspect.iscoroutinefunction(func):
+            raise TypeError(f"memoize only wraps sync tools, not {func.__name__}")
+
+        @functools.wraps(func)
+        def cached(*args, **kwargs):
+            if not TOOL_CACHE:
+                return func(*args, **kwargs)
+            cache.calls += 1
+            k = make_key(args, kwargs)
+            answer = cache.lookup(k)
+            if answer is not MISSING:
+                return answer
+            cache.misses += 1
+            try:
+                answer = func(*args, **kwargs)
+            except Exception:
+                cache.errors += 1
+                raise
+            cache.store(k, answer)
+            return answer
+
+        cached.cache = cache
+        return cached
+
+    return decorate
+
+
+def tool_cache_stats() -> dict:
+    """Calls, hit ratio and size per memoized tool."""
+    return {name: cache.snapshot() for name, cache in sorted(caches.items())}
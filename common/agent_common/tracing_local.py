@@ -0,0 +1,282 @@
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque
+
+from agents.tracing import Span, Trace, TracingProcessor, set_trace_processors, set_tracing_disabled
+
+logger = logging.getLogger(__name__)
+
+# Local tracing. Replaces the SDK's default exporter (which uploads to the
+# OpenAI platform) with a processor that keeps everything on this machine:
+# every agent, handoff, tool call and model call span is timed, model spans
+# carry their token usage, and records are appended in batches to a rotating
+# JSONL file by a background thread. Per-stage p50/p95/p99 are served on
+# /metrics, to loopback clients only unless METRICS_TOKEN is set (then to
+# requests with "Authorization: Bearer <token>" as well). Prompts and outputs
+# are never written, only names, timings and token counts.
+TRACING_LOCAL = os.getenv("TRACING_LOCAL", "1") == "1"
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", "3"))
+# Records are written when this many are buffered or the oldest is this old
+TRACE_FLUSH_RECORDS = int(os.getenv("TRACE_FLUSH_RECORDS", "200"))
+TRACE_FLUSH_S = float(os.getenv("TRACE_FLUSH_S", "2"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Latency samples kept per stage for the percentiles
+TRACE_SAMPLES = 1000
+
+# Span types we time; anything else (guardrails, custom spans...) is ignored
+KINDS = {"agent": "agent", "function": "tool", "generation": "model", "response": "model", "handoff": "handoff"}
+
+
+def percentiles(samples) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+
+    def at(q):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 1)
+
+    return {"count": len(ordered), "p50_ms": at(0.5), "p95_ms": at(0.95), "p99_ms": at(0.99)}
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latencies = deque(maxlen=TRACE_SAMPLES)
+
+    def snapshot(self) -> dict:
+        snapshot = {"calls": self.calls, "errors": self.errors} | percentiles(self.latencies)
+        if self.input_tokens or self.output_tokens:
+            snapshot |= {"input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+        return snapshot
+
+
+class RotatingJsonl:
+    """Appends JSON lines to path, rolling it over to path.1 ... path.N past max_bytes."""
+
+    def __init__(self, path: str, max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def write(self, records: list[dict]):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(data)
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+class LocalTraceProcessor(TracingProcessor):
+    """Times spans per stage and writes them to a local JSONL file.
+
+    Stages are keyed by kind and name ("model:gemini-2.0-flash",
+    "tool:get_flights", "agent:TriageAgent", "handoff:A>B"), plus one entry per
+    kind and "turn" for whole runs. Callbacks only do dictionary work; the file
+    is written in batches on a writer thread, off the event loop.
+    """
+
+    def __init__(self, path: str | None = None, flush_seconds: float = TRACE_FLUSH_S):
+        self.sink = RotatingJsonl(path or os.path.join(TRACE_DIR, "spans.jsonl"))
+        self.flush_seconds = flush_seconds
+        self.stages = defaultdict(StageStats)
+        self._started = {}  # span or trace id -> perf_counter at start
+        self._buffer = []
+        self._buffered_at = 0.0
+        self._lock = threading.Lock()  # the SDK may end spans from worker threads
+        self._batches = queue.Queue()
+        self._writer: threading.Thread | None = None
+        self.written = 0
+        self.write_errors = 0
+
+    def _record(self, stage: str, kind: str, seconds: float, error: bool, usage: dict | None = None):
+        for key in dict.fromkeys((stage, kind)):
+            stats = self.stages[key]
+            stats.calls += 1
+            stats.latencies.append(seconds)
+            if error:
+                stats.errors += 1
+            if usage:
+                stats.input_tokens += usage.get("input_tokens") or 0
+                stats.output_tokens += usage.get("output_tokens") or 0
+
+    def _append(self, record: dict):
+        with self._lock:
+            if not self._buffer:
+                self._buffered_at = time.monotonic()
+            self._buffer.append(record)
+            if len(self._buffer) >= TRACE_FLUSH_RECORDS or time.monotonic() - self._buffered_at >= self.flush_seconds:
+                self._hand_off()
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_batches, name="trace-writer", daemon=True)
+                self._writer.start()
+
+    def _hand_off(self):
+        """Passes the buffered records to the writer thread (call with the lock held)."""
+        if not self._buffer:
+            return
+        self._batches.put(self._buffer)
+        self._buffer = []
+
+    def _write_batches(self):
+        while True:
+            with self._lock:
+                # Records still buffered once the last span of a burst has ended
+                # are handed off here, flush_seconds after the oldest one arrived
+                age = time.monotonic() - self._buffered_at
+                if self._buffer and age >= self.flush_seconds:
+                    self._hand_off()
+                wait = self.flush_seconds - age if self._buffer else self.flush_seconds
+            try:
+                records = self._batches.get(timeout=wait)
+            except queue.Empty:
+                continue
+            try:
+                self.sink.write(records)
+                self.written += len(records)
+            except OSError as e:
+                # Tracing must never break a turn
+                self.write_errors += 1
+                logger.warning("Could not write %d trace records: %s", len(records), e)
+            finally:
+                self._batches.task_done()
+
+    def on_trace_start(self, trace: Trace) -> None:
+        self._started[trace.trace_id] = time.perf_counter()
+
+    def on_trace_end(self, trace: Trace) -> None:
+        started = self._started.pop(trace.trace_id, None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        self._record("turn", "turn", seconds, False)
+        self._append({"ts": round(time.time(), 3), "trace_id": trace.trace_id, "kind": "turn",
+                      "name": trace.name, "ms": round(seconds * 1000, 2)})
+
+    def on_span_start(self, span: Span) -> None:
+        self._started[span.span_id] = time.perf_counter()
+
+    def on_span_end(self, span: Span) -> None:
+        started = self._started.pop(span.span_id, None)
+        data = span.span_data
+        kind = KINDS.get(data.type)
+        if started is None or kind is None:
+            return
+        seconds = time.perf_counter() - started
+        usage = None
+        if data.type == "handoff":
+            name = f"{data.from_agent}>{data.to_agent}"
+        elif data.type == "generation":
+            name, usage = data.model or "?", data.usage
+        elif data.type == "response":
+            response = data.response
+            name = getattr(response, "model", None) or "?"
+            if response is not None and response.usage is not None:
+                usage = {"input_tokens": response.usage.input_tokens, "output_tokens": response.usage.output_tokens}
+        else:
+            name = data.name
+        error = span.error is not None
+        self._record(f"{kind}:{name}", kind, seconds, error, usage)
+
+        record = {"ts": round(time.time(), 3), "trace_id": span.trace_id, "span_id": span.span_id,
+                  "parent_id": span.parent_id, "kind": kind, "name": name, "ms": round(seconds * 1000, 2)}
+        if usage:
+            record["usage"] = usage
+        if error:
+            record["error"] = span.error.get("message")
+        self._append(record)
+
+    def force_flush(self) -> None:
+        """Writes everything buffered and waits until it is in the file."""
+        with self._lock:
+            self._hand_off()
+        self._batches.join()
+
+    def shutdown(self) -> None:
+        self.force_flush()
+
+    def summary(self) -> dict:
+        """Calls, errors, p50/p95/p99 latency and tokens per stage."""
+        return {stage: stats.snapshot() for stage, stats in sorted(self.stages.items())}
+
+
+processor = LocalTraceProcessor()
+
+
+def install_local_tracing():
+    """Routes all Agents SDK traces to the local processor (and nowhere else).
+
+    With TRACING_LOCAL=0 tracing is switched off entirely rather than falling
+    back to the SDK's uploading exporter.
+    """
+    if TRACING_LOCAL:
+        set_trace_processors([processor])
+    else:
+        set_tracing_disabled(True)
+
+
+def stage_summary() -> dict:
+    return processor.summary()
+
+
+def flush():
+    processor.force_flush()
+
+
+def allowed(request, token: str = METRICS_TOKEN) -> bool:
+    """Whether a /metrics request may be answered: a loopback client, or the bearer token if one is set.
+
+    Requests relayed by a proxy (Forwarded / X-Forwarded-For) do not count as loopback.
+    """
+    if token and hmac.compare_digest(request.headers.get("authorization", ""), f"Bearer {token}"):
+        return True
+    if "forwarded" in request.headers or "x-forwarded-for" in request.headers:
+        return False
+    try:
+        return request.client is not None and ipaddress.ip_address(request.client.host).is_loopback
+    except ValueError:
+        return False
+
+
+def mount_metrics(app, path: str = "/metrics", extra: dict | None = None):
+    """Serves the stage summary (plus any extra name -> stats callables) as JSON on app.
+
+    Only to loopback clients and holders of METRICS_TOKEN; anyone else gets a 404.
+    """
+    from starlette.responses import JSONResponse, Response
+    from starlette.routing import Route
+
+    async def metrics(request):
+        if not allowed(request):
+            return Response(status_code=404)
+        body = {"stages": stage_summary()}
+        for name, snapshot in (extra or {}).items():
+            body[name] = snapshot()
+        return JSONResponse(body)
+
+    # In front of any catch-all route (Chainlit serves its frontend on /{path})
+    app.router.routes.insert(0, Route(path, metrics, methods=["GET"]))
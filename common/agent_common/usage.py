@@ -0,0 +1,224 @@
+import json
+import logging
+import os
+from collections import defaultdict, deque
+
+from agents import Agent, RunHooks, handoff
+from agents.handoffs import Handoff
+
+logger = logging.getLogger(__name__)
+
+# Token accounting. Run hooks diff the run's cumulative usage whenever the
+# current agent finishes or hands off, so input and output tokens are charged
+# to the agent that spent them, to the handoff it ended with and to the chat
+# session. Before a run, the prompt (instructions, tool and handoff schemas,
+# input items) is estimated against PROMPT_BUDGET_TOKENS; a turn over it is
+# logged and counted, and with PROMPT_BUDGET_ACTION=compact the chat history
+# is shrunk first. benchmarks/token_report.py prices the fixed parts of each
+# agent's prompt per 1,000 turns.
+PROMPT_BUDGET_TOKENS = int(os.getenv("PROMPT_BUDGET_TOKENS", "4000"))  # 0 disables the check
+PROMPT_BUDGET_ACTION = os.getenv("PROMPT_BUDGET_ACTION", "warn")  # warn | compact
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token plus message overhead), as in the chat memory."""
+    return len(text) // 4 + 4
+
+
+def schema_tokens(name: str, description: str, parameters: dict) -> int:
+    return estimate_tokens(json.dumps({"name": name, "description": description, "parameters": parameters}))
+
+
+_parts: dict[str, dict[str, int]] = {}  # agent name -> prompt_parts; agents are built once per process
+
+
+def prompt_parts(agent: Agent) -> dict[str, int]:
+    """Estimated tokens of what every model request of this agent carries besides the input."""
+    parts = _parts.get(agent.name)
+    if parts is None:
+        parts = {}
+        if isinstance(agent.instructions, str):
+            parts["instructions"] = estimate_tokens(agent.instructions)
+        for tool in agent.tools:
+            parts[f"tool:{tool.name}"] = schema_tokens(
+                tool.name, getattr(tool, "description", ""), getattr(tool, "params_json_schema", {}))
+        for target in agent.handoffs:
+            target = target if isinstance(target, Handoff) else handoff(target)
+            parts[f"handoff:{target.tool_name}"] = schema_tokens(
+                target.tool_name, target.tool_description, target.input_json_schema)
+        _parts[agent.name] = parts
+    return parts
+
+
+# Input item fields that reach the model: message text, tool call arguments and tool results
+ITEM_FIELDS = ("content", "arguments", "output")
+
+
+def input_tokens(input) -> int:
+    if isinstance(input, str):
+        return estimate_tokens(input)
+    return sum(estimate_tokens("".join(str(item.get(field) or "") for field in ITEM_FIELDS)) for item in input)
+
+
+def counts(usage) -> tuple[int, int, int, int]:
+    details = usage.input_tokens_details
+    return usage.requests, usage.input_tokens, usage.output_tokens, (details.cached_tokens or 0) if details else 0
+
+
+class TokenCounts:
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+
+    def add(self, delta: tuple[int, int, int, int]):
+        self.requests += delta[0]
+        self.input_tokens += delta[1]
+        self.output_tokens += delta[2]
+        self.cached_tokens += delta[3]
+
+    def snapshot(self) -> dict:
+        snapshot = {"requests": self.requests, "input_tokens": self.input_tokens, "output_tokens": self.output_tokens}
+        if self.requests:
+            snapshot["avg_input_per_request"] = round(self.input_tokens / self.requests)
+        if self.cached_tokens:
+            snapshot["cached_tokens"] = self.cached_tokens
+        return snapshot
+
+
+class TurnUsage(RunHooks):
+    """Run hooks for one turn: charges usage to each agent as the run moves on from it.
+
+    Passes every event on to the turn's other hooks, if any.
+    """
+
+    def __init__(self, ledger: "UsageLedger", inner: RunHooks | None = None, background: bool = False):
+        self.ledger = ledger
+        self.inner = inner
+        self.background = background
+        self.context = None
+        self.agent: Agent | None = None
+        self.mark = (0, 0, 0, 0)
+        self.total = TokenCounts()
+
+    def _charge(self, context, agent: Agent, edge: str | None = None):
+        now = counts(context.usage)
+        delta = tuple(a - b for a, b in zip(now, self.mark))
+        self.mark = now
+        self.total.add(delta)
+        self.ledger.charge(agent.name, delta, edge)
+
+    async def on_agent_start(self, context, agent):
+        self.context, self.agent = context, agent
+        if self.inner is not None:
+            await self.inner.on_agent_start(context, agent)
+
+    async def on_handoff(self, context, from_agent, to_agent):
+        self._charge(context, from_agent, f"{from_agent.name}>{to_agent.name}")
+        if self.inner is not None:
+            await self.inner.on_handoff(context, from_agent, to_agent)
+
+    async def on_agent_end(self, context, agent, output):
+        self._charge(context, agent)
+        self.agent = None
+        if self.inner is not None:
+            await self.inner.on_agent_end(context, agent, output)
+
+    async def on_tool_start(self, context, agent, tool):
+        if self.inner is not None:
+            await self.inner.on_tool_start(context, agent, tool)
+
+    async def on_tool_end(self, context, agent, tool, result):
+        if self.inner is not None:
+            await self.inner.on_tool_end(context, agent, tool, result)
+
+    def end(self, session: dict | None = None):
+        """Charges what a cancelled or failed run spent and adds the turn to the session's totals."""
+        if self.agent is not None and self.context is not None:
+            self._charge(self.context, self.agent)
+            self.agent = None
+        self.ledger.end_turn(self)
+        if session is not None:
+            totals = session.setdefault("usage", {"turns": 0, "requests": 0, "input_tokens": 0, "output_tokens": 0})
+            totals["turns"] += not self.background
+            totals["requests"] += self.total.requests
+            totals["input_tokens"] += self.total.input_tokens
+            totals["output_tokens"] += self.total.output_tokens
+
+
+class UsageLedger:
+    """Process-wide token counts per agent and handoff, and the prompt budget."""
+
+    def __init__(self, budget: int = PROMPT_BUDGET_TOKENS, action: str = PROMPT_BUDGET_ACTION):
+        self.budget = budget
+        self.action = action
+        self.agents = defaultdict(TokenCounts)
+        self.handoffs = defaultdict(TokenCounts)  # "from>to" -> tokens the from agent spent deciding to hand off
+        self.total = TokenCounts()
+        self.turns = 0
+        self.background_runs = 0
+        self.turn_tokens = deque(maxlen=1000)  # input + output per turn
+        self.prompt_estimates = deque(maxlen=1000)
+        self.over_budget = 0
+        self.compacted = 0
+
+    def turn(self, hooks: RunHooks | None = None, background: bool = False) -> TurnUsage:
+        """Hooks to pass to the run; call end() on them once it is over."""
+        return TurnUsage(self, hooks, background)
+
+    def charge(self, agent: str, delta: tuple[int, int, int, int], edge: str | None = None):
+        self.agents[agent].add(delta)
+        self.total.add(delta)
+        if edge is not None:
+            self.handoffs[edge].add(delta)
+
+    def end_turn(self, turn: TurnUsage):
+        if turn.background:
+            self.background_runs += 1
+            return
+        self.turns += 1
+        self.turn_tokens.append(turn.total.input_tokens + turn.total.output_tokens)
+
+    def fit(self, agent: Agent, input, shrink=None):
+        """The input to run agent with, checked against the prompt budget.
+
+        Over budget, the turn is logged, or with the compact action shrink(excess
+        tokens) builds a smaller input. Only the starting agent's prompt is
+        estimated; agents it hands off to get the same input with their own
+        instructions and tools.
+        """
+        fixed = sum(prompt_parts(agent).values())
+        size = fixed + input_tokens(input)
+        self.prompt_estimates.append(size)
+        if not self.budget or size <= self.budget:
+            return input
+        self.over_budget += 1
+        if self.action == "compact" and shrink is not None and size - fixed > 0:
+            input = shrink(size - self.budget)
+            self.compacted += 1
+            logger.info("Prompt for %s compacted from ~%d to ~%d tokens (budget %d)",
+                        agent.name, size, fixed + input_tokens(input), self.budget)
+        else:
+            logger.warning("Prompt for %s is ~%d tokens, over the %d token budget (~%d in instructions and tools)",
+                           agent.name, size, self.budget, fixed)
+        return input
+
+    def stats(self) -> dict:
+        ordered = sorted(self.turn_tokens)
+        estimates = sorted(self.prompt_estimates)
+        return {
+            "turns": self.turns,
+            "background_runs": self.background_runs,
+            "total": self.total.snapshot(),
+            "avg_tokens_per_turn": round(sum(ordered) / len(ordered)) if ordered else 0,
+            "p95_tokens_per_turn": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0,
+            "p95_prompt_estimate": estimates[min(len(estimates) - 1, int(len(estimates) * 0.95))] if estimates else 0,
+            "budget": {"tokens": self.budget, "action": self.action, "over": self.over_budget,
+                       "compacted": self.compacted},
+            "agents": {name: counts.snapshot() for name, counts in sorted(self.agents.items())},
+            "handoffs": {edge: counts.snapshot() for edge, counts in sorted(self.handoffs.items())},
+        }
+
+
+ledger = UsageLedger()
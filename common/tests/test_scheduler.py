@@ -0,0 +1,57 @@
+import asyncio
+
+from agent_common.scheduler import RequestScheduler, TokenBucket, batch_priority, set_session
+
+
+def test_unlimited_bucket_never_waits():
+    bucket = TokenBucket(0)
+    bucket.take(1_000_000)
+    assert bucket.delay(1_000_000) == 0.0
+
+
+def test_bucket_starts_full_and_refills_at_its_rate():
+    bucket = TokenBucket(60, burst_s=5)  # one per second, five in a burst
+    assert bucket.capacity == 5
+    for _ in range(5):
+        assert bucket.delay(1) == 0.0
+        bucket.take(1)
+    assert 0.9 < bucket.delay(1) <= 1.0
+
+
+def test_bucket_caps_large_requests_at_its_capacity():
+    bucket = TokenBucket(600, burst_s=1)  # capacity 10
+    # A request larger than the burst still gets through once the bucket is full
+    assert bucket.delay(50) == 0.0
+    bucket.take(50)
+    assert bucket.level == 0
+
+
+def test_scheduler_defaults_to_unlimited():
+    scheduler = RequestScheduler()
+    assert scheduler.requests.capacity == 0 and scheduler.tokens.capacity == 0
+
+
+def test_interactive_requests_go_before_batch_and_sessions_take_turns():
+    async def main():
+        scheduler = RequestScheduler(rpm=60)
+        scheduler.requests.level = 0  # everything queues until the first refill
+        order = []
+
+        async def request(session, label, batch=False):
+            set_session(session)
+            if batch:
+                with batch_priority():
+                    await scheduler.acquire(1)
+            else:
+                await scheduler.acquire(1)
+            order.append(label)
+
+        scheduler.requests.rate = 1000  # refill fast once queued
+        tasks = [asyncio.create_task(request("a", "batch", batch=True))]
+        tasks += [asyncio.create_task(request("a", f"a{i}")) for i in range(2)]
+        tasks += [asyncio.create_task(request("b", f"b{i}")) for i in range(2)]
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(main())
+    assert order == ["a0", "b0", "a1", "b1", "batch"]
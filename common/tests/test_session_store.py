@@ -0,0 +1,112 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from agent_common.session_store import MemoryBackend, SessionStore, SQLiteBackend, dumps, loads
+
+SECRET = b"test-secret"
+
+
+def store(**options) -> SessionStore:
+    return SessionStore(options.pop("backend", None) or MemoryBackend(), flush_s=0.01, secret=SECRET, **options)
+
+
+def test_blobs_round_trip_and_reject_another_secret():
+    blob = dumps({"world": [1, 2]}, SECRET)
+    assert loads(blob, SECRET) == {"world": [1, 2]}
+    with pytest.raises(ValueError):
+        loads(blob, b"other")
+
+
+def test_saved_state_is_restored_by_a_new_store():
+    async def main():
+        first = store()
+        state = await first.get("chat")
+        state["budget"] = 5000
+        first.save("chat", state)
+        await first.close()
+        second = store(backend=first.backend)
+        return await second.get("chat")
+
+    assert asyncio.run(main()) == {"budget": 5000}
+
+
+def test_tampered_sqlite_blob_starts_the_conversation_over(tmp_path):
+    path = str(tmp_path / "sessions.sqlite")
+
+    async def write():
+        sessions = store(backend=SQLiteBackend(path))
+        state = await sessions.get("chat")
+        state["health"] = 20
+        sessions.save("chat", state)
+        await sessions.close()
+
+    async def read():
+        sessions = store(backend=SQLiteBackend(path))
+        state = await sessions.get("chat")
+        await sessions.close()
+        return state
+
+    asyncio.run(write())
+    db = sqlite3.connect(path)
+    (blob,) = db.execute("SELECT state FROM sessions").fetchone()
+    db.execute("UPDATE sessions SET state = ?", (blob[:-1] + bytes([blob[-1] ^ 1]),))
+    db.commit()
+    db.close()
+    assert asyncio.run(read()) == {}
+
+
+def test_least_recently_used_sessions_over_max_live_are_evicted():
+    async def main():
+        sessions = store(max_live=2)
+        for key in ("a", "b", "c"):
+            await sessions.get(key)
+        await asyncio.sleep(0.05)
+        live = list(sessions.live)
+        await sessions.close()
+        return live, sessions.evicted
+
+    assert asyncio.run(main()) == (["b", "c"], 1)
+
+
+def test_save_after_eviction_keeps_the_turns_changes():
+    async def main():
+        sessions = store(max_live=1)
+        state = await sessions.get("a")
+        await sessions.get("b")
+        await asyncio.sleep(0.05)  # "a" is evicted while its turn is still running
+        assert "a" not in sessions.live
+        state["turns"] = 1
+        sessions.save("a", state)
+        await sessions.flush()
+        return await store(backend=sessions.backend).get("a")
+
+    assert asyncio.run(main()) == {"turns": 1}
+
+
+def test_save_keeps_the_state_a_newer_turn_loaded():
+    async def main():
+        sessions = store()
+        old = await sessions.get("a")
+        await sessions.evict("a")
+        new = await sessions.get("a")
+        new["turns"] = 2
+        old["turns"] = 1
+        sessions.save("a", old)
+        sessions.save("a", new)
+        await sessions.flush()
+        return await store(backend=sessions.backend).get("a")
+
+    assert asyncio.run(main()) == {"turns": 2}
+
+
+def test_concurrent_first_gets_load_once():
+    async def main():
+        sessions = store()
+        states = await asyncio.gather(*(sessions.get("a") for _ in range(5)))
+        return states, sessions.created
+
+    states, created = asyncio.run(main())
+    assert all(state is states[0] for state in states)
+    assert created == 1
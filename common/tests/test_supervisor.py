@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+from agent_common.supervisor import RunSupervisor, Superseded
+
+
+def test_a_newer_turn_supersedes_the_one_in_flight():
+    async def main():
+        supervisor = RunSupervisor(deadline=5)
+        first = asyncio.create_task(supervisor.run(asyncio.sleep(1, "first")))
+        await asyncio.sleep(0)
+        second = await supervisor.run(asyncio.sleep(0, "second"))
+        with pytest.raises(Superseded):
+            await first
+        return second
+
+    assert asyncio.run(main()) == "second"
+
+
+def test_a_turn_over_its_deadline_times_out():
+    async def main():
+        with pytest.raises(TimeoutError):
+            await RunSupervisor(deadline=0.01).run(asyncio.sleep(1))
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+import pytest
+
+from agent_common import tool_cache
+from agent_common.tool_cache import ToolCache, memoize, normalize_arg
+
+
+def test_normalize_arg_ignores_case_spacing_and_dict_order():
+    assert normalize_arg("  Data   Scientist ") == normalize_arg("data scientist")
+    assert normalize_arg({"b": "X", "a": 1}) == normalize_arg({"a": 1, "b": "x"})
+
+
+def test_normalize_arg_keeps_list_order():
+    assert normalize_arg(["a", "b"]) != normalize_arg(["b", "a"])
+
+
+def test_equivalent_calls_share_one_entry():
+    calls = []
+
+    @memoize()
+    def lookup_roadmap(career: str, months: int = 6):
+        calls.append(career)
+        return {"career": career}
+
+    first = lookup_roadmap("Data Scientist")
+    assert lookup_roadmap("data  scientist ") is first
+    assert lookup_roadmap(career="DATA SCIENTIST", months=6) is first
+    lookup_roadmap("data scientist", months=3)
+    assert calls == ["Data Scientist", "data scientist"]
+    assert lookup_roadmap.cache.snapshot()["hits"] == 2
+
+
+def test_custom_key():
+    calls = []
+
+    @memoize(key=lambda destination: destination.strip("!").lower())
+    def lookup_alerts(destination):
+        calls.append(destination)
+        return destination
+
+    lookup_alerts("Dubai!")
+    lookup_alerts("dubai")
+    assert calls == ["Dubai!"]
+
+
+def test_errors_are_not_cached():
+    calls = []
+
+    @memoize()
+    def lookup_flaky(key):
+        calls.append(key)
+        raise LookupError(key)
+
+    for _ in range(2):
+        with pytest.raises(LookupError):
+            lookup_flaky("x")
+    assert len(calls) == 2
+    assert lookup_flaky.cache.snapshot()["errors"] == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+    cache = ToolCache("ttl", ttl=10, size=10)
+    cache.store("k", "answer")
+    assert cache.lookup("k") == "answer"
+    now[0] += 11
+    assert cache.lookup("k") is tool_cache.MISSING
+    assert cache.expired == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ToolCache("lru", ttl=60, size=2)
+    cache.store("a", 1)
+    cache.store("b", 2)
+    cache.lookup("a")
+    cache.store("c", 3)
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.evicted == 1
+
+
+def test_async_tools_are_refused():
+    with pytest.raises(TypeError):
+        @memoize()
+        async def lookup_async(key):
+            return key
@@ -0,0 +1,50 @@
+import json
+import time
+
+from starlette.requests import Request
+
+from agent_common.tracing_local import LocalTraceProcessor, RotatingJsonl, allowed
+
+
+def request(host: str, headers: dict | None = None) -> Request:
+    raw = [(name.encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "client": (host, 50000), "headers": raw})
+
+
+def test_metrics_are_only_served_to_loopback_or_the_token():
+    assert allowed(request("127.0.0.1"), token="")
+    assert allowed(request("::1"), token="")
+    assert not allowed(request("10.0.0.7"), token="")
+    assert not allowed(request("127.0.0.1", {"x-forwarded-for": "203.0.113.9"}), token="")
+    assert allowed(request("10.0.0.7", {"authorization": "Bearer s3cret"}), token="s3cret")
+    assert not allowed(request("10.0.0.7", {"authorization": "Bearer guess"}), token="s3cret")
+
+
+def test_force_flush_writes_every_record(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    processor = LocalTraceProcessor(str(path))
+    for i in range(450):
+        processor._append({"i": i})
+    processor.force_flush()
+    assert [json.loads(line)["i"] for line in path.read_text().splitlines()] == list(range(450))
+    assert processor.written == 450
+
+
+def test_buffered_records_are_written_without_a_new_record(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    processor = LocalTraceProcessor(str(path), flush_seconds=0.05)
+    processor._append({"i": 0})
+    deadline = time.monotonic() + 2
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert [json.loads(line) for line in path.read_text().splitlines()] == [{"i": 0}]
+
+
+def test_jsonl_rolls_over_past_max_bytes(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    sink = RotatingJsonl(str(path), max_bytes=100, backups=2)
+    for i in range(3):
+        sink.write([{"batch": i, "pad": "x" * 60}])
+    assert json.loads(path.read_text())["batch"] == 2
+    assert json.loads((tmp_path / "spans.jsonl.1").read_text())["batch"] == 1
+    assert json.loads((tmp_path / "spans.jsonl.2").read_text())["batch"] == 0
@@ -0,0 +1,35 @@
+from agents import Agent, function_tool
+
+from agent_common.usage import UsageLedger, estimate_tokens, input_tokens, prompt_parts
+
+
+@function_tool
+def lookup_weather(city: str) -> str:
+    """Current weather for a city."""
+    return "sunny"
+
+
+def test_input_tokens_counts_tool_calls_and_results():
+    message = [{"role": "user", "content": "hi"}]
+    call = {"type": "function_call", "call_id": "1", "name": "lookup_weather", "arguments": '{"city": "Lahore"}'}
+    result = {"type": "function_call_output", "call_id": "1", "output": "sunny and 30 degrees " * 20}
+    assert input_tokens(message + [call, result]) > input_tokens(message + [call]) > input_tokens(message)
+    assert input_tokens("plain text") == estimate_tokens("plain text")
+
+
+def test_prompt_parts_cover_instructions_tools_and_handoffs():
+    helper = Agent(name="HelperAgent", instructions="Help.")
+    agent = Agent(name="PartsAgent", instructions="Answer briefly.", tools=[lookup_weather], handoffs=[helper])
+    parts = prompt_parts(agent)
+    assert set(parts) == {"instructions", "tool:lookup_weather", "handoff:transfer_to_helperagent"}
+    assert prompt_parts(Agent(name="PartsAgent", instructions="Something else entirely.")) is parts
+
+
+def test_fit_compacts_over_budget_input():
+    ledger = UsageLedger(budget=50, action="compact")
+    agent = Agent(name="FitAgent", instructions="Be brief.")
+    long_input = [{"role": "user", "content": "x" * 1000}]
+    short_input = [{"role": "user", "content": "x"}]
+    assert ledger.fit(agent, short_input) is short_input
+    assert ledger.fit(agent, long_input, shrink=lambda excess: short_input) is short_input
+    assert ledger.over_budget == 1 and ledger.compacted == 1